@@ -0,0 +1,134 @@
+"""Pre-encoded test case request bodies."""
+
+import enum
+import itertools
+import time
+from collections import deque
+
+import gevent
+
+from data.test_data import NewTest
+from utils.logger import Logger
+
+FILLER = (
+    "Lorem ipsum dolor sit amet, consectetur adipiscing elit, sed do eiusmod tempor incididunt ut labore "
+    "et dolore magna aliqua. Ut enim ad minim veniam, quis nostrud exercitation ullamco laboris nisi ut "
+    "aliquip ex ea commodo consequat. "
+)
+
+
+class PayloadKind(enum.Enum):
+    """Test case request bodies kept in the pool."""
+
+    CREATE = "create"
+    UPDATE = "update"
+    PARTIAL_UPDATE = "partial-update"
+
+
+class PayloadPool:
+    """Pool of JSON encoded test case bodies generated ahead of the requests that send them.
+
+    Test names are unique across users, workers and runs: "<run id>-<start time>-<worker index>-<counter>".
+    Descriptions are padded with filler text up to description_size characters.
+    A pool that drops below half of its size is refilled by a background greenlet in small chunks;
+    if it runs dry, the body is generated inline and counted as a miss.
+    """
+
+    names = {
+        PayloadKind.CREATE: "API Test",
+        PayloadKind.UPDATE: "Updated API Test",
+    }
+    descriptions = {
+        PayloadKind.CREATE: "Checking the creation of a new test. Endpoint: /api/tests/new",
+        PayloadKind.UPDATE: "Checking the update a test.",
+        PayloadKind.PARTIAL_UPDATE: "Checking the update a test description.",
+    }
+    refill_chunk = 200
+
+    size = 0
+    description_size = 0
+    misses = 0
+
+    _pools = {}
+    _refilling = set()
+    _prefix = ""
+    _filler = ""
+    _counter = itertools.count()
+
+    @classmethod
+    def init(cls, worker_index: int = 0, size: int = 1000, description_size: int = 0, run_id: str = ""):
+        """Fill size bodies of every kind. Size 0 disables the pool: steps build bodies per request."""
+        cls.size = size
+        cls.description_size = description_size
+        cls.misses = 0
+        cls._pools = {}
+        cls._refilling = set()
+        cls._prefix = f"{run_id}-{cls._base36(int(time.time() * 1000))}-{worker_index}"
+        cls._counter = itertools.count()
+        cls._filler = FILLER * (description_size // len(FILLER) + 1)
+        if size <= 0:
+            return
+
+        for kind in PayloadKind:
+            cls._pools[kind] = deque(cls._generate(kind) for _ in range(size))
+        average = sum(len(payload) for pool in cls._pools.values() for payload in pool) // (size * len(cls._pools))
+        Logger.log_message(f"Payload pool: {size} bodies per kind, {average} bytes on average")
+
+    @classmethod
+    def enabled(cls):
+        """Check if steps should take bodies from the pool."""
+        return bool(cls._pools)
+
+    @classmethod
+    def take(cls, kind: PayloadKind):
+        """Get next encoded body of kind."""
+        pool = cls._pools[kind]
+        try:
+            payload = pool.popleft()
+        except IndexError:
+            cls.misses += 1
+            payload = cls._generate(kind)
+        if len(pool) < cls.size // 2 and kind not in cls._refilling:
+            cls._refilling.add(kind)
+            gevent.spawn(cls._refill, kind, pool)
+        return payload
+
+    @classmethod
+    def clear(cls):
+        """Drop pooled bodies and report misses."""
+        if cls.misses:
+            Logger.log_message(f"Payload pool ran dry {cls.misses} times, consider a bigger --payload-pool-size")
+        cls._pools = {}
+
+    @classmethod
+    def _refill(cls, kind, pool):
+        try:
+            while cls._pools.get(kind) is pool and len(pool) < cls.size:
+                pool.extend(cls._generate(kind) for _ in range(min(cls.refill_chunk, cls.size - len(pool))))
+                gevent.sleep(0)
+        finally:
+            cls._refilling.discard(kind)
+
+    @classmethod
+    def _generate(cls, kind):
+        test = NewTest()
+        if kind in cls.names:
+            test.set_test_name(f"{cls.names[kind]} {cls._prefix}-{next(cls._counter)}")
+        test.set_test_desc(cls._pad(cls.descriptions[kind]))
+        return test.to_json()
+
+    @classmethod
+    def _pad(cls, description):
+        missing = cls.description_size - len(description) - 1
+        if missing <= 0:
+            return description
+        return f"{description} {cls._filler[:missing]}"
+
+    @staticmethod
+    def _base36(number):
+        digits = "0123456789abcdefghijklmnopqrstuvwxyz"
+        encoded = ""
+        while number:
+            number, remainder = divmod(number, 36)
+            encoded = digits[remainder] + encoded
+        return encoded or "0"
@@ -0,0 +1,241 @@
+"""Pre-seeded test cases for realistic list and stats data volumes."""
+
+import json
+import secrets
+import time
+from array import array
+from pathlib import Path
+
+from gevent.pool import Pool
+from gevent.queue import Queue
+from locust.event import EventHook
+
+from data.test_data import NewTest
+from utils.http_engine import ClientEngine, HttpEngine
+from utils.logger import Logger, LogType
+from utils.users_loader import UsersLoader
+from utils.utils import Utils
+
+
+class DatasetSeeder:
+    """Create test cases before the load starts and delete them, with orphans of Tests, afterwards.
+
+    Seeded rows and the test cases created by Tests are named with the run id ("Seed Test <run id>-<n>",
+    "API Test <run id>-..."), so the sweeper deletes only rows of this dataset. Rows are created by
+    concurrent requests in batches. After every batch the progress is saved to the state file under host and
+    run id, so interrupted seeding resumes where it stopped and a complete dataset is reused by later runs
+    against the same host, as long as the server still has it. Seeding and sweeping requests go to a private
+    request event and are not counted in the load test stats.
+    """
+
+    name_prefixes = ("Seed Test", "API Test", "Updated API Test")
+    page_size = 100
+    max_failure_ratio = 0.5
+
+    concurrency = 50
+    batch_size = 1000
+    state_path = Path("results/seed_state.json")
+    engine = ClientEngine.REQUESTS
+    run_id = ""
+
+    _environment = None
+    _host = None
+    _headers = None
+    _clients = None
+
+    @classmethod
+    def configure(cls, environment, host, concurrency=50, batch_size=1000, state_path=None, engine=None, run_id=""):
+        """Settings of this run. Without run_id the dataset last seeded on host is used, or a new one."""
+        cls._environment = environment
+        cls._host = host
+        cls.concurrency = max(concurrency, 1)
+        cls.batch_size = max(batch_size, 1)
+        if state_path:
+            cls.state_path = Path(state_path)
+        cls.engine = engine or ClientEngine.REQUESTS
+        cls._headers = None
+        cls._clients = None
+        datasets = [state["run_id"] for state in cls._read_states().values() if state.get("host") == host]
+        cls.run_id = run_id or (datasets[-1] if datasets else secrets.token_hex(3))
+
+    @classmethod
+    def _create_client(cls):
+        return HttpEngine.create_client(cls.engine, cls._environment, cls._host, request_event=EventHook())
+
+    @classmethod
+    def login(cls):
+        """Log in with the first credential of users.csv and prepare one client per concurrent request."""
+        if cls._headers is not None:
+            return True
+        UsersLoader.load_users()
+        credentials = UsersLoader.get_user()
+        client = cls._create_client()
+        response = client.post("/api/auth/login", json=credentials, headers=Utils.get_base_headers())
+        cookies = Utils.get_response_cookies(response)
+        token = cookies.get("csrftoken")
+        if response.status_code != 200 or not token:
+            Logger.report(
+                f"Seeding login failed for user {credentials.get('username')}: {response.status_code}", LogType.ERROR
+            )
+            return False
+        cls._headers = Utils.get_headers_with_token(token)
+        cls._headers["Cookie"] = "; ".join(f"{name}={value}" for name, value in cookies.items())
+        cls._clients = Queue()
+        for _ in range(cls.concurrency):
+            cls._clients.put(cls._create_client())
+        return True
+
+    @classmethod
+    def _send(cls, method, url, body=None):
+        """Send one request with a free client. The response on 2xx, None otherwise."""
+        client = cls._clients.get()
+        try:
+            response = client.request(method, url, data=body, headers=cls._headers)
+        except OSError:
+            return None
+        finally:
+            cls._clients.put(client)
+        return response if 200 <= response.status_code < 300 else None
+
+    @classmethod
+    def _create(cls, index):
+        test = NewTest()
+        test.set_test_name(f"Seed Test {cls.run_id}-{index}")
+        test.set_test_desc(f"Seeded test case {index} for list and stats data volumes.")
+        return cls._send("POST", "/api/tests/new", test.to_json())
+
+    @staticmethod
+    def _json(response):
+        try:
+            return response.json()
+        except ValueError:
+            return None
+
+    @classmethod
+    def _read_states(cls):
+        """{"<host> <run id>": state} of all datasets in the state file, the last seeded last."""
+        try:
+            states = json.loads(cls.state_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return {}
+        return {key: state for key, state in states.items() if isinstance(state, dict) and "run_id" in state}
+
+    @classmethod
+    def load_state(cls):
+        return cls._read_states().get(f"{cls._host} {cls.run_id}", {})
+
+    @classmethod
+    def save_state(cls, state):
+        """Store state of this host and run id, or drop it if state is None."""
+        states = cls._read_states()
+        states.pop(f"{cls._host} {cls.run_id}", None)
+        if state is not None:
+            states[f"{cls._host} {cls.run_id}"] = {"host": cls._host, "run_id": cls.run_id, **state}
+        if not states:
+            cls.state_path.unlink(missing_ok=True)
+            return
+        cls.state_path.parent.mkdir(parents=True, exist_ok=True)
+        cls.state_path.write_text(json.dumps(states), encoding="utf-8")
+
+    @classmethod
+    def _on_server(cls, state):
+        """Check that the server still has the dataset: sample rows exist and the total is not below created."""
+        for test_id in state.get("ids", []):
+            response = cls._send("GET", f"/api/tests/{test_id}")
+            if response is None or not str((cls._json(response) or {}).get("name", "")).startswith("Seed Test"):
+                return False
+        response = cls._send("GET", "/api/tests?page=1&size=1")
+        payload = cls._json(response) if response is not None else None
+        total = payload.get("count", payload.get("total")) if isinstance(payload, dict) else None
+        return not isinstance(total, int) or total >= state.get("created", 0)
+
+    @classmethod
+    def seed(cls, count):
+        """Make sure count seeded test cases exist. Returns False if seeding failed."""
+        if not cls.login():
+            return False
+        state = cls.load_state()
+        if state and not cls._on_server(state):
+            Logger.report(f"Seeding: dataset {cls.run_id} is gone from {cls._host}, seeding again", LogType.ERROR)
+            state = {}
+        created, next_index, ids = state.get("created", 0), state.get("next", 0), state.get("ids", [])
+        if created >= count:
+            Logger.report(f"Seeding: {created} test cases of dataset {cls.run_id} already exist on {cls._host}")
+            return True
+        if created:
+            Logger.report(f"Seeding: resuming dataset {cls.run_id} at {created} of {count}")
+
+        pool = Pool(cls.concurrency)
+        started, start_created = time.monotonic(), created
+        while created < count:
+            batch = range(next_index, next_index + min(cls.batch_size, count - created))
+            responses = [response for response in pool.imap_unordered(cls._create, batch) if response is not None]
+            succeeded = len(responses)
+            created += succeeded
+            next_index = batch.stop
+            # first and latest created row, probed before the dataset is reused
+            test_id = (cls._json(responses[0]) or {}).get("test_id") if responses else None
+            if test_id is not None:
+                ids = [ids[0] if ids else test_id, test_id]
+            cls.save_state({"created": created, "next": next_index, "ids": ids})
+
+            elapsed = time.monotonic() - started
+            rate = (created - start_created) / elapsed if elapsed else 0.0
+            eta = f", ETA {(count - created) / rate:.0f} s" if rate else ""
+            Logger.report(f"Seeding: {created}/{count} ({created / count:.0%}), {rate:.0f} rows/s{eta}")
+            if len(batch) - succeeded > len(batch) * cls.max_failure_ratio:
+                Logger.report(
+                    f"Seeding stopped: {len(batch) - succeeded} of {len(batch)} creates failed", LogType.ERROR
+                )
+                return False
+        return True
+
+    @staticmethod
+    def _items(payload):
+        """Test cases of a list response: a list, or a dict with results/tests/items."""
+        if isinstance(payload, list):
+            return payload
+        if isinstance(payload, dict):
+            for key in ("results", "tests", "items"):
+                if isinstance(payload.get(key), list):
+                    return payload[key]
+        return []
+
+    @classmethod
+    def sweep(cls):
+        """Delete seeded test cases and orphans left by interrupted Tests sequences of this run id."""
+        if not cls.login():
+            return
+        client = cls._create_client()
+        ids = array("Q")
+        prefixes = tuple(f"{prefix} {cls.run_id}-" for prefix in cls.name_prefixes)
+        page, previous_first = 1, None
+        while True:
+            response = client.get(f"/api/tests?page={page}&size={cls.page_size}", headers=cls._headers)
+            try:
+                items = cls._items(response.json()) if response.status_code == 200 else []
+            except ValueError:
+                items = []
+            first = items[0].get("id") if items and isinstance(items[0], dict) else None
+            if not items or first == previous_first:
+                break
+            for item in items:
+                name = str(item.get("name", ""))
+                test_id = item.get("id", item.get("test_id"))
+                if test_id is not None and name.startswith(prefixes):
+                    ids.append(int(test_id))
+            if len(items) < cls.page_size:
+                break
+            page, previous_first = page + 1, first
+
+        deleted = 0
+        pool = Pool(cls.concurrency)
+        for start in range(0, len(ids), cls.batch_size):
+            batch = ids[start : start + cls.batch_size]
+            responses = pool.imap_unordered(lambda test_id: cls._send("DELETE", f"/api/tests/{test_id}"), batch)
+            deleted += sum(response is not None for response in responses)
+            Logger.report(f"Sweeping: {deleted}/{len(ids)} deleted")
+        cls.save_state(None)
+        Logger.report(
+            f"Sweeping: {deleted} of {len(ids)} seeded and orphaned test cases of run {cls.run_id} deleted from {cls._host}"
+        )
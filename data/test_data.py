@@ -1,44 +1,50 @@
 """Test case data class."""
 
+import json
+
 
 class NewTest:
-    """Test case data storage."""
+    """Test case data storage. Slots keep a body object small; unset fields are left out of the JSON."""
 
-    def __init__(self):
-        self.test_data = {}
+    __slots__ = ("id", "name", "description", "author", "status", "executor")
 
     def set_test_id(self, id):
-        self.test_data["id"] = id
+        self.id = id
 
     def set_test_name(self, name):
-        self.test_data["name"] = name
+        self.name = name
 
     def set_test_desc(self, description):
-        self.test_data["description"] = description
+        self.description = description
 
     def set_test_author(self, author):
-        self.test_data["author"] = author
+        self.author = author
 
     def set_test_status(self, status):
-        self.test_data["status"] = status
+        self.status = status
 
     def set_test_executor(self, executor):
-        self.test_data["executor"] = executor
+        self.executor = executor
 
     def get_test_id(self):
-        return self.test_data["id"]
+        return self.id
 
     def get_test_name(self):
-        return self.test_data["name"]
+        return self.name
 
     def get_test_desc(self):
-        return self.test_data["description"]
+        return self.description
 
     def get_test_author(self):
-        return self.test_data["author"]
+        return self.author
 
     def get_test_status(self):
-        return self.test_data["status"]
+        return self.status
 
     def get_test_executor(self):
-        return self.test_data["executor"]
+        return self.executor
+
+    def to_json(self):
+        """Test data as compact JSON bytes, ready to be sent as a request body."""
+        test_data = {field: getattr(self, field) for field in self.__slots__ if hasattr(self, field)}
+        return json.dumps(test_data, separators=(",", ":")).encode()
@@ -1,15 +1,515 @@
 """Locust load tests main file."""
 
-from locust import events
+import time
+from pathlib import Path
 
+import gevent
+from flask import jsonify, request
+from locust import constant, events
+from locust.runners import MasterRunner, WorkerRunner
+
+from data.payload_pool import PayloadPool
+from data.seeder import DatasetSeeder
 from tests.register_user import RegisteredHttpUser
 from tests.test_lists import Lists
+from tests.test_pagination import Pagination
+from tests.test_replay import Replay
 from tests.test_stats import Stats
 from tests.test_tests import Tests
-from utils.logger import Logger, LogType
+from utils.arrival_rate import ArrivalRate, ArrivalRateShape, ArrivalSpacing
+from utils.connection_policy import ConnectionMode, ConnectionPolicy
+from utils.coordinated_omission import LatencyCorrection
+from utils.http_engine import ClientEngine, HttpEngine
+from utils.latency_histogram import LatencyRecorder
+from utils.log_replay import LogReplay
+from utils.log_sampler import LogSampler, SamplingPolicy
+from utils.log_writer import OverflowPolicy
+from utils.logger import Logger, LogMode, LogType
+from utils.metrics_exporter import MetricsExporter
+from utils.pagination_sweep import PaginationSweep
+from utils.phase_timing import PhaseTiming
+from utils.profiler import Profiler
+from utils.results_store import ResultsStore
+from utils.saturation import Saturation, SaturationShape
+from utils.scenario import RequestStep
+from utils.session_pool import SessionPool, SessionPoolMode
+from utils.slo import SloGate
+from utils.transaction import Transaction
 from utils.users_loader import UsersLoader
 
 
+@events.init_command_line_parser.add_listener
+def on_init_command_line_parser(parser):
+    """Register custom command line options."""
+    parser.add_argument(
+        "--client-engine",
+        choices=[engine.value for engine in ClientEngine],
+        default=ClientEngine.REQUESTS.value,
+        help="HTTP client: python-requests (requests) or geventhttpclient (fast)",
+    )
+    parser.add_argument(
+        "--connection-mode",
+        choices=[mode.value for mode in ConnectionMode],
+        default=ConnectionMode.KEEP_ALIVE.value,
+        help="Connection strategy: reuse connections (keep-alive), a new connection per request (per-request) "
+        "or per --connection-requests requests (per-n). Requests engine only",
+    )
+    parser.add_argument(
+        "--connection-requests",
+        type=int,
+        default=100,
+        help="Requests per connection with --connection-mode per-n",
+    )
+    parser.add_argument(
+        "--connection-max-idle",
+        type=float,
+        default=0,
+        help="Close pooled connections idle for longer than this many seconds before reuse (0 - no limit)",
+    )
+    parser.add_argument(
+        "--pool-size",
+        type=int,
+        default=10,
+        help="Connections kept per host by each HTTP client",
+    )
+    parser.add_argument(
+        "--no-dns-cache",
+        action="store_true",
+        default=False,
+        help="Resolve the host for every new connection instead of once per process",
+    )
+    parser.add_argument(
+        "--arrival-rate",
+        action="append",
+        default=None,
+        help="Open model: target iterations (task sequences)/s as GROUP=RATE per user group, or a total RATE split "
+        "by weight. Repeatable. Users are added to hold the rate",
+    )
+    parser.add_argument(
+        "--arrival-spacing",
+        choices=[spacing.value for spacing in ArrivalSpacing],
+        default=ArrivalSpacing.FIXED.value,
+        help="Gaps between iterations with --arrival-rate: fixed or poisson (random, exponential)",
+    )
+    parser.add_argument(
+        "--arrival-max-users",
+        type=int,
+        default=1000,
+        help="Max users with --arrival-rate. Running out of them is reported as an error",
+    )
+    parser.add_argument(
+        "--arrival-max-lag",
+        type=float,
+        default=1.0,
+        help="Drop iterations that are more than this many seconds behind schedule with --arrival-rate",
+    )
+    parser.add_argument(
+        "--saturation-search",
+        action="store_true",
+        default=False,
+        help="Raise users in steps until throughput stops scaling or latency knees up, instead of --users",
+    )
+    parser.add_argument(
+        "--saturation-start-users",
+        type=int,
+        default=5,
+        help="Users of the first saturation search stage",
+    )
+    parser.add_argument(
+        "--saturation-step-users",
+        type=int,
+        default=5,
+        help="Users added per saturation search stage",
+    )
+    parser.add_argument(
+        "--saturation-max-users",
+        type=int,
+        default=200,
+        help="Stop the saturation search at this many users",
+    )
+    parser.add_argument(
+        "--saturation-stage-time",
+        type=float,
+        default=20,
+        help="Min seconds to measure each saturation search stage",
+    )
+    parser.add_argument(
+        "--saturation-max-stage-time",
+        type=float,
+        default=60,
+        help="Max seconds to wait for stable metrics in a saturation search stage",
+    )
+    parser.add_argument(
+        "--saturation-report",
+        default="reports/saturation.csv",
+        help="CSV file for the saturation search table",
+    )
+    parser.add_argument(
+        "--slo",
+        action="append",
+        default=None,
+        help="SLO threshold 'ENDPOINT: METRIC < VALUE' (metrics p50, p95, p99 in ms, error_rate, rps), repeatable. "
+        "The run exits with code 1 if any is breached",
+    )
+    parser.add_argument(
+        "--slo-abort",
+        action="store_true",
+        default=False,
+        help="Check latency and error rate SLOs during the run and stop early once one is clearly breached",
+    )
+    parser.add_argument(
+        "--slo-verdict",
+        default="reports/slo.json",
+        help="JSON file for the SLO verdict",
+    )
+    parser.add_argument(
+        "--latency-histogram",
+        action="store_true",
+        default=False,
+        help="Record response times per endpoint in microsecond resolution histograms and export them per interval",
+    )
+    parser.add_argument(
+        "--latency-interval",
+        type=float,
+        default=5.0,
+        help="Seconds per exported latency histogram interval",
+    )
+    parser.add_argument(
+        "--latency-file",
+        default="reports/latency_histogram.jsonl",
+        help="JSON Lines file for latency histogram intervals",
+    )
+    parser.add_argument(
+        "--latency-correction",
+        action="store_true",
+        default=False,
+        help="Report coordinated omission corrected latency next to the measured one",
+    )
+    parser.add_argument(
+        "--latency-correction-flag",
+        type=float,
+        default=0.1,
+        help="Flag endpoints whose corrected p99 is more than this fraction above the measured p99",
+    )
+    parser.add_argument(
+        "--latency-correction-report",
+        default="reports/latency_corrected.csv",
+        help="CSV file for raw and corrected latency percentiles",
+    )
+    parser.add_argument(
+        "--phase-timing",
+        action="store_true",
+        default=False,
+        help="Record connection reuse, connect time, TTFB and download time per endpoint (requests engine)",
+    )
+    parser.add_argument(
+        "--phase-report",
+        default="reports/phases.csv",
+        help="CSV file for the request phase columns per endpoint",
+    )
+    parser.add_argument(
+        "--results-dir",
+        default="",
+        help="Archive per-endpoint results of every run in this directory for tools.compare_runs (empty - off)",
+    )
+    parser.add_argument(
+        "--metrics-port",
+        type=int,
+        default=0,
+        help="Serve live OpenMetrics text at http://HOST:PORT/metrics from master or a standalone run (0 - off)",
+    )
+    parser.add_argument(
+        "--metrics-host",
+        default="0.0.0.0",
+        help="Address of the --metrics-port endpoint",
+    )
+    parser.add_argument(
+        "--metrics-interval",
+        type=float,
+        default=1.0,
+        help="Seconds between refreshes of the OpenMetrics endpoint",
+    )
+    parser.add_argument(
+        "--profile-seconds",
+        type=float,
+        default=0,
+        help="Profile each load generator process for this many seconds (0 - only on request via /profile)",
+    )
+    parser.add_argument(
+        "--profile-after",
+        type=float,
+        default=0,
+        help="Seconds after test start to begin the --profile-seconds window",
+    )
+    parser.add_argument(
+        "--profile-dir",
+        default="reports/profiles",
+        help="Directory for collapsed stack and summary files of profiling windows",
+    )
+    parser.add_argument(
+        "--session-pool",
+        choices=[mode.value for mode in SessionPoolMode],
+        default=SessionPoolMode.OFF.value,
+        help="Share logged in sessions between users: off, lazy (login on first use) or eager (login at test start)",
+    )
+    parser.add_argument(
+        "--session-pool-size",
+        type=int,
+        default=0,
+        help="Number of pooled sessions (0 - one per loaded credential, lazy mode only; eager mode needs a size)",
+    )
+    parser.add_argument(
+        "--payload-pool-size",
+        type=int,
+        default=1000,
+        help="Pre-encoded test case bodies kept per request kind (0 - build bodies per request)",
+    )
+    parser.add_argument(
+        "--payload-size",
+        type=int,
+        default=0,
+        help="Pad test case descriptions with filler text up to this many characters",
+    )
+    parser.add_argument(
+        "--transactions",
+        action="store_true",
+        default=False,
+        help="Report each Tests, Lists and Stats task sequence as a TXN stats entry (time without waits, "
+        "failed if any request failed)",
+    )
+    parser.add_argument(
+        "--replay-log",
+        default="",
+        help="Replay this access log (common/combined log format or JSONL) with ReplayUser instead of the "
+        "synthetic user groups (empty - off)",
+    )
+    parser.add_argument(
+        "--replay-speed",
+        type=float,
+        default=1.0,
+        help="Replay speed-up factor, e.g. 5 replays an hour of the log in 12 minutes",
+    )
+    parser.add_argument(
+        "--pagination-sweep",
+        action="store_true",
+        default=False,
+        help="Add PaginationGroup users that sweep GET /api/tests over a page depth x page size grid",
+    )
+    parser.add_argument(
+        "--pagination-max-page",
+        type=int,
+        default=1000,
+        help="Deepest page of the pagination sweep; pages grow 1, 2, 5, 10, 20, 50, ...",
+    )
+    parser.add_argument(
+        "--pagination-sizes",
+        default="10,50,100",
+        help="Comma-separated page sizes of the pagination sweep",
+    )
+    parser.add_argument(
+        "--pagination-weight",
+        type=int,
+        default=1,
+        help="Weight of PaginationGroup next to the other user groups",
+    )
+    parser.add_argument(
+        "--pagination-report",
+        default="reports/pagination.csv",
+        help="CSV file for latency per pagination sweep cell",
+    )
+    parser.add_argument(
+        "--seed-tests",
+        type=int,
+        default=0,
+        help="Make sure this many seeded test cases exist before the load starts (0 - off)",
+    )
+    parser.add_argument(
+        "--seed-concurrency",
+        type=int,
+        default=50,
+        help="Concurrent create/delete requests while seeding or sweeping",
+    )
+    parser.add_argument(
+        "--seed-batch",
+        type=int,
+        default=1000,
+        help="Test cases created per batch; progress is reported and saved after every batch",
+    )
+    parser.add_argument(
+        "--seed-state",
+        default="results/seed_state.json",
+        help="Seeding progress file used to resume interrupted seeding",
+    )
+    parser.add_argument(
+        "--seed-run-id",
+        default="",
+        help="Run id in the names of seeded and created test cases, swept by --seed-teardown "
+        "(default: the dataset last seeded on the host, or a new one)",
+    )
+    parser.add_argument(
+        "--seed-teardown",
+        action="store_true",
+        default=False,
+        help="Delete seeded test cases and orphans of interrupted Tests sequences of the run id after the run",
+    )
+    parser.add_argument(
+        "--log-mode",
+        choices=[mode.value for mode in LogMode],
+        default=LogMode.COMPACT.value,
+        help="Request/response log format: one JSON line per request (compact), full text dump (debug) "
+        "or no logging at all (off)",
+    )
+    parser.add_argument(
+        "--log-sampling",
+        choices=[policy.value for policy in SamplingPolicy],
+        default=SamplingPolicy.ALL.value,
+        help="Which compact log records to keep: all, errors only or 1 in --log-sample-ratio",
+    )
+    parser.add_argument(
+        "--log-sample-ratio",
+        type=int,
+        default=10,
+        help="Keep 1 in N successful records per endpoint with --log-sampling ratio",
+    )
+    parser.add_argument(
+        "--log-rate-cap",
+        type=float,
+        default=0,
+        help="Max compact log records per second per endpoint (0 - no cap)",
+    )
+    parser.add_argument(
+        "--log-flush-interval",
+        type=float,
+        default=1.0,
+        help="Seconds between request/response log flushes",
+    )
+    parser.add_argument(
+        "--log-flush-bytes",
+        type=int,
+        default=1024 * 1024,
+        help="Flush the request/response log once this much data is queued",
+    )
+    parser.add_argument(
+        "--log-queue-size",
+        type=int,
+        default=10000,
+        help="Max request/response log records waiting to be written",
+    )
+    parser.add_argument(
+        "--log-overflow",
+        choices=[policy.value for policy in OverflowPolicy],
+        default=OverflowPolicy.BLOCK.value,
+        help="What to do when the request/response log queue is full",
+    )
+
+
+@events.init.add_listener
+def on_init(environment, runner=None, **kwargs):
+    """Parse SLO thresholds and run an arrival rate or saturation search shape instead of --users when requested."""
+    environment.events.report_to_master.add_listener(ArrivalRate.on_report_to_master)
+    environment.events.worker_report.add_listener(ArrivalRate.on_worker_report)
+    environment.events.report_to_master.add_listener(LatencyRecorder.on_report_to_master)
+    environment.events.worker_report.add_listener(LatencyRecorder.on_worker_report)
+    environment.events.report_to_master.add_listener(LatencyCorrection.on_report_to_master)
+    environment.events.worker_report.add_listener(LatencyCorrection.on_worker_report)
+    environment.events.report_to_master.add_listener(PhaseTiming.on_report_to_master)
+    environment.events.report_to_master.add_listener(ConnectionPolicy.on_report_to_master)
+    environment.events.worker_report.add_listener(ConnectionPolicy.on_worker_report)
+    environment.events.worker_report.add_listener(PhaseTiming.on_worker_report)
+    environment.events.report_to_master.add_listener(LogReplay.on_report_to_master)
+    environment.events.worker_report.add_listener(LogReplay.on_worker_report)
+
+    if runner is not None and not isinstance(runner, MasterRunner):
+        runner.register_message("profile", Profiler.on_profile_message)
+    if environment.web_ui:
+        add_profile_route(environment)
+
+    parsed_options = environment.parsed_options
+    if getattr(parsed_options, "pagination_sweep", False):
+        PaginationSweep.configure(parsed_options.pagination_max_page, parsed_options.pagination_sizes)
+        PaginationGroup.weight = max(parsed_options.pagination_weight, 1)
+        environment.user_classes.append(PaginationGroup)
+    if getattr(parsed_options, "replay_log", ""):
+        ReplayUser.weight = 1
+        environment.user_classes[:] = [ReplayUser]
+    if (
+        getattr(parsed_options, "session_pool", "") == SessionPoolMode.EAGER.value
+        and not parsed_options.session_pool_size
+    ):
+        # one login per credential row before the test starts could be millions of logins
+        raise ValueError("--session-pool eager needs --session-pool-size, 0 (every credential) is for lazy mode only")
+    if isinstance(runner, WorkerRunner) or parsed_options is None:
+        return
+    SloGate.configure(getattr(parsed_options, "slo", None))
+    if hasattr(parsed_options, "seed_tests"):
+        DatasetSeeder.configure(
+            environment,
+            environment.host,
+            parsed_options.seed_concurrency,
+            parsed_options.seed_batch,
+            parsed_options.seed_state,
+            HttpEngine.from_options(parsed_options),
+            parsed_options.seed_run_id,
+        )
+        # sent to workers with the spawn message, so their test cases carry the same run id
+        parsed_options.seed_run_id = DatasetSeeder.run_id
+    # seeding blocks here, before the load (and --run-time) starts
+    if getattr(parsed_options, "seed_tests", 0) and not DatasetSeeder.seed(parsed_options.seed_tests):
+        raise RuntimeError("Seeding test cases failed, see the log above")
+    if getattr(parsed_options, "metrics_port", 0):
+        MetricsExporter.start(
+            environment, parsed_options.metrics_host, parsed_options.metrics_port, parsed_options.metrics_interval
+        )
+    if getattr(parsed_options, "saturation_search", False):
+        if getattr(parsed_options, "arrival_rate", None):
+            raise ValueError("--saturation-search cannot be combined with --arrival-rate")
+        environment.shape_class = SaturationShape(
+            parsed_options.saturation_start_users,
+            parsed_options.saturation_step_users,
+            parsed_options.saturation_max_users,
+            parsed_options.saturation_stage_time,
+            parsed_options.saturation_max_stage_time,
+            parsed_options.spawn_rate or 1,
+            parsed_options.run_time,
+        )
+        environment.shape_class.runner = runner
+    if not getattr(parsed_options, "arrival_rate", None):
+        return
+    ArrivalRate.rates = ArrivalRate.parse_rates(parsed_options.arrival_rate, environment.user_classes)
+    if ArrivalRate.rates:
+        weights = {user_class.__name__: user_class.weight for user_class in environment.user_classes}
+        environment.shape_class = ArrivalRateShape(
+            weights, parsed_options.spawn_rate or 1, parsed_options.arrival_max_users, parsed_options.run_time
+        )
+        environment.shape_class.runner = runner
+
+
+def add_profile_route(environment):
+    """POST /profile?seconds=30 profiles every load generator process for a window while a test runs."""
+
+    @environment.web_ui.app.route("/profile", methods=["POST"])
+    @environment.web_ui.auth_required_if_enabled
+    def profile():
+        seconds = float(request.args.get("seconds", 30))
+        environment.runner.send_message("profile", {"seconds": seconds})
+        return jsonify({"profiling": True, "seconds": seconds})
+
+
+def get_worker_shard(environment):
+    """Get (worker index, worker count) of this process. Standalone run is worker 0 of 1."""
+    runner = getattr(environment, "runner", None)
+    if not isinstance(runner, WorkerRunner):
+        return 0, 1
+    worker_index = max(runner.worker_index, 0)
+    worker_count = max(getattr(environment.parsed_options, "expect_workers", 1) or 1, 1)
+    if worker_index >= worker_count:
+        Logger.log_message(
+            f"Worker index {worker_index} is out of --expect-workers {worker_count}, user shards overlap",
+            LogType.ERROR,
+        )
+    return worker_index % worker_count, worker_count
+
+
 @events.test_start.add_listener
 def on_test_start(**kwargs):
     """Init logger and load users."""
@@ -17,24 +517,145 @@ def on_test_start(**kwargs):
         parsed_options = kwargs.get("environment", {}).parsed_options
         if parsed_options and hasattr(parsed_options, "logfile") and parsed_options.logfile:
             Logger.init_logger(__name__, parsed_options.logfile)
+        if parsed_options and hasattr(parsed_options, "log_overflow"):
+            Logger.configure_request_log(
+                flush_interval=parsed_options.log_flush_interval,
+                flush_bytes=parsed_options.log_flush_bytes,
+                queue_size=parsed_options.log_queue_size,
+                overflow=OverflowPolicy(parsed_options.log_overflow),
+                mode=LogMode(parsed_options.log_mode),
+                sampler=LogSampler(
+                    policy=SamplingPolicy(parsed_options.log_sampling),
+                    ratio=parsed_options.log_sample_ratio,
+                    rate_cap=parsed_options.log_rate_cap,
+                ),
+            )
     except (AttributeError, KeyError):
         pass
 
     try:
-        UsersLoader.load_users()
+        worker_index, worker_count = get_worker_shard(kwargs.get("environment"))
+        UsersLoader.load_users(worker_index, worker_count)
         Logger.log_message("......... Initiating Load Test .......")
     except (FileNotFoundError, ValueError) as e:
         error_msg = f"Failed to load users: {str(e)}"
         Logger.log_message(error_msg, LogType.ERROR)
         raise
 
+    environment = kwargs.get("environment")
+    parsed_options = getattr(environment, "parsed_options", None)
+    if getattr(parsed_options, "slo_abort", False) and not isinstance(environment.runner, WorkerRunner):
+        SloGate.start_watching(environment)
+    if getattr(parsed_options, "latency_histogram", False):
+        if not isinstance(environment.runner, WorkerRunner):
+            LatencyRecorder.open(parsed_options.latency_file, parsed_options.latency_interval)
+        if not isinstance(environment.runner, MasterRunner):
+            LatencyRecorder.start(environment, parsed_options.latency_interval)
+    if getattr(parsed_options, "latency_correction", False) and not isinstance(environment.runner, MasterRunner):
+        LatencyCorrection.start(environment, parsed_options.latency_correction_flag)
+    if parsed_options and hasattr(parsed_options, "connection_mode"):
+        ConnectionPolicy.configure(
+            ConnectionMode(parsed_options.connection_mode),
+            parsed_options.connection_requests,
+            parsed_options.connection_max_idle,
+            parsed_options.pool_size,
+            not parsed_options.no_dns_cache,
+        )
+        engine = HttpEngine.from_options(parsed_options)
+        if ConnectionPolicy.mode != ConnectionMode.KEEP_ALIVE and engine != ClientEngine.REQUESTS:
+            Logger.log_message(
+                "--connection-mode needs --client-engine requests, connections are kept alive", LogType.ERROR
+            )
+    Transaction.enabled = getattr(parsed_options, "transactions", False)
+    if getattr(parsed_options, "replay_log", ""):
+        LogReplay.configure(parsed_options.replay_log, parsed_options.replay_speed, worker_index, worker_count)
+    if getattr(parsed_options, "phase_timing", False) and not isinstance(environment.runner, MasterRunner):
+        if HttpEngine.from_options(parsed_options) == ClientEngine.REQUESTS:
+            PhaseTiming.start(environment)
+        else:
+            Logger.log_message("--phase-timing needs --client-engine requests, phases not recorded", LogType.ERROR)
+    if parsed_options and not isinstance(environment.runner, MasterRunner):
+        if getattr(parsed_options, "arrival_rate", None):
+            ArrivalRate.start(
+                environment.user_classes,
+                ArrivalRate.parse_rates(parsed_options.arrival_rate, environment.user_classes),
+                ArrivalSpacing(parsed_options.arrival_spacing),
+                parsed_options.arrival_max_lag,
+                worker_index,
+                worker_count,
+            )
+        Profiler.directory = Path(getattr(parsed_options, "profile_dir", Profiler.directory))
+        Profiler.node = f"worker{worker_index}" if isinstance(environment.runner, WorkerRunner) else "local"
+        if getattr(parsed_options, "profile_seconds", 0) > 0:
+            gevent.spawn_later(parsed_options.profile_after, Profiler.start, parsed_options.profile_seconds)
+        if getattr(parsed_options, "replay_log", ""):
+            LogReplay.start(environment)
+        if getattr(parsed_options, "seed_run_id", ""):
+            DatasetSeeder.run_id = parsed_options.seed_run_id
+        RequestStep.set_constants(run_id=DatasetSeeder.run_id)
+        PayloadPool.init(
+            worker_index,
+            getattr(parsed_options, "payload_pool_size", 0),
+            getattr(parsed_options, "payload_size", 0),
+            DatasetSeeder.run_id,
+        )
+        SessionPool.init(
+            environment,
+            SessionPoolMode(getattr(parsed_options, "session_pool", SessionPoolMode.OFF.value)),
+            getattr(parsed_options, "session_pool_size", 0),
+        )
+
 
 @events.test_stop.add_listener
 def on_test_stop(**kwargs):
     """Test completion handler."""
+    environment = kwargs.get("environment")
+    if ArrivalRate.rates and not isinstance(environment.runner, WorkerRunner):
+        ArrivalRate.log_summary(time.time() - environment.stats.total.start_time)
+    if Saturation.stages and not isinstance(environment.runner, WorkerRunner):
+        Saturation.report(environment.parsed_options.saturation_report)
+    if not isinstance(environment.runner, WorkerRunner) and environment.parsed_options:
+        SloGate.verdict(environment, environment.parsed_options.slo_verdict)
+    Profiler.finish()
+    LatencyRecorder.stop(environment)
+    LatencyCorrection.stop(environment)
+    PhaseTiming.stop(environment)
+    if not isinstance(environment.runner, WorkerRunner):
+        LatencyRecorder.flush()
+    ArrivalRate.stop()
+    LogReplay.stop()
+    SessionPool.logout_all()
+    PayloadPool.clear()
+    Logger.close_request_log()
     Logger.log_message("........ Load Test Completed ........")
 
 
+@events.quitting.add_listener
+def on_quitting(environment, **kwargs):
+    """Write reports that need the final stats of all workers."""
+    if isinstance(environment.runner, WorkerRunner):
+        return
+    LatencyRecorder.close()
+    MetricsExporter.stop()
+    if getattr(environment.parsed_options, "results_dir", ""):
+        ResultsStore.save(environment, environment.parsed_options.results_dir)
+    if environment.parsed_options and hasattr(environment.parsed_options, "connection_mode"):
+        ConnectionPolicy.log_summary(
+            environment.stats.total.num_requests, HttpEngine.from_options(environment.parsed_options).value
+        )
+    if getattr(environment.parsed_options, "latency_correction", False):
+        LatencyCorrection.flag_ratio = environment.parsed_options.latency_correction_flag
+        LatencyCorrection.report(environment.parsed_options.latency_correction_report)
+    if getattr(environment.parsed_options, "phase_timing", False):
+        PhaseTiming.report(environment.parsed_options.phase_report)
+    if getattr(environment.parsed_options, "replay_log", ""):
+        LogReplay.log_summary()
+    if getattr(environment.parsed_options, "pagination_sweep", False):
+        PaginationSweep.report(environment.stats, environment.parsed_options.pagination_report)
+    if getattr(environment.parsed_options, "seed_teardown", False):
+        DatasetSeeder.sweep()
+
+
 class TestsGroup(RegisteredHttpUser):
     """CRUD operations group. Weight 4."""
 
@@ -54,3 +675,18 @@ class StatsGroup(RegisteredHttpUser):
 
     weight = 1
     tasks = [Stats]
+
+
+class PaginationGroup(RegisteredHttpUser):
+    """Pagination depth and page size sweep. Weight 0, added with --pagination-sweep."""
+
+    weight = 0
+    tasks = [Pagination]
+
+
+class ReplayUser(RegisteredHttpUser):
+    """Access log replay. Weight 0, replaces the groups above with --replay-log."""
+
+    weight = 0
+    wait_time = constant(0)
+    tasks = [Replay]
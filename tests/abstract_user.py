@@ -1,36 +1,99 @@
 """Base Locust user class."""
 
-from locust import HttpUser
+from locust import User
+from locust.exception import LocustError
 
+from utils.arrival_rate import ArrivalRate
+from utils.http_engine import ClientEngine, HttpEngine
+from utils.logger import Logger, LogType
+from utils.utils import Utils
 
-class AbstractUser(HttpUser):
-    """Base HTTP user. Stores user data and token."""
+
+class UserState:
+    """Login state of a user. Slots instead of a dict, so tens of thousands of users fit in a worker."""
+
+    __slots__ = ("username", "token", "headers")
+
+    def __init__(self):
+        self.username = None
+        self.token = None
+        self.headers = None
+
+
+class AbstractUser(User):
+    """Base HTTP user. Stores user data and token.
+
+    HTTP client engine is selected with --client-engine (python-requests by default), connection reuse
+    with --connection-mode (see ConnectionPolicy). Headers are shared read-only objects per token.
+    """
 
     abstract = True
+    client_engine = ClientEngine.REQUESTS
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
-        self.user_data = {}
+        if self.host is None:
+            raise LocustError(
+                "You must specify the base host. Either in the host attribute in the User class, "
+                "or on the command line using the --host option."
+            )
+        self.engine = HttpEngine.from_options(self.environment.parsed_options, self.client_engine)
+        self.client = HttpEngine.create_client(self.engine, self.environment, self.host, user=self)
+        self.state = UserState()
+
+    @property
+    def username(self):
+        return self.state.username
+
+    @username.setter
+    def username(self, username):
+        self.state.username = username
 
     def set_username(self, username):
         """Set username."""
-        self.user_data["username"] = username
+        self.state.username = username
 
     def get_username(self):
         """Get username."""
-        if "username" in self.user_data:
-            return self.user_data["username"]
-        else:
-            return None
+        return self.state.username
 
     def set_token(self, token):
         """Set auth token."""
-        self.user_data["token"] = token
+        self.state.token = token
+        self.state.headers = None
 
     def get_token(self):
         """Get auth token."""
-        return self.user_data.get("token")
+        return self.state.token
+
+    def get_headers(self):
+        """Get JSON headers with auth token."""
+        if self.state.headers is None:
+            self.state.headers = Utils.get_shared_headers(self.state.token, HttpEngine.default_headers(self.engine))
+        return self.state.headers
 
     def clear_user_data(self):
         """Clear user data."""
-        self.user_data.clear()
+        self.state = UserState()
+
+
+class UserStateMixin:
+    """Task set access to the username and headers of its user, without per task set copies."""
+
+    current_transaction = None
+
+    @property
+    def username(self):
+        return self.user.get_username()
+
+    @property
+    def headers(self):
+        return self.user.get_headers()
+
+    def on_start(self):
+        """Wait for the arrival slot of the sequence, then stop the task set if the user has no token."""
+        ArrivalRate.wait_for_slot(self)
+        if not self.user.get_token():
+            error_msg = f"Cannot proceed: token is missing for user {self.username}"
+            Logger.log_message(error_msg, LogType.ERROR)
+            self.interrupt(reschedule=False)
@@ -4,17 +4,21 @@ from locust import between
 
 from tests.abstract_user import AbstractUser
 from utils.logger import Logger, LogType
+from utils.session_pool import SessionPool
 from utils.users_loader import UsersLoader
 from utils.utils import Utils
 
 
 class RegisteredHttpUser(AbstractUser):
-    """User with auth. Auto login on start, logout on stop."""
+    """User with auth. Auto login on start, logout on stop.
+
+    With the session pool enabled, the user takes a shared logged in session instead.
+    """
 
     wait_time = between(1, 2)
     abstract = True
 
-    username = ""
+    auth_session = None
 
     @classmethod
     def verify_login(cls, response, username):
@@ -40,8 +44,34 @@ class RegisteredHttpUser(AbstractUser):
             return False
         return True
 
+    def context(self):
+        """Request event context. Pooled session is used to detect expired sessions."""
+        if self.auth_session is None:
+            return {}
+        return {"auth_session": self.auth_session}
+
+    def get_token(self):
+        """Get auth token. Pooled session is logged in again if it expired."""
+        if self.auth_session is None:
+            return super().get_token()
+        if not SessionPool.ensure_valid(self.auth_session):
+            return None
+        return self.auth_session.token
+
+    def get_headers(self):
+        """Get JSON headers with auth token (and session cookie for pooled session)."""
+        if self.auth_session is None:
+            return super().get_headers()
+        return self.auth_session.headers
+
     def on_start(self):
-        """Load user from CSV and login."""
+        """Load user from CSV and login, or take a session from the pool."""
+        if SessionPool.enabled():
+            self.auth_session = SessionPool.acquire()
+            self.username = self.auth_session.username
+            super().set_username(self.username)
+            return
+
         try:
             user = UsersLoader.get_user()
             if not user or "username" not in user:
@@ -79,7 +109,12 @@ class RegisteredHttpUser(AbstractUser):
             Logger.log_message(error_msg, LogType.ERROR)
 
     def on_stop(self):
-        """Logout user."""
+        """Logout user. Pooled sessions are logged out once at test stop."""
+        if self.auth_session is not None:
+            self.auth_session = None
+            super().clear_user_data()
+            return
+
         token = super().get_token()
         headers = Utils.get_base_headers()
         if token:
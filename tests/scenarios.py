@@ -0,0 +1,111 @@
+"""Request definitions of the task sets."""
+
+import random
+
+from data.payload_pool import PayloadKind
+from utils.scenario import RequestStep
+
+# run_id is filled in at test start
+RequestStep.set_constants(run_id="")
+
+CREATE_TEST = RequestStep(
+    name="Create new Test",
+    log_name="Create Test",
+    method="POST",
+    url="/api/tests/new",
+    expected_status=201,
+    body={
+        "name": "API Test {run_id}-{ms}",
+        "description": "Checking the creation of a new test by {username}. Endpoint: /api/tests/new",
+    },
+    payload=PayloadKind.CREATE,
+    extract={"test_id": "test_id"},
+    success="Test successfully created by user: {username}",
+    failure="Test creation failed by user: {username}",
+)
+
+GET_TEST = RequestStep(
+    name="Get Test Case by ID",
+    log_name="Get Test",
+    method="GET",
+    url="/api/tests/{test_id}",
+    requires="test_id",
+    success="Test successfully received by user: {username}",
+    failure="Test receiving failed by user: {username}",
+)
+
+UPDATE_TEST = RequestStep(
+    name="Update Test Case by ID",
+    log_name="Update Test",
+    method="PUT",
+    url="/api/tests/{test_id}",
+    body={
+        "name": "Updated API Test {run_id}-{ms}",
+        "description": "Checking the update a test by {username}.",
+    },
+    payload=PayloadKind.UPDATE,
+    requires="test_id",
+    success="Test successfully changed by user: {username}",
+    failure="Test changing failed by user: {username}",
+)
+
+PARTIAL_UPDATE_TEST = RequestStep(
+    name="Partial Update Test Case by ID",
+    log_name="Partial Update Test",
+    method="PATCH",
+    url="/api/tests/{test_id}",
+    body={"description": "Checking the update a test description by {username}."},
+    payload=PayloadKind.PARTIAL_UPDATE,
+    requires="test_id",
+    success="Test description successfully changed by user: {username}",
+    failure="Test description changing failed by user: {username}",
+)
+
+RUN_TEST = RequestStep(
+    name="Run Test",
+    log_name="Run Test",
+    method="POST",
+    url="/api/tests/{test_id}/status",
+    body={"status": "PASS"},
+    requires="test_id",
+    success="Test successfully run by user: {username}",
+    failure="Test running failed by user: {username}",
+)
+
+DELETE_TEST = RequestStep(
+    name="Delete Test Case by ID",
+    log_name="Delete Test",
+    method="DELETE",
+    url="/api/tests/{test_id}",
+    requires="test_id",
+    success="Test successfully deleted by user: {username}",
+    failure="Test deleting failed by user: {username}",
+)
+
+LIST_TESTS = RequestStep(
+    name="List Test Cases",
+    log_name="List Tests",
+    method="GET",
+    url="/api/tests",
+    success="List of tests successfully received by user: {username}",
+    failure="List of tests receiving failed by user: {username}",
+)
+
+LIST_TESTS_WITH_PARAMS = RequestStep(
+    name="List Test Cases with params",
+    log_name="List Tests with params",
+    method="GET",
+    url="/api/tests?page={page}&size={size}",
+    params={"page": lambda: random.randint(1, 3), "size": lambda: random.randint(1, 5)},
+    success="List of tests successfully received by user: {username}",
+    failure="List of tests receiving failed by user: {username}",
+)
+
+GET_STATS = RequestStep(
+    name="Get Stats",
+    log_name="Get Stats",
+    method="GET",
+    url="/api/getstat",
+    success="Test stats successfully received by user: {username}",
+    failure="Test stats receiving failed by user: {username}",
+)
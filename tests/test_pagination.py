@@ -0,0 +1,20 @@
+"""Pagination depth and page size sweep."""
+
+from locust import SequentialTaskSet, task
+
+from tests.abstract_user import UserStateMixin
+from utils.pagination_sweep import PaginationSweep
+
+
+class Pagination(UserStateMixin, SequentialTaskSet):
+    """Test case list pages across the (page, size) grid of PaginationSweep."""
+
+    @task
+    def get_next_page(self):
+        """Get the next cell of the sweep grid."""
+        PaginationSweep.next_step()(self)
+
+    @task
+    def exit_task_execution(self):
+        """End task execution."""
+        self.interrupt()
@@ -0,0 +1,29 @@
+"""Replay of a recorded access log."""
+
+from locust import TaskSet, task
+
+from tests.abstract_user import UserStateMixin
+from utils.log_replay import LogReplay
+
+
+class Replay(UserStateMixin, TaskSet):
+    """Requests of the access log sessions assigned to this user, sent when they are due."""
+
+    def on_start(self):
+        """Check the token, then take sessions of the log."""
+        super().on_start()
+        self.test_id = None
+        self.replay_target = None
+        # session -> id of the test case it created in the replay
+        self.test_ids = {}
+        self.last_test_id = None
+        LogReplay.register(self)
+
+    def on_stop(self):
+        """Hand the sessions over to other users."""
+        LogReplay.unregister(self)
+
+    @task
+    def replay_next(self):
+        """Send the next due request."""
+        LogReplay.replay(self)
@@ -0,0 +1,160 @@
+"""Compare a stored run with a baseline run per endpoint.
+
+Latency distributions are compared with the two-sample Kolmogorov-Smirnov test. An endpoint is a
+significant regression (or improvement) when the test rejects equal distributions at --alpha and p50 or
+p95 moved by at least --min-change, so tiny shifts of very large samples are not reported.
+Runs are given as a file, a run id prefix, 'latest' or 'previous'. Exits with code 1 on regressions
+with --fail-on-regression.
+
+    python -m tools.compare_runs                          # latest run against the previous one
+    python -m tools.compare_runs --baseline 20260101-1000 --run latest --fail-on-regression
+    python -m tools.compare_runs --list
+"""
+
+import argparse
+import math
+import sys
+
+from utils.latency_histogram import AGGREGATED
+from utils.results_store import ResultsStore
+
+# options that do not change the load, ignored when comparing configs
+IGNORED_OPTIONS = {"csv_prefix", "html_file", "logfile", "json_file", "results_dir", "loglevel", "config"}
+
+
+def kolmogorov_p(statistic, first_count, second_count):
+    """Asymptotic p-value of the two-sample KS statistic (Numerical Recipes approximation)."""
+    effective = math.sqrt(first_count * second_count / (first_count + second_count))
+    value = (effective + 0.12 + 0.11 / effective) * statistic
+    if value < 0.3:
+        return 1.0
+    total = sum(2 * (-1) ** (k - 1) * math.exp(-2 * k * k * value * value) for k in range(1, 101))
+    return min(max(total, 0.0), 1.0)
+
+
+def ks_test(first, second):
+    """(signed statistic, p-value) of two {value: count} distributions. Positive: second is slower."""
+    first_count, second_count = sum(first.values()), sum(second.values())
+    first_seen = second_seen = 0
+    statistic = 0.0
+    for value in sorted(first.keys() | second.keys()):
+        first_seen += first.get(value, 0)
+        second_seen += second.get(value, 0)
+        difference = first_seen / first_count - second_seen / second_count
+        if abs(difference) > abs(statistic):
+            statistic = difference
+    return statistic, kolmogorov_p(abs(statistic), first_count, second_count)
+
+
+def percentile(distribution, percent):
+    """Value at percent (0-100) of a {value: count} distribution."""
+    count = sum(distribution.values())
+    rank = max(count * percent / 100, 1)
+    seen = 0
+    for value in sorted(distribution):
+        seen += distribution[value]
+        if seen >= rank:
+            return value
+    return 0.0
+
+
+def compare(baseline, run, alpha=0.01, min_change=0.05, min_requests=30):
+    """Rows per endpoint present in both runs, Aggregated last."""
+    rows = []
+    names = sorted(baseline["endpoints"].keys() & run["endpoints"].keys(), key=lambda name: (name == AGGREGATED, name))
+    for name in names:
+        before, after = baseline["endpoints"][name], run["endpoints"][name]
+        row = {
+            "endpoint": name,
+            "requests": (before["requests"], after["requests"]),
+            "rps": (before["rps"], after["rps"]),
+            "error_rate": tuple(
+                side["failures"] / side["requests"] if side["requests"] else 0.0 for side in (before, after)
+            ),
+            "p50": (percentile(before["response_times"], 50), percentile(after["response_times"], 50)),
+            "p95": (percentile(before["response_times"], 95), percentile(after["response_times"], 95)),
+            "statistic": 0.0,
+            "p_value": 1.0,
+            "verdict": "too few requests",
+        }
+        before_count, after_count = sum(before["response_times"].values()), sum(after["response_times"].values())
+        if min(before_count, after_count) >= min_requests:
+            row["statistic"], row["p_value"] = ks_test(before["response_times"], after["response_times"])
+            change = max(
+                abs(row[key][1] - row[key][0]) / row[key][0] if row[key][0] else float(row[key][1] > 0)
+                for key in ("p50", "p95")
+            )
+            if row["p_value"] < alpha and change >= min_change:
+                row["verdict"] = "REGRESSION" if row["statistic"] > 0 else "improvement"
+            else:
+                row["verdict"] = "no change"
+        rows.append(row)
+    return rows
+
+
+def config_differences(baseline, run):
+    """'option: before -> after' for options that differ between the runs."""
+    before, after = baseline["config"], run["config"]
+    differences = []
+    for key in sorted(before.keys() | after.keys()):
+        if key not in IGNORED_OPTIONS and before.get(key) != after.get(key):
+            differences.append(f"{key}: {before.get(key)} -> {after.get(key)}")
+    if baseline["target"] != run["target"] and before.get("host") == after.get("host"):
+        differences.append(f"target: {baseline['target']} -> {run['target']}")
+    if baseline["host"]["hostname"] != run["host"]["hostname"]:
+        differences.append(f"load generator: {baseline['host']['hostname']} -> {run['host']['hostname']}")
+    return differences
+
+
+def format_rows(rows):
+    lines = [
+        f"{'Endpoint':<40} {'requests':>19} {'p50 ms':>17} {'p95 ms':>17} {'req/s':>19} {'errors':>15} "
+        f"{'KS D':>6} {'p-value':>8}  verdict"
+    ]
+    for row in rows:
+        requests, p50, p95, rps, errors = row["requests"], row["p50"], row["p95"], row["rps"], row["error_rate"]
+        lines.append(
+            f"{row['endpoint']:<40} {requests[0]:>8}->{requests[1]:<8} {p50[0]:>7g}->{p50[1]:<7g} "
+            f"{p95[0]:>7g}->{p95[1]:<7g} {rps[0]:>8.1f}->{rps[1]:<8.1f} {errors[0]:>6.1%}->{errors[1]:<6.1%} "
+            f"{abs(row['statistic']):>6.3f} {row['p_value']:>8.2g}  {row['verdict']}"
+        )
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--results-dir", default="results", help="Results store directory")
+    parser.add_argument("--baseline", default="previous", help="Baseline run (default: previous)")
+    parser.add_argument("--run", default="latest", help="Run to check (default: latest)")
+    parser.add_argument("--alpha", type=float, default=0.01, help="Significance level of the KS test")
+    parser.add_argument("--min-change", type=float, default=0.05, help="Min relative p50 or p95 change to report")
+    parser.add_argument("--min-requests", type=int, default=30, help="Endpoints with fewer requests are skipped")
+    parser.add_argument("--fail-on-regression", action="store_true", help="Exit with code 1 on regressions")
+    parser.add_argument("--list", action="store_true", help="List stored runs and exit")
+    args = parser.parse_args(argv)
+
+    if args.list:
+        for path in ResultsStore.runs(args.results_dir):
+            print(ResultsStore.describe(ResultsStore.load(path)))
+        return
+
+    baseline = ResultsStore.load(ResultsStore.find(args.results_dir, args.baseline))
+    run = ResultsStore.load(ResultsStore.find(args.results_dir, args.run))
+    print(f"baseline {ResultsStore.describe(baseline)}")
+    print(f"run      {ResultsStore.describe(run)}")
+    differences = config_differences(baseline, run)
+    if differences:
+        print("config differs: " + "; ".join(differences))
+    print()
+    rows = compare(baseline, run, args.alpha, args.min_change, args.min_requests)
+    print(format_rows(rows))
+
+    regressions = [row["endpoint"] for row in rows if row["verdict"] == "REGRESSION"]
+    improvements = [row["endpoint"] for row in rows if row["verdict"] == "improvement"]
+    print(f"\n{len(regressions)} regressions, {len(improvements)} improvements")
+    if regressions and args.fail_on_regression:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
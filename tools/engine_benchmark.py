@@ -0,0 +1,100 @@
+"""Side-by-side throughput of the python-requests and geventhttpclient engines.
+
+Runs the locustfile once per engine against the same target in a single worker process and reports
+requests/s and requests per CPU-second (requests/s one fully busy core would sustain).
+
+    python -m tools.engine_benchmark --host http://127.0.0.1:8000 --users 50 --run-time 30s
+"""
+
+import argparse
+import csv
+import resource
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+from utils.http_engine import ClientEngine
+
+BASE_DIR = Path(__file__).parent.parent
+
+
+def run_locust(engine, host, users, spawn_rate, run_time, csv_prefix, extra_args=()):
+    """Run one headless locust process and return (aggregated stats row, CPU seconds used)."""
+    command = [
+        sys.executable,
+        "-m",
+        "locust",
+        "--config=config.yml",
+        "--headless",
+        "--only-summary",
+        f"--host={host}",
+        f"--users={users}",
+        f"--spawn-rate={spawn_rate}",
+        f"--run-time={run_time}",
+        f"--client-engine={engine.value}",
+        f"--csv={csv_prefix}",
+        # benchmark runs must not become the latest runs of tools.compare_runs
+        "--results-dir=",
+        *extra_args,
+    ]
+    usage_before = resource.getrusage(resource.RUSAGE_CHILDREN)
+    subprocess.run(command, cwd=BASE_DIR, check=False, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    usage_after = resource.getrusage(resource.RUSAGE_CHILDREN)
+    cpu_seconds = (usage_after.ru_utime - usage_before.ru_utime) + (usage_after.ru_stime - usage_before.ru_stime)
+
+    with open(f"{csv_prefix}_stats.csv", encoding="utf-8") as stats_file:
+        for row in csv.DictReader(stats_file):
+            if row["Name"] == "Aggregated":
+                return row, cpu_seconds
+    raise ValueError(f"No aggregated row in {csv_prefix}_stats.csv")
+
+
+def format_table(results):
+    """Format benchmark results as a text table."""
+    lines = [f"{'engine':<10} {'requests':>10} {'failures':>10} {'req/s':>10} {'cpu s':>8} {'req/s/core':>11}"]
+    for engine, row, cpu_seconds in results:
+        requests_count = int(row["Request Count"])
+        per_core = requests_count / cpu_seconds if cpu_seconds else 0.0
+        lines.append(
+            f"{engine.value:<10} {requests_count:>10} {int(row['Failure Count']):>10} "
+            f"{float(row['Requests/s']):>10.1f} {cpu_seconds:>8.2f} {per_core:>11.1f}"
+        )
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="http://127.0.0.1:8000", help="Target host")
+    parser.add_argument("--users", type=int, default=50, help="Simulated users per run")
+    parser.add_argument("--spawn-rate", type=float, default=50, help="Users spawned per second")
+    parser.add_argument("--run-time", default="30s", help="Duration of each run")
+    parser.add_argument(
+        "--engines",
+        nargs="+",
+        choices=[engine.value for engine in ClientEngine],
+        default=[engine.value for engine in ClientEngine],
+        help="Engines to compare",
+    )
+    args, extra_args = parser.parse_known_args(argv)
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for engine_name in args.engines:
+            engine = ClientEngine(engine_name)
+            row, cpu_seconds = run_locust(
+                engine,
+                args.host,
+                args.users,
+                args.spawn_rate,
+                args.run_time,
+                str(Path(tmp_dir, engine.value)),
+                extra_args,
+            )
+            results.append((engine, row, cpu_seconds))
+
+    print(format_table(results))
+
+
+if __name__ == "__main__":
+    main()
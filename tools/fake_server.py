@@ -0,0 +1,283 @@
+"""Stand-in TestMe API server for running the load tests without the Django app.
+
+Serves the endpoints the task sets use, keeps test cases in memory and sets the csrftoken/sessionid
+cookies on login. Latency, stalls and errors can be injected. One process serves all connections, so every
+request sees the same test cases and counters.
+
+    python -m tools.fake_server --port 8000 --latency 5 --jitter 5 --error-rate 0.01
+"""
+
+import argparse
+import asyncio
+import contextlib
+import itertools
+import json
+import random
+import secrets
+import signal
+import socket
+from http import HTTPStatus
+from urllib.parse import parse_qs, urlsplit
+
+MAX_TESTS = 100_000
+
+
+class FaultInjection:
+    """Delay and error settings applied to every response."""
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        stall_rate: float = 0.0,
+        stall: float = 1000.0,
+        error_rate: float = 0.0,
+        error_status: int = 500,
+    ):
+        self.latency = latency / 1000
+        self.jitter = jitter / 1000
+        self.stall_rate = stall_rate
+        self.stall = stall / 1000
+        self.error_rate = error_rate
+        self.error_status = error_status
+
+    def delay(self):
+        """Seconds to hold the next response."""
+        delay = self.latency
+        if self.jitter:
+            delay += random.uniform(0, self.jitter)
+        if self.stall_rate and random.random() < self.stall_rate:
+            delay += self.stall
+        return delay
+
+    def error(self):
+        """True if the next response should be an injected error."""
+        return bool(self.error_rate) and random.random() < self.error_rate
+
+
+class TestMeApi:
+    """In-memory test cases and the routes of the TestMe API used by the load tests."""
+
+    def __init__(self):
+        self.tests = {}
+        self.ids = itertools.count(1)
+        self.runs = 0
+
+    def handle(self, method, target, headers, body):
+        """(status, JSON body, extra headers) of a request."""
+        url = urlsplit(target)
+        parts = url.path.strip("/").split("/")
+        if parts[:2] == ["api", "auth"] and len(parts) == 3:
+            if parts[2] == "login" and method == "POST":
+                return self.login(body)
+            if parts[2] == "logout" and method == "GET":
+                return 200, {"detail": "Logged out"}, []
+        if parts == ["api", "getstat"] and method == "GET":
+            return 200, self.stats(), []
+        if parts[:2] != ["api", "tests"]:
+            return 404, {"detail": "Not found"}, []
+        if method != "GET" and "x-csrftoken" not in headers:
+            return 403, {"detail": "CSRF token missing"}, []
+        if len(parts) == 2 and method == "GET":
+            return 200, self.list_tests(parse_qs(url.query)), []
+        if parts[2:] == ["new"] and method == "POST":
+            return self.create_test(body)
+        if len(parts) >= 3 and parts[2].isdigit():
+            test_id = int(parts[2])
+            if test_id not in self.tests:
+                return 404, {"detail": "Not found"}, []
+            if parts[3:] == ["status"] and method == "POST":
+                self.runs += 1
+                self.tests[test_id]["status"] = self.json(body).get("status", "PASS")
+                return 200, {"test_id": test_id, "status": self.tests[test_id]["status"]}, []
+            if len(parts) == 3:
+                return self.test_case(method, test_id, body)
+        return 405, {"detail": "Method not allowed"}, []
+
+    def login(self, body):
+        credentials = self.json(body)
+        if not credentials.get("username") or not credentials.get("password"):
+            return 400, {"detail": "Username and password are required"}, []
+        cookies = [
+            (
+                "Set-Cookie",
+                f"csrftoken={secrets.token_hex(16)}; expires=Fri, 01 Jan 2038 00:00:00 GMT; Path=/; SameSite=Lax",
+            ),
+            ("Set-Cookie", f"sessionid={secrets.token_hex(16)}; HttpOnly; Path=/; SameSite=Lax"),
+        ]
+        return 200, {"detail": "Logged in"}, cookies
+
+    def create_test(self, body):
+        data = self.json(body)
+        if not data.get("name"):
+            return 400, {"detail": "Name is required"}, []
+        if len(self.tests) >= MAX_TESTS:
+            del self.tests[next(iter(self.tests))]
+        test_id = next(self.ids)
+        self.tests[test_id] = {"id": test_id, "name": data["name"], "description": data.get("description", "")}
+        return 201, {"test_id": test_id}, []
+
+    def test_case(self, method, test_id, body):
+        test = self.tests[test_id]
+        if method == "GET":
+            return 200, test, []
+        if method in ("PUT", "PATCH"):
+            data = self.json(body)
+            if method == "PUT" and not data.get("name"):
+                return 400, {"detail": "Name is required"}, []
+            test.update({key: data[key] for key in ("name", "description") if key in data})
+            return 200, test, []
+        if method == "DELETE":
+            del self.tests[test_id]
+            return 200, {"detail": "Deleted"}, []
+        return 405, {"detail": "Method not allowed"}, []
+
+    def list_tests(self, query):
+        page = max(int(query.get("page", ["1"])[0]), 1)
+        size = min(max(int(query.get("size", ["20"])[0]), 1), 100)
+        tests = list(itertools.islice(reversed(self.tests.values()), (page - 1) * size, page * size))
+        return {"count": len(self.tests), "page": page, "size": size, "results": tests}
+
+    def stats(self):
+        passed = sum(1 for test in self.tests.values() if test.get("status") == "PASS")
+        return {"total": len(self.tests), "passed": passed, "runs": self.runs}
+
+    @staticmethod
+    def json(body):
+        try:
+            data = json.loads(body or b"{}")
+        except ValueError:
+            return {}
+        return data if isinstance(data, dict) else {}
+
+
+class HttpProtocol(asyncio.Protocol):
+    """Minimal HTTP/1.1 keep-alive connection. One request at a time: reading pauses while a response is held."""
+
+    def __init__(self, api: TestMeApi, faults: FaultInjection):
+        self.api = api
+        self.faults = faults
+        self.transport = None
+        self.buffer = bytearray()
+        self.holding = False
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def data_received(self, data):
+        self.buffer += data
+        self.process()
+
+    def process(self):
+        while not self.holding and self.transport is not None:
+            header_end = self.buffer.find(b"\r\n\r\n")
+            if header_end < 0:
+                return
+            lines = bytes(self.buffer[:header_end]).decode("latin-1").split("\r\n")
+            try:
+                method, target, version = lines[0].split(" ", 2)
+            except ValueError:
+                self.respond(400, {"detail": "Bad request"}, [], close=True)
+                return
+            headers = {}
+            for line in lines[1:]:
+                name, _, value = line.partition(":")
+                headers[name.strip().lower()] = value.strip()
+            length = int(headers.get("content-length") or 0)
+            if len(self.buffer) < header_end + 4 + length:
+                return
+            body = bytes(self.buffer[header_end + 4 : header_end + 4 + length])
+            del self.buffer[: header_end + 4 + length]
+
+            close = headers.get("connection", "").lower() == "close" or version == "HTTP/1.0"
+            if self.faults.error():
+                status, payload, extra = self.faults.error_status, {"detail": "Injected error"}, []
+            else:
+                try:
+                    status, payload, extra = self.api.handle(method, target, headers, body)
+                except ValueError:
+                    status, payload, extra = 400, {"detail": "Bad request"}, []
+            delay = self.faults.delay()
+            if delay > 0:
+                self.holding = True
+                self.transport.pause_reading()
+                asyncio.get_running_loop().call_later(delay, self.release, status, payload, extra, close)
+                return
+            self.respond(status, payload, extra, close)
+
+    def release(self, status, payload, extra, close):
+        self.holding = False
+        if self.transport is None or self.transport.is_closing():
+            return
+        self.respond(status, payload, extra, close)
+        if not close:
+            self.transport.resume_reading()
+            self.process()
+
+    def respond(self, status, payload, extra, close=False):
+        body = json.dumps(payload, separators=(",", ":")).encode()
+        head = [
+            f"HTTP/1.1 {status} {HTTPStatus(status).phrase}",
+            "Content-Type: application/json",
+            f"Content-Length: {len(body)}",
+            "Connection: close" if close else "Connection: keep-alive",
+        ]
+        head += [f"{name}: {value}" for name, value in extra]
+        self.transport.write(("\r\n".join(head) + "\r\n\r\n").encode("latin-1") + body)
+        if close:
+            self.transport.close()
+
+    def connection_lost(self, exc):
+        self.transport = None
+
+
+def listen(host, port):
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(1024)
+    return sock
+
+
+def serve(host, port, faults):
+    """Run the server until interrupted."""
+    try:
+        import uvloop
+
+        uvloop.install()
+    except ImportError:
+        pass
+
+    async def main():
+        api = TestMeApi()
+        server = await asyncio.get_running_loop().create_server(
+            lambda: HttpProtocol(api, faults), sock=listen(host, port)
+        )
+        async with server:
+            await server.serve_forever()
+
+    signal.signal(signal.SIGTERM, signal.default_int_handler)
+    with contextlib.suppress(KeyboardInterrupt):
+        asyncio.run(main())
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1", help="Address to listen on")
+    parser.add_argument("--port", type=int, default=8000, help="Port to listen on")
+    parser.add_argument("--latency", type=float, default=0.0, help="Milliseconds added to every response")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Up to this many random milliseconds added")
+    parser.add_argument("--stall-rate", type=float, default=0.0, help="Fraction of responses that stall")
+    parser.add_argument("--stall", type=float, default=1000.0, help="Milliseconds a stalled response is held")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests answered with an error")
+    parser.add_argument("--error-status", type=int, default=500, help="Status code of injected errors")
+    args = parser.parse_args(argv)
+
+    faults = FaultInjection(args.latency, args.jitter, args.stall_rate, args.stall, args.error_rate, args.error_status)
+    signal.signal(signal.SIGTERM, signal.default_int_handler)
+    print(f"TestMe stand-in listening on http://{args.host}:{args.port}", flush=True)
+    serve(args.host, args.port, faults)
+
+
+if __name__ == "__main__":
+    main()
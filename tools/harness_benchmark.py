@@ -0,0 +1,126 @@
+"""Harness self-throughput: the locustfile against the local stand-in server.
+
+Starts tools.fake_server on a free port, runs the locustfile in one process against it and reports
+requests/s, CPU time per request and requests per CPU-second of the harness (requests/s one fully busy
+worker core would sustain). CPU of a run without users (imports, startup, reports) is measured first
+and subtracted. Server CPU is reported too, to show the server was not the bottleneck.
+Exits with code 1 if --min-rps-per-core is not reached. Unknown options are passed to locust.
+
+    python -m tools.harness_benchmark --users 300 --run-time 30s --min-rps-per-core 500
+    python -m tools.harness_benchmark --run-time 30s --arrival-rate 400 --arrival-max-users 500
+"""
+
+import argparse
+import resource
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from locust.util.timespan import parse_timespan
+
+from tools.engine_benchmark import BASE_DIR, run_locust
+from utils.http_engine import ClientEngine
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(port, server_args):
+    """Start the stand-in server and wait until it accepts connections."""
+    command = [sys.executable, "-m", "tools.fake_server", f"--port={port}", *server_args]
+    server = subprocess.Popen(command, cwd=BASE_DIR, stdout=subprocess.DEVNULL)
+    deadline = time.monotonic() + 10
+    while time.monotonic() < deadline:
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=0.2):
+                return server
+        except OSError:
+            time.sleep(0.1)
+    server.kill()
+    raise RuntimeError("Stand-in server did not start")
+
+
+def stop_server(server):
+    """Stop the server and return the CPU seconds it used."""
+    usage_before = resource.getrusage(resource.RUSAGE_CHILDREN)
+    server.terminate()
+    try:
+        server.wait(timeout=10)
+    except subprocess.TimeoutExpired:
+        server.kill()
+        server.wait()
+    usage_after = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return (usage_after.ru_utime - usage_before.ru_utime) + (usage_after.ru_stime - usage_before.ru_stime)
+
+
+def format_report(row, harness_cpu, startup_cpu, server_cpu, run_seconds):
+    """Format benchmark results as text."""
+    requests_count = int(row["Request Count"])
+    per_request = harness_cpu / requests_count * 1_000_000 if requests_count else 0.0
+    per_core = requests_count / harness_cpu if harness_cpu else 0.0
+    server_load = server_cpu / run_seconds if run_seconds else 0.0
+    lines = [
+        f"requests            {requests_count:>10}",
+        f"failures            {int(row['Failure Count']):>10}",
+        f"req/s               {float(row['Requests/s']):>10.1f}",
+        f"harness cpu s       {harness_cpu:>10.2f}  (startup {startup_cpu:.2f} s not counted)",
+        f"cpu us/request      {per_request:>10.1f}",
+        f"req/s/core          {per_core:>10.1f}",
+        f"server cpu s        {server_cpu:>10.2f}  ({server_load:.0%} of one core)",
+    ]
+    if server_load > 0.8:
+        lines.append("warning: the stand-in server was busy, its latency is part of the harness numbers")
+    return "\n".join(lines), per_core
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=200, help="Simulated users")
+    parser.add_argument("--spawn-rate", type=float, default=100, help="Users spawned per second")
+    parser.add_argument("--run-time", default="30s", help="Duration of the run")
+    parser.add_argument(
+        "--engine",
+        choices=[engine.value for engine in ClientEngine],
+        default=ClientEngine.REQUESTS.value,
+        help="HTTP client engine",
+    )
+    parser.add_argument("--server-latency", type=float, default=0.0, help="Milliseconds the server adds per response")
+    parser.add_argument("--min-rps-per-core", type=float, default=0, help="Fail below this many req/s per core")
+    args, extra_args = parser.parse_known_args(argv)
+
+    port = free_port()
+    server = start_server(port, [f"--latency={args.server_latency}"])
+    try:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            host = f"http://127.0.0.1:{port}"
+            engine = ClientEngine(args.engine)
+            _, startup_cpu = run_locust(engine, host, 0, 1, "1s", str(Path(tmp_dir, "startup")), extra_args)
+            row, total_cpu = run_locust(
+                engine,
+                host,
+                args.users,
+                args.spawn_rate,
+                args.run_time,
+                str(Path(tmp_dir, "harness")),
+                extra_args,
+            )
+    finally:
+        server_cpu = stop_server(server)
+
+    harness_cpu = max(total_cpu - startup_cpu, 0.0)
+    run_seconds = parse_timespan(args.run_time) + 1
+    report, per_core = format_report(row, harness_cpu, startup_cpu, server_cpu, run_seconds)
+    print(report)
+    if per_core < args.min_rps_per_core:
+        print(f"FAILED: {per_core:.1f} req/s/core is below --min-rps-per-core {args.min_rps_per_core:g}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
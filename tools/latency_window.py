@@ -0,0 +1,64 @@
+"""Tail latency of any time window of a run, rebuilt from exported latency histogram intervals.
+
+Usage: python -m tools.latency_window [reports/latency_histogram.jsonl] [--from 30] [--to 90] [--endpoint NAME]
+"""
+
+import argparse
+import json
+
+from utils.latency_histogram import AGGREGATED, LatencyHistogram
+
+
+def load_window(path, start=None, end=None, endpoints=None):
+    """Merge interval histograms per endpoint. start/end are seconds since the first interval."""
+    histograms = {}
+    first = None
+    with open(path, encoding="utf-8") as export:
+        for line in export:
+            record = json.loads(line)
+            if record["type"] == "header":
+                if record["sub_bucket_bits"] != LatencyHistogram.sub_bucket_bits:
+                    raise ValueError(f"{path} uses {record['sub_bucket_bits']} sub bucket bits")
+                continue
+            if record["type"] != "interval":
+                continue
+            first = record["start"] if first is None else min(first, record["start"])
+            offset = record["start"] - first
+            if (start is not None and offset < start) or (end is not None and offset >= end):
+                continue
+            if endpoints and record["endpoint"] not in endpoints:
+                continue
+            histogram = LatencyHistogram.from_dict(
+                {
+                    "buckets": record["buckets"],
+                    "count": record["count"],
+                    "min": record["min_us"],
+                    "max": record["max_us"],
+                }
+            )
+            if record["endpoint"] in histograms:
+                histograms[record["endpoint"]].merge(histogram)
+            else:
+                histograms[record["endpoint"]] = histogram
+    return histograms
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("path", nargs="?", default="reports/latency_histogram.jsonl", help="Exported intervals")
+    parser.add_argument("--from", dest="start", type=float, help="Window start, seconds since the first interval")
+    parser.add_argument("--to", dest="end", type=float, help="Window end, seconds since the first interval")
+    parser.add_argument("--endpoint", action="append", help="'METHOD name' or Aggregated, repeatable (default: all)")
+    args = parser.parse_args(argv)
+
+    histograms = load_window(args.path, args.start, args.end, args.endpoint)
+    print(f"{'Endpoint':<40} {'count':>8} {'p50':>10} {'p90':>10} {'p99':>10} {'p99.9':>10} {'p99.99':>10} {'max':>10}")
+    for endpoint in sorted(histograms, key=lambda name: (name == AGGREGATED, name)):
+        summary = histograms[endpoint].summary()
+        values = [summary[key] / 1000 for key in ("p50_us", "p90_us", "p99_us", "p999_us", "p9999_us", "max_us")]
+        print(f"{endpoint:<40} {summary['count']:>8} " + " ".join(f"{value:>10.3f}" for value in values))
+    print("(milliseconds)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,296 @@
+"""Single-pass summary of request/response logs (debug logs/log_*.log and compact logs/log_*.jsonl).
+
+Pairs requests with responses, counts status codes per task, clusters failures by normalized response
+text and builds per-minute throughput and latency series. Files are streamed line by line; pending
+requests, failure clusters and per-minute histograms are bounded, so memory does not grow with file size.
+Debug logs written before request ids were added are paired first-in first-out (approximate under
+concurrency) and have no latency.
+
+    python -m tools.log_analyzer logs/log_2026-01-01_10-00-00.log
+    python -m tools.log_analyzer logs/*.jsonl --series reports/log_series.csv --json reports/log_summary.json
+"""
+
+import argparse
+import csv
+import datetime
+import json
+import re
+import time
+from collections import Counter, OrderedDict, defaultdict
+from pathlib import Path
+
+from utils.latency_histogram import LatencyHistogram
+
+MAX_PENDING = 100_000
+MAX_CLUSTERS = 1000
+TEXT_LIMIT = 200
+
+NORMALIZERS = (
+    (re.compile(r"[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}", re.IGNORECASE), "<uuid>"),
+    (re.compile(r"\b[0-9a-f]{16,}\b", re.IGNORECASE), "<hex>"),
+    (re.compile(r"\d+(?:\.\d+)?"), "<n>"),
+    (re.compile(r"\s+"), " "),
+)
+
+
+def normalize(text):
+    """Response text with ids, numbers and whitespace runs replaced, for grouping similar failures."""
+    text = (text or "")[:TEXT_LIMIT]
+    for pattern, replacement in NORMALIZERS:
+        text = pattern.sub(replacement, text)
+    return text.strip() or "<empty>"
+
+
+def parse_time(value):
+    try:
+        return datetime.datetime.fromisoformat(value.strip()).timestamp()
+    except ValueError:
+        return None
+
+
+class LogSummary:
+    """Counters filled record by record."""
+
+    def __init__(self):
+        self.records = 0
+        self.unpaired_requests = 0
+        self.unpaired_responses = 0
+        self.fifo_paired = 0
+        self.status = defaultdict(Counter)
+        self.clusters = {}
+        self.unclustered = 0
+        self.minutes = {}
+        self.untimed_latency = LatencyHistogram()
+
+    def add(self, task, status, timestamp=None, latency_ms=None, failed=None, text=None):
+        """Count one request/response pair."""
+        task = task or "(unknown task)"
+        if failed is None:
+            failed = not 0 < (status or 0) < 400
+        self.records += 1
+        self.status[task][status] += 1
+        if failed:
+            key = (status, normalize(text))
+            cluster = self.clusters.get(key)
+            if cluster is None and len(self.clusters) < MAX_CLUSTERS:
+                # [count, tasks, example text]
+                cluster = self.clusters[key] = [0, Counter(), (text or "")[:TEXT_LIMIT]]
+            if cluster is None:
+                self.unclustered += 1
+            else:
+                cluster[0] += 1
+                cluster[1][task] += 1
+        if timestamp is not None:
+            minute = int(timestamp // 60) * 60
+            series = self.minutes.get(minute)
+            if series is None:
+                # [requests, failures, latency histogram]
+                series = self.minutes[minute] = [0, 0, LatencyHistogram()]
+            series[0] += 1
+            series[1] += bool(failed)
+            if latency_ms is not None:
+                series[2].record(latency_ms * 1000)
+        elif latency_ms is not None:
+            self.untimed_latency.record(latency_ms * 1000)
+
+    def latency(self):
+        """Latency histogram of the whole log."""
+        histogram = LatencyHistogram().merge(self.untimed_latency)
+        for _, _, minute_histogram in self.minutes.values():
+            histogram.merge(minute_histogram)
+        return histogram
+
+    def series(self):
+        """Per-minute rows: minute start, requests, failures, req/s, p50/p95/p99/max ms."""
+        rows = []
+        for minute in sorted(self.minutes):
+            requests, failures, histogram = self.minutes[minute]
+            summary = histogram.summary()
+            rows.append(
+                {
+                    "minute": datetime.datetime.fromtimestamp(minute).isoformat(timespec="minutes"),
+                    "requests": requests,
+                    "failures": failures,
+                    "rps": round(requests / 60, 2),
+                    "p50_ms": summary["p50_us"] / 1000 if histogram.count else None,
+                    "p95_ms": histogram.value_at(95) / 1000 if histogram.count else None,
+                    "p99_ms": summary["p99_us"] / 1000 if histogram.count else None,
+                    "max_ms": summary["max_us"] / 1000 if histogram.count else None,
+                }
+            )
+        return rows
+
+    def to_dict(self, top):
+        failures = sorted(self.clusters.items(), key=lambda item: -item[1][0])[:top]
+        return {
+            "records": self.records,
+            "unpaired_requests": self.unpaired_requests,
+            "unpaired_responses": self.unpaired_responses,
+            "fifo_paired": self.fifo_paired,
+            "status_by_task": {task: dict(counts) for task, counts in sorted(self.status.items())},
+            "failure_clusters": [
+                {"status": status, "pattern": pattern, "count": count, "tasks": dict(tasks), "example": example}
+                for (status, pattern), (count, tasks, example) in failures
+            ],
+            "unclustered_failures": self.unclustered,
+            "latency": self.latency().summary(),
+            "series": self.series(),
+        }
+
+
+def read_jsonl_log(path, summary):
+    """Compact records already hold the pair."""
+    with open(path, encoding="utf-8", errors="replace") as log:
+        for line in log:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            summary.add(
+                record.get("task"),
+                record.get("status"),
+                record.get("ts"),
+                record.get("latency_ms"),
+                record.get("failed"),
+                record.get("response_body") or record.get("result"),
+            )
+
+
+def read_text_log(path, summary):
+    """Parse debug log blocks and pair responses with requests by request id (FIFO without ids)."""
+    pending = OrderedDict()
+    sequence = 0
+    block = None
+    in_text = False
+
+    def finish(block):
+        nonlocal sequence
+        if block is None:
+            return
+        if block["kind"] == "request":
+            sequence += 1
+            pending[block.get("id") or f"#{sequence}"] = (block.get("task"), block.get("time"))
+            if len(pending) > MAX_PENDING:
+                pending.popitem(last=False)
+                summary.unpaired_requests += 1
+            return
+        request = None
+        if block.get("id") is not None:
+            request = pending.pop(block["id"], None)
+        elif pending:
+            request = pending.popitem(last=False)[1]
+            summary.fifo_paired += 1
+        if request is None:
+            summary.unpaired_responses += 1
+            request = (None, None)
+        task, started = request
+        ended = block.get("time")
+        latency = (ended - started) * 1000 if started is not None and ended is not None else None
+        summary.add(task, block.get("status"), started or ended, latency, text="\n".join(block.get("text", [])))
+
+    with open(path, encoding="utf-8", errors="replace") as log:
+        for line in log:
+            line = line.rstrip("\n")
+            if line.startswith("-----"):
+                finish(block)
+                block, in_text = None, False
+            elif line.startswith("Task: "):
+                finish(block)
+                block, in_text = {"kind": "request", "task": line[6:]}, False
+            elif line.startswith("Task result: "):
+                finish(block)
+                block, in_text = {"kind": "response"}, False
+            elif block is None:
+                continue
+            elif line.startswith("Request ID: "):
+                block["id"] = line[12:].strip()
+            elif block["kind"] == "request":
+                if line.startswith("Time: "):
+                    block["time"] = parse_time(line[6:])
+            elif line.startswith("Response code: "):
+                block["status"] = int(line[15:]) if line[15:].strip().isdigit() else None
+            elif line.startswith("Response text: "):
+                block["text"] = [line[15:]]
+                in_text = True
+            elif line.startswith("Response headers: "):
+                in_text = False
+            elif line.startswith("Response time: "):
+                block["time"] = parse_time(line[15:])
+            elif in_text and sum(map(len, block["text"])) < TEXT_LIMIT:
+                block["text"].append(line)
+    finish(block)
+    summary.unpaired_requests += len(pending)
+
+
+def format_summary(summary, top):
+    """Compact text report."""
+    lines = [
+        f"{summary.records} responses, {summary.unpaired_requests} requests without response, "
+        f"{summary.unpaired_responses} responses without request"
+        + (f", {summary.fifo_paired} paired in order (no request ids)" if summary.fifo_paired else ""),
+        "",
+        f"{'Task':<40} {'total':>9}  status codes",
+    ]
+    for task, counts in sorted(summary.status.items()):
+        total = sum(counts.values())
+        codes = ", ".join(f"{status}: {count} ({count / total:.1%})" for status, count in counts.most_common() if count)
+        lines.append(f"{task:<40} {total:>9}  {codes}")
+
+    failures = sorted(summary.clusters.items(), key=lambda item: -item[1][0])[:top]
+    failed = sum(cluster[0] for cluster in summary.clusters.values()) + summary.unclustered
+    lines += ["", f"Failures: {failed} in {len(summary.clusters)} clusters (top {len(failures)})"]
+    for (status, pattern), (count, tasks, _) in failures:
+        task_names = ", ".join(task for task, _ in tasks.most_common(3))
+        lines.append(f"{count:>9}  {status}  {pattern[:80]}  [{task_names}]")
+
+    if summary.minutes:
+        series = summary.series()
+        busiest = max(series, key=lambda row: row["requests"])
+        lines += ["", f"{len(series)} minutes, busiest {busiest['minute']} ({busiest['rps']} req/s)"]
+        timed = [row for row in series if row["p95_ms"] is not None]
+        if timed:
+            slowest = max(timed, key=lambda row: row["p95_ms"])
+            latency = summary.latency().summary()
+            lines.append(
+                f"latency p50 {latency['p50_us'] / 1000:.2f} ms, p99 {latency['p99_us'] / 1000:.2f} ms, "
+                f"max {latency['max_us'] / 1000:.2f} ms; slowest minute {slowest['minute']} "
+                f"(p95 {slowest['p95_ms']:.2f} ms)"
+            )
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("paths", nargs="+", help="Log files (.log debug text or .jsonl compact records)")
+    parser.add_argument("--top", type=int, default=20, help="Failure clusters to show")
+    parser.add_argument("--series", help="Write the per-minute series to this CSV file")
+    parser.add_argument("--json", help="Write the full summary to this JSON file")
+    args = parser.parse_args(argv)
+
+    summary = LogSummary()
+    started = time.perf_counter()
+    size = 0
+    for path in args.paths:
+        size += Path(path).stat().st_size
+        if path.endswith(".jsonl"):
+            read_jsonl_log(path, summary)
+        else:
+            read_text_log(path, summary)
+    elapsed = time.perf_counter() - started
+
+    print(f"{len(args.paths)} files, {size / 1_000_000:.1f} MB in {elapsed:.1f} s")
+    print(format_summary(summary, args.top))
+    if args.series:
+        Path(args.series).parent.mkdir(parents=True, exist_ok=True)
+        with open(args.series, "w", newline="", encoding="utf-8") as series_file:
+            fields = ["minute", "requests", "failures", "rps", "p50_ms", "p95_ms", "p99_ms", "max_ms"]
+            writer = csv.DictWriter(series_file, fieldnames=fields)
+            writer.writeheader()
+            writer.writerows(summary.series())
+    if args.json:
+        Path(args.json).parent.mkdir(parents=True, exist_ok=True)
+        Path(args.json).write_text(json.dumps(summary.to_dict(args.top), indent=2), encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
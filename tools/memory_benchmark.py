@@ -0,0 +1,161 @@
+"""Resident memory per simulated user, without network I/O.
+
+Builds --users logged in users of the Tests group with their running task set, as a worker holds them
+mid-run, and reports traced Python bytes per user: the HTTP client alone, the user and task set state
+on top of it, and one test case body object. Login is simulated (username and a distinct token per user).
+With --baseline the legacy representation is built too (a user_data dict with a header dict per user, task
+sets copying username, token and headers, a dict based test case body) and shown next to it with the delta.
+
+    python -m tools.memory_benchmark --users 20000 --baseline
+    python -m tools.memory_benchmark --users 20000 --client-engine fast
+"""
+
+import argparse
+import gc
+import tracemalloc
+
+from locust import SequentialTaskSet
+from locust.env import Environment
+
+from data.test_data import NewTest
+from tests.register_user import RegisteredHttpUser
+from tests.test_tests import Tests
+from utils.http_engine import ClientEngine, HttpEngine
+from utils.utils import Utils
+
+
+class BenchUser(RegisteredHttpUser):
+    host = "http://127.0.0.1:1"
+    tasks = [Tests]
+
+
+class LegacyTests(SequentialTaskSet):
+    """Tests task set as before UserStateMixin: username, token and headers copied in on_start."""
+
+    tasks = Tests.tasks
+
+    def on_start(self):
+        self.username = self.user.get_username()
+        self.token = self.user.get_token()
+        self.headers = Utils.get_headers_with_token(self.token)
+
+
+class LegacyBenchUser(RegisteredHttpUser):
+    """User as before UserState: a user_data dict holding username, token and a header dict per user."""
+
+    host = BenchUser.host
+    tasks = [LegacyTests]
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        del self.state
+        self.user_data = {}
+
+    def set_username(self, username):
+        self.user_data["username"] = username
+
+    def get_username(self):
+        return self.user_data.get("username")
+
+    def set_token(self, token):
+        self.user_data["token"] = token
+
+    def get_token(self):
+        return self.user_data.get("token")
+
+    def get_headers(self):
+        if "headers" not in self.user_data:
+            self.user_data["headers"] = Utils.get_headers_with_token(self.user_data["token"])
+        return self.user_data["headers"]
+
+
+class LegacyNewTest:
+    """Test case body as before slots: fields in a dict."""
+
+    def __init__(self):
+        self.test_data = {}
+
+    def set_test_name(self, name):
+        self.test_data["name"] = name
+
+    def set_test_desc(self, description):
+        self.test_data["description"] = description
+
+
+def traced_bytes_per_object(count, build):
+    """Traced bytes still allocated per object after building count objects."""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    objects = [build(index) for index in range(count)]
+    gc.collect()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del objects
+    return (after - before) / count
+
+
+def logged_in_user(environment, index, user_class=BenchUser, taskset_class=Tests):
+    """User after login with its task set started, as during a run."""
+    user = user_class(environment)
+    user.set_username(f"user{index:06d}")
+    user.set_token(f"{index:032x}")
+    taskset = taskset_class(user)
+    taskset.on_start()
+    # headers are built by the first request
+    user.get_headers()
+    return user, taskset
+
+
+def test_case_body(index, body_class=NewTest):
+    test = body_class()
+    test.set_test_name(f"API Test {index}")
+    test.set_test_desc("Checking the creation of a new test. Endpoint: /api/tests/new")
+    return test
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=20000, help="Simulated users to build")
+    parser.add_argument(
+        "--client-engine", choices=[engine.value for engine in ClientEngine], default=ClientEngine.REQUESTS.value
+    )
+    parser.add_argument("--baseline", action="store_true", help="Also measure the legacy representation")
+    args = parser.parse_args(argv)
+
+    environment = Environment(
+        user_classes=[BenchUser, LegacyBenchUser], parsed_options=argparse.Namespace(**vars(args))
+    )
+    engine = ClientEngine(args.client_engine)
+    client = traced_bytes_per_object(
+        args.users, lambda index: HttpEngine.create_client(engine, environment, BenchUser.host)
+    )
+    user = traced_bytes_per_object(args.users, lambda index: logged_in_user(environment, index))
+    body = traced_bytes_per_object(args.users, test_case_body)
+    rows = [
+        ("HTTP client", client),
+        ("user and task set state", user - client),
+        ("total", user),
+        ("test case body (NewTest)", body),
+    ]
+
+    print(f"{args.users} users, {engine.value} engine, traced bytes per user")
+    if not args.baseline:
+        for label, after in rows:
+            print(f"  {label:<28} {after:>10,.0f}")
+        print(f"  ({user * args.users / 1_000_000:,.0f} MB in total)")
+        return
+
+    legacy_user = traced_bytes_per_object(
+        args.users, lambda index: logged_in_user(environment, index, LegacyBenchUser, LegacyTests)
+    )
+    legacy_body = traced_bytes_per_object(args.users, lambda index: test_case_body(index, LegacyNewTest))
+    before = [client, legacy_user - client, legacy_user, legacy_body]
+    print(f"  {'':<28} {'before':>10} {'after':>10} {'delta':>10}")
+    for (label, after), baseline in zip(rows, before, strict=True):
+        print(f"  {label:<28} {baseline:>10,.0f} {after:>10,.0f} {after - baseline:>+10,.0f}")
+    print(f"  ({legacy_user * args.users / 1_000_000:,.0f} MB before, {user * args.users / 1_000_000:,.0f} MB after)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,191 @@
+"""Per-request harness overhead microbenchmarks, without network I/O.
+
+Usage: python -m tools.microbench [scenario|payload|logging ...]
+"""
+
+import argparse
+import json as _json
+import logging
+import tempfile
+import time
+import timeit
+from pathlib import Path
+
+from data.payload_pool import PayloadPool
+from data.test_data import NewTest
+from tests.scenarios import CREATE_TEST
+from utils.log_sampler import LogSampler, SamplingPolicy
+from utils.log_writer import OverflowPolicy
+from utils.logger import Logger, LogMode, LogType
+
+
+class FakeResponse:
+    """Response/context manager stand-in returning a canned "Create new Test" response."""
+
+    status_code = 201
+    text = '{"test_id": 1}'
+    headers = {"Content-Type": "application/json"}
+    content = text.encode()
+    request = None
+    request_meta = {"response_time": 1.0, "response_length": len(content)}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        return False
+
+    def json(self):
+        return {"test_id": 1}
+
+    def success(self):
+        pass
+
+    def failure(self, message):
+        pass
+
+
+class FakeClient:
+    """HTTP client stand-in that encodes JSON bodies like python-requests and answers immediately."""
+
+    response = FakeResponse()
+    sent = None
+
+    def request(self, method, url, data=None, json=None, **kwargs):
+        if json is not None:
+            data = _json.dumps(json, allow_nan=False).encode("utf-8")
+        self.sent = data
+        return self.response
+
+    def post(self, url, data=None, json=None, **kwargs):
+        return self.request("POST", url, data=data, json=json, **kwargs)
+
+
+class FakeTaskSet:
+    """Task set stand-in with the attributes request steps use."""
+
+    def __init__(self):
+        self.client = FakeClient()
+        self.username = "alice"
+        self.headers = {"Content-Type": "application/json", "X-CSRFToken": "token"}
+        self.test_id = ""
+        self.current_transaction = None
+
+
+def legacy_create_new_test(self):
+    """Hand-written "Create new Test" task as it was before request steps."""
+    test = NewTest()
+    test.set_test_name(f"API Test {int(time.time() * 1000)}")
+    test.set_test_desc(f"Checking the creation of a new test by {self.username}. Endpoint: /api/tests/new")
+
+    test_name = test.get_test_name()
+    test_desc = test.get_test_desc()
+
+    form_data = {"name": test_name, "description": test_desc}
+
+    Logger.add_request("Create Test", "/api/tests/new", "POST", form_data)
+    with self.client.post(
+        url="/api/tests/new", json=form_data, headers=self.headers, catch_response=True, name="Create new Test"
+    ) as response:
+        task_result = ""
+        if response.status_code != 201:
+            failure_info = (
+                f"Test creation failed by user: {self.username}. "
+                f"Response: {response.text}. Status code: {response.status_code}."
+            )
+            response.failure(failure_info)
+            Logger.log_message(failure_info, LogType.ERROR)
+            task_result = failure_info
+        else:
+            success_info = f"Test successfully created by user: {self.username}"
+            response.success()
+            Logger.log_message(success_info, LogType.INFO)
+            task_result = success_info
+        try:
+            response_json = response.json()
+            if "test_id" in response_json:
+                self.test_id = response_json["test_id"]
+                test.set_test_id(self.test_id)
+            else:
+                Logger.log_message("Response missing test_id field", LogType.ERROR)
+        except (ValueError, KeyError, TypeError) as e:
+            Logger.log_message(f"Failed to parse response JSON: {str(e)}", LogType.ERROR)
+        Logger.add_response(response, task_result)
+
+
+def bench(function, argument, number):
+    """Best of 5 runs, in microseconds per call."""
+    timings = timeit.repeat(lambda: function(argument), number=number, repeat=5)
+    return min(timings) / number * 1_000_000
+
+
+def bench_scenario(number):
+    """Hand-written task vs compiled request step."""
+    taskset = FakeTaskSet()
+    return [
+        ("hand-written task", bench(legacy_create_new_test, taskset, number)),
+        ("compiled request step", bench(CREATE_TEST, taskset, number)),
+    ]
+
+
+def bench_payload(number):
+    """Create step with bodies built per request vs taken from a pre-filled payload pool."""
+    taskset = FakeTaskSet()
+    PayloadPool.init(size=0)
+    templates = bench(CREATE_TEST, taskset, number)
+    # Big enough for every timing run, so the pool never needs a refill
+    PayloadPool.init(size=number * 5)
+    pooled = bench(CREATE_TEST, taskset, number)
+    PayloadPool.clear()
+    return [("body template, json=", templates), ("payload pool, data=", pooled)]
+
+
+def bench_logging(number):
+    """Create step with logging off, compact request log only, and compact/debug logs with runtime messages."""
+    taskset = FakeTaskSet()
+    cases = [
+        ("off", LogMode.OFF, False),
+        ("compact", LogMode.COMPACT, False),
+        ("compact + runtime log", LogMode.COMPACT, True),
+        ("debug + runtime log", LogMode.DEBUG, True),
+    ]
+    results = []
+    logs_dir, request_log_file = Logger._logs_dir, Logger._request_log_file
+    with tempfile.TemporaryDirectory() as directory:
+        Logger._logs_dir = Path(directory)
+        Logger._request_log_file = Path(directory, "requests.log")
+        for label, mode, runtime_log in cases:
+            Logger.configure_request_log(mode=mode, overflow=OverflowPolicy.DROP)
+            if runtime_log:
+                Logger.init_logger("microbench", Path(directory, "runtime.log"))
+            results.append((f"logging {label}", bench(CREATE_TEST, taskset, number)))
+            Logger.close_request_log()
+            Logger.log_obj = None
+        logging.getLogger("microbench").handlers.clear()
+    Logger._logs_dir, Logger._request_log_file = logs_dir, request_log_file
+    Logger.configure_request_log(sampler=LogSampler(SamplingPolicy.ERRORS))
+    return results
+
+
+BENCHMARKS = {"scenario": bench_scenario, "payload": bench_payload, "logging": bench_logging}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("benchmarks", nargs="*", default=list(BENCHMARKS), help="Benchmarks to run")
+    parser.add_argument("--number", type=int, default=20000, help="Calls per timing run")
+    args = parser.parse_args(argv)
+    unknown = set(args.benchmarks) - set(BENCHMARKS)
+    if unknown:
+        parser.error(f"unknown benchmarks: {', '.join(sorted(unknown))} (choose from {', '.join(BENCHMARKS)})")
+
+    # Keep the request log writer idle: successful calls are sampled out before any I/O
+    Logger.configure_request_log(sampler=LogSampler(SamplingPolicy.ERRORS))
+    for name in args.benchmarks:
+        print(name)
+        for label, microseconds in BENCHMARKS[name](args.number):
+            print(f"  {label:<32} {microseconds:8.2f} us/call")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,298 @@
+"""Open-model constant arrival rate scheduling."""
+
+import enum
+import math
+import random
+import time
+
+from locust import LoadTestShape
+from locust.runners import MasterRunner
+
+from utils.logger import Logger, LogType
+
+
+class ArrivalSpacing(enum.Enum):
+    """Gaps between scheduled iterations."""
+
+    FIXED = "fixed"
+    POISSON = "poisson"
+
+
+class ArrivalSchedule:
+    """Iteration start slots of one user group on this process, shared by all its users."""
+
+    def __init__(self, rate: float, spacing: ArrivalSpacing, max_lag: float):
+        self.rate = rate
+        self.spacing = spacing
+        self.max_lag = max_lag
+        # The schedule starts with the test, so slots of a group that no user takes are missed too
+        self.started = time.monotonic()
+        self.next_slot = None
+        # Counters: iterations started, seconds users spent in iterations, late and dropped slots, max lag
+        self.iterations = 0
+        self.busy = 0.0
+        self.late = 0
+        self.dropped = 0
+        self.max_lag_seen = 0.0
+
+    def claim(self, now):
+        """Take next free slot. Slots more than max_lag behind are dropped. Returns seconds to wait."""
+        if self.next_slot is None:
+            # the first user of the group starts the clock unless it came more than max_lag after the test
+            self.next_slot = now if now - self.started <= self.max_lag else self.started
+        slot = self.next_slot
+        lag = now - slot
+        if lag > self.max_lag:
+            self.dropped += int(lag * self.rate)
+            slot = now
+            lag = 0.0
+        self.next_slot = slot + self._gap()
+        self.iterations += 1
+        if lag > ArrivalRate.late_after:
+            self.late += 1
+            self.max_lag_seen = max(self.max_lag_seen, lag)
+        return max(-lag, 0.0)
+
+    def counters(self):
+        """[iterations started so far, busy seconds, late, dropped, max lag].
+
+        Claimed future slots don't count as started; slots more than max_lag behind that no user claimed yet
+        count as dropped.
+        """
+        now = time.monotonic()
+        slot = self.next_slot if self.next_slot is not None else self.started
+        pending = int(max(slot - now, 0.0) * self.rate)
+        missed = int((now - slot) * self.rate) if now - slot > self.max_lag else 0
+        return [max(self.iterations - pending, 0), self.busy, self.late, self.dropped + missed, self.max_lag_seen]
+
+    def _gap(self):
+        if self.spacing == ArrivalSpacing.POISSON:
+            return random.expovariate(self.rate)
+        return 1.0 / self.rate
+
+
+class ArrivalRate:
+    """Target iterations per second for user groups instead of think time.
+
+    An iteration is one task sequence of a user's task set, from its start to its interrupt(). Users of a group
+    share one schedule of start slots: a task set waits for the next free slot when it starts a sequence
+    (wait_for_slot) and runs the tasks of the sequence without think time, so the offered load does not depend
+    on server latency. Spare users just wait; a slot that no user was free to take is late, and slots more than
+    max_lag behind are dropped. ArrivalRateShape adds users to keep the groups on schedule.
+    """
+
+    late_after = 0.05
+    report_interval = 10.0
+    # Achieved rates below this share of the target are reported as a warning
+    min_achieved_ratio = 0.9
+
+    schedules = {}
+    rates = {}
+    _original_wait_times = {}
+    _worker_totals = {}
+
+    @staticmethod
+    def parse_rates(values, user_classes):
+        """Parse ["TestsGroup=4", ...] into {group: rate}. A bare number is split between groups by weight."""
+        weights = {user_class.__name__: user_class.weight for user_class in user_classes}
+        total_weight = sum(weights.values()) or 1
+        rates = {}
+        for value in values or []:
+            name, separator, rate = str(value).rpartition("=")
+            rate = float(rate)
+            if rate < 0:
+                raise ValueError(f"Arrival rate must not be negative: {value}")
+            if not separator:
+                rates.update({group: rate * weight / total_weight for group, weight in weights.items()})
+            elif name in weights:
+                rates[name] = rate
+            else:
+                raise ValueError(f"Unknown user group in arrival rate {value!r}, expected one of {sorted(weights)}")
+        return {group: rate for group, rate in rates.items() if rate > 0}
+
+    @classmethod
+    def start(cls, user_classes, rates: dict, spacing: ArrivalSpacing, max_lag: float, worker_index=0, worker_count=1):
+        """Pace groups with a rate instead of their wait_time. Each worker takes its share of the rate."""
+        cls.stop()
+        cls.rates = rates
+        cls._worker_totals = {}
+        for user_class in user_classes:
+            group = user_class.__name__
+            if group not in rates:
+                continue
+            schedule = ArrivalSchedule(rates[group] / worker_count, spacing, max_lag)
+            cls.schedules[group] = schedule
+            cls._original_wait_times[user_class] = user_class.__dict__.get("wait_time")
+            user_class.wait_time = cls._slot_wait
+        if cls.schedules:
+            Logger.log_message(
+                f"Arrival rate ({spacing.value} spacing) on worker {worker_index}: "
+                + ", ".join(f"{group} {schedule.rate:g}/s" for group, schedule in cls.schedules.items())
+            )
+
+    @classmethod
+    def stop(cls):
+        """Give groups their own wait_time back."""
+        for user_class, wait_time in cls._original_wait_times.items():
+            if wait_time is None:
+                del user_class.wait_time
+            else:
+                user_class.wait_time = wait_time
+        cls._original_wait_times = {}
+        cls.schedules = {}
+
+    @classmethod
+    def wait_for_slot(cls, taskset):
+        """Start the task sequence of taskset at the next free slot of its user's group, if the group is paced."""
+        user = taskset.user
+        schedule = cls.schedules.get(type(user).__name__)
+        if schedule is None:
+            return
+        now = time.monotonic()
+        started = getattr(user, "_arrival_started", None)
+        if started is not None:
+            schedule.busy += now - started
+        delay = schedule.claim(now)
+        user._arrival_started = now + delay
+        if delay > 0:
+            user._arrival_delay = delay
+            taskset.wait()
+
+    @staticmethod
+    def _slot_wait(user):
+        """wait_time of paced users: the delay set by wait_for_slot, no think time between tasks of a sequence."""
+        delay = getattr(user, "_arrival_delay", 0.0)
+        user._arrival_delay = 0.0
+        return delay
+
+    @classmethod
+    def on_report_to_master(cls, data, **kwargs):
+        """Send cumulative counters of this worker to master."""
+        if cls.schedules:
+            data["arrival_rate"] = {group: schedule.counters() for group, schedule in cls.schedules.items()}
+
+    @classmethod
+    def on_worker_report(cls, client_id, data, **kwargs):
+        """Keep the latest counters of each worker."""
+        if "arrival_rate" in data:
+            cls._worker_totals[client_id] = data["arrival_rate"]
+
+    @classmethod
+    def totals(cls):
+        """Counters of all workers (or this process) by group."""
+        reports = list(cls._worker_totals.values())
+        reports.append({group: schedule.counters() for group, schedule in cls.schedules.items()})
+        totals = {}
+        for report in reports:
+            for group, (iterations, busy, late, dropped, max_lag) in report.items():
+                total = totals.setdefault(group, [0, 0.0, 0, 0, 0.0])
+                total[0] += iterations
+                total[1] += busy
+                total[2] += late
+                total[3] += dropped
+                total[4] = max(total[4], max_lag)
+        return totals
+
+    @classmethod
+    def log_summary(cls, elapsed):
+        """Log target and achieved rate of every paced group."""
+        totals = cls.totals()
+        for group, rate in cls.rates.items():
+            iterations, _, late, dropped, max_lag = totals.get(group, [0, 0.0, 0, 0, 0.0])
+            achieved = iterations / elapsed if elapsed > 0 else 0.0
+            log_type = LogType.INFO
+            if late or dropped:
+                log_type = LogType.ERROR
+            elif achieved < rate * cls.min_achieved_ratio:
+                log_type = LogType.WARNING
+            Logger.report(
+                f"Arrival rate {group}: target {rate:g}/s, achieved {achieved:.2f}/s, "
+                f"{late} late and {dropped} dropped iterations, max lag {max_lag:.2f} s",
+                log_type,
+            )
+        cls._worker_totals = {}
+
+
+class ArrivalRateShape(LoadTestShape):
+    """Add users so that every paced group has enough to hold its arrival rate (Little's law).
+
+    Users needed by a group = rate x mean sequence time x headroom, and at least one per worker, because each
+    worker paces its own share of the rate. Users are spawned by weight, so the total is sized for the group
+    that needs the most relative to its weight. Users are never removed.
+    Locust does not apply --run-time to shapes in headless mode, so the shape stops the test itself.
+    """
+
+    # Created for --arrival-rate in events.init, not picked up as the shape of the locustfile
+    abstract = True
+    headroom = 1.2
+    # Until the first sequences finish: an iteration is a whole sequence of several requests
+    initial_iteration_time = 1.0
+
+    def __init__(self, weights: dict, spawn_rate: float, max_users: int, run_time: int = None):
+        super().__init__()
+        self.weights = weights
+        self.run_time = run_time
+        self.spawn_rate = spawn_rate
+        self.max_users = max_users
+        self.users = 0
+        self.iteration_times = {}
+        self._last_totals = {}
+        self._last_report = 0.0
+        self._window = {}
+
+    def reset_time(self):
+        super().reset_time()
+        self.users = 0
+        self.iteration_times = {}
+        self._last_totals = {}
+        self._last_report = time.monotonic()
+        self._window = {}
+
+    def tick(self):
+        if self.run_time and self.get_run_time() >= self.run_time:
+            return None
+
+        totals = ArrivalRate.totals()
+        for group, counters in totals.items():
+            last = self._last_totals.get(group, [0, 0.0, 0, 0, 0.0])
+            iterations, busy = counters[0] - last[0], counters[1] - last[1]
+            if iterations > 0 and busy > 0:
+                self.iteration_times[group] = busy / iterations
+            window = self._window.setdefault(group, [0, 0])
+            window[0] += counters[2] - last[2]
+            window[1] += counters[3] - last[3]
+        self._last_totals = {group: list(counters) for group, counters in totals.items()}
+
+        needed = self.needed_users()
+        self.users = min(max(self.users, needed), self.max_users)
+        if time.monotonic() - self._last_report >= ArrivalRate.report_interval:
+            self._report(needed)
+        return self.users, self.spawn_rate
+
+    def needed_users(self):
+        total_weight = sum(self.weights.values()) or 1
+        workers = max(self.runner.worker_count, 1) if isinstance(self.runner, MasterRunner) else 1
+        needed = len(self.weights)
+        for group, rate in ArrivalRate.rates.items():
+            share = self.weights.get(group, 0) / total_weight
+            if share <= 0:
+                continue
+            iteration_time = self.iteration_times.get(group, self.initial_iteration_time)
+            needed = max(needed, math.ceil(max(rate * iteration_time * self.headroom, workers) / share))
+        return needed
+
+    def _report(self, needed):
+        self._last_report = time.monotonic()
+        if needed > self.max_users:
+            Logger.report(
+                f"Arrival rate: out of users, {needed} needed to hold the rate, --arrival-max-users is {self.max_users}",
+                LogType.ERROR,
+            )
+        for group, (late, dropped) in self._window.items():
+            if late or dropped:
+                Logger.report(
+                    f"Arrival rate {group}: behind schedule, {late} late and {dropped} dropped iterations "
+                    f"in the last {ArrivalRate.report_interval:g} s ({self.users} users)",
+                    LogType.ERROR,
+                )
+        self._window = {}
@@ -0,0 +1,192 @@
+"""Connection reuse strategies, pool size and DNS cache of the HTTP clients."""
+
+import enum
+import ipaddress
+import socket
+import time
+
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+from utils.logger import Logger
+
+
+class ConnectionMode(enum.Enum):
+    """When a pooled connection is closed instead of reused."""
+
+    KEEP_ALIVE = "keep-alive"
+    PER_REQUEST = "per-request"
+    PER_N = "per-n"
+
+
+class ConnectionPolicy:
+    """Connection strategy of this process and the connections it opened.
+
+    keep-alive reuses connections for as long as the server keeps them open, per-request opens a new
+    connection for every request (as clients without keep-alive do), per-n opens a new one after
+    max_requests requests. With max_idle set, keep-alive and per-n connections idle for longer are
+    closed before their next use. Implemented by the connection pools of the requests engine; the fast
+    engine only takes the pool size.
+    """
+
+    mode = ConnectionMode.KEEP_ALIVE
+    max_requests = 100
+    max_idle = 0.0
+    pool_size = 10
+    dns_cache = True
+
+    opened = 0
+    recycled = 0
+    _addresses = {}
+
+    @classmethod
+    def configure(cls, mode=ConnectionMode.KEEP_ALIVE, max_requests=100, max_idle=0.0, pool_size=10, dns_cache=True):
+        cls.mode = mode
+        cls.max_requests = max(max_requests, 1)
+        cls.max_idle = max_idle
+        cls.pool_size = max(pool_size, 1)
+        cls.dns_cache = dns_cache
+        cls.opened = 0
+        cls.recycled = 0
+        cls._addresses = {}
+
+    @classmethod
+    def describe(cls):
+        """Active strategy as text."""
+        text = cls.mode.value
+        if cls.mode == ConnectionMode.PER_N:
+            text += f" ({cls.max_requests} requests)"
+        if cls.max_idle and cls.mode != ConnectionMode.PER_REQUEST:
+            text += f", max idle {cls.max_idle:g} s"
+        return f"{text}, pool size {cls.pool_size}, DNS cache {'on' if cls.dns_cache else 'off'}"
+
+    @classmethod
+    def resolve(cls, host):
+        """Address to connect to host, resolved once per process when the DNS cache is on."""
+        if not cls.dns_cache:
+            return host
+        address = cls._addresses.get(host)
+        if address is None:
+            try:
+                ipaddress.ip_address(host)
+                address = host
+            except ValueError:
+                address = socket.getaddrinfo(host, None, type=socket.SOCK_STREAM)[0][4][0]
+            cls._addresses[host] = address
+        return address
+
+    @classmethod
+    def reusable(cls, conn):
+        """True if an open pooled connection may serve the next request."""
+        if cls.mode == ConnectionMode.PER_REQUEST:
+            return False
+        if cls.mode == ConnectionMode.PER_N and conn.requests_served >= cls.max_requests:
+            return False
+        return not cls.max_idle or time.monotonic() - conn.last_used <= cls.max_idle
+
+    @classmethod
+    def on_report_to_master(cls, data, **kwargs):
+        """Hand connection counts since the last report to master."""
+        if cls.opened or cls.recycled:
+            data["connections"] = [cls.opened, cls.recycled]
+            cls.opened = 0
+            cls.recycled = 0
+
+    @classmethod
+    def on_worker_report(cls, client_id, data, **kwargs):
+        """Add connection counts reported by a worker."""
+        opened, recycled = data.get("connections", (0, 0))
+        cls.opened += opened
+        cls.recycled += recycled
+
+    @classmethod
+    def log_summary(cls, requests_count, engine_name):
+        """Log the strategy and the connections opened for requests_count requests."""
+        if engine_name != "requests":
+            Logger.report(f"Connections: {engine_name} engine, pool size {cls.pool_size}, opened not counted")
+            return
+        per_request = cls.opened / requests_count if requests_count else 0.0
+        message = (
+            f"Connections: {cls.describe()}. {cls.opened} opened for {requests_count} requests "
+            f"({per_request:.3f} per request), {cls.recycled} closed by the strategy"
+        )
+        Logger.report(message)
+
+
+class ManagedConnectionMixin:
+    """Count requests per connection and connect to the cached address of the host."""
+
+    requests_served = 0
+    last_used = 0.0
+
+    def _new_conn(self):
+        host = self._dns_host
+        self._dns_host = ConnectionPolicy.resolve(host)
+        try:
+            return super()._new_conn()
+        finally:
+            self._dns_host = host
+
+    def connect(self):
+        super().connect()
+        ConnectionPolicy.opened += 1
+        self.requests_served = 0
+
+    def request(self, *args, **kwargs):
+        super().request(*args, **kwargs)
+        self.requests_served += 1
+
+
+class ManagedPoolMixin:
+    """Close pooled connections the connection strategy does not reuse."""
+
+    def _get_conn(self, timeout=None):
+        conn = super()._get_conn(timeout)
+        if not conn.is_closed and not ConnectionPolicy.reusable(conn):
+            conn.close()
+            ConnectionPolicy.recycled += 1
+        return conn
+
+    def _put_conn(self, conn):
+        if conn is not None:
+            conn.last_used = time.monotonic()
+            if ConnectionPolicy.mode == ConnectionMode.PER_REQUEST and not conn.is_closed:
+                conn.close()
+                ConnectionPolicy.recycled += 1
+        super()._put_conn(conn)
+
+
+class ManagedHTTPConnection(ManagedConnectionMixin, HTTPConnection):
+    pass
+
+
+class ManagedHTTPSConnection(ManagedConnectionMixin, HTTPSConnection):
+    pass
+
+
+class ManagedHTTPConnectionPool(ManagedPoolMixin, HTTPConnectionPool):
+    ConnectionCls = ManagedHTTPConnection
+
+
+class ManagedHTTPSConnectionPool(ManagedPoolMixin, HTTPSConnectionPool):
+    ConnectionCls = ManagedHTTPSConnection
+
+
+class ManagedHTTPAdapter(HTTPAdapter):
+    """requests adapter with connection pools following ConnectionPolicy."""
+
+    pool_classes = {"http": ManagedHTTPConnectionPool, "https": ManagedHTTPSConnectionPool}
+
+    def __init__(self):
+        super().__init__(pool_connections=ConnectionPolicy.pool_size, pool_maxsize=ConnectionPolicy.pool_size)
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = dict(self.pool_classes)
+
+    @classmethod
+    def mount(cls, client):
+        """Mount the adapter on a requests session for both schemes."""
+        client.mount("https://", cls())
+        client.mount("http://", cls())
@@ -0,0 +1,162 @@
+"""Coordinated omission corrected latency."""
+
+import csv
+import time
+import weakref
+from pathlib import Path
+
+import gevent
+
+from utils.latency_histogram import AGGREGATED, LatencyHistogram
+from utils.logger import Logger, LogType
+
+
+class LatencyCorrection:
+    """Raw and coordinated omission corrected response time histograms per endpoint.
+
+    A user sends its next request only after the previous response, so a stalled response hides the
+    requests the user would have sent meanwhile. Each user learns its expected interval between request
+    starts (moving average over requests that were not slow). A response slower than that interval is
+    recorded in the corrected histogram together with the requests that were due during the stall: for
+    every intended start time start + k x interval before the response arrived, its latency
+    response end - intended start (at most max_backfill per response). Raw histograms keep the
+    measured values only. Users are told apart by their greenlet.
+    """
+
+    smoothing = 0.2
+    max_backfill = 10000
+
+    enabled = False
+    flag_ratio = 0.1
+
+    raw = {}
+    corrected = {}
+    _users = weakref.WeakKeyDictionary()
+
+    @classmethod
+    def start(cls, environment, flag_ratio: float = 0.1):
+        """Record requests of this process from now on."""
+        cls.stop(environment)
+        cls.enabled = True
+        cls.flag_ratio = flag_ratio
+        cls.raw = {}
+        cls.corrected = {}
+        cls._users = weakref.WeakKeyDictionary()
+        environment.events.request.add_listener(cls.on_request)
+
+    @classmethod
+    def stop(cls, environment):
+        """Stop recording, keep histograms until reported."""
+        if cls.enabled:
+            environment.events.request.remove_listener(cls.on_request)
+        cls.enabled = False
+
+    @classmethod
+    def on_request(cls, request_type, name, response_time, start_time=None, **kwargs):
+        """Record raw latency, and corrected latency with back-filled requests of a stall."""
+        if response_time is None:
+            return
+        key = (request_type, name)
+        raw = cls.raw.get(key)
+        if raw is None:
+            raw = cls.raw[key] = LatencyHistogram()
+            cls.corrected[key] = LatencyHistogram()
+        corrected = cls.corrected[key]
+        latency = response_time * 1000
+        raw.record(latency)
+        corrected.record(latency)
+
+        if start_time is None:
+            start_time = time.time() - response_time / 1000
+        user = cls._users.get(gevent.getcurrent())
+        if user is None:
+            # [last request start, expected interval (us), last request was slow]
+            cls._users[gevent.getcurrent()] = [start_time, None, False]
+            return
+        gap = (start_time - user[0]) * 1_000_000
+        user[0] = start_time
+        interval = user[1]
+        if interval is None:
+            user[1] = gap
+            return
+        if not user[2]:
+            user[1] = interval = interval + cls.smoothing * (gap - interval)
+        user[2] = interval > 0 and latency > interval
+        if user[2]:
+            missing = latency - interval
+            for _ in range(cls.max_backfill):
+                if missing < interval:
+                    break
+                corrected.record(missing)
+                missing -= interval
+
+    @classmethod
+    def on_report_to_master(cls, data, **kwargs):
+        """Hand histograms recorded since the last report to master."""
+        if not cls.raw:
+            return
+        data["latency_correction"] = [
+            [method, name, cls.raw[(method, name)].to_dict(), cls.corrected[(method, name)].to_dict()]
+            for method, name in cls.raw
+        ]
+        cls.raw = {}
+        cls.corrected = {}
+
+    @classmethod
+    def on_worker_report(cls, client_id, data, **kwargs):
+        """Merge histograms reported by a worker."""
+        for method, name, raw, corrected in data.get("latency_correction", []):
+            key = (method, name)
+            if key not in cls.raw:
+                cls.raw[key] = LatencyHistogram()
+                cls.corrected[key] = LatencyHistogram()
+            cls.raw[key].merge(LatencyHistogram.from_dict(raw))
+            cls.corrected[key].merge(LatencyHistogram.from_dict(corrected))
+
+    @classmethod
+    def report(cls, path):
+        """Print raw vs corrected percentiles, flag endpoints whose p99 moved more than flag_ratio, write CSV."""
+        if not cls.raw:
+            return
+        rows = []
+        total_raw, total_corrected = LatencyHistogram(), LatencyHistogram()
+        for (method, name), raw in sorted(cls.raw.items()):
+            corrected = cls.corrected[(method, name)]
+            total_raw.merge(raw)
+            total_corrected.merge(corrected)
+            rows.append((f"{method} {name}", raw.summary(), corrected.summary()))
+        rows.append((AGGREGATED, total_raw.summary(), total_corrected.summary()))
+
+        lines = [
+            f"{'Endpoint':<40} {'requests':>8} {'+omitted':>8} {'p50':>9} {'p99':>9} {'p99 corr':>9} "
+            f"{'p99.9':>9} {'p99.9 corr':>10}"
+        ]
+        flagged = []
+        for endpoint, raw, corrected in rows:
+            change = corrected["p99_us"] / raw["p99_us"] - 1 if raw["p99_us"] else 0.0
+            if change > cls.flag_ratio:
+                flagged.append((endpoint, raw["p99_us"], corrected["p99_us"], change))
+            lines.append(
+                f"{endpoint:<40} {raw['count']:>8} {corrected['count'] - raw['count']:>8} "
+                f"{raw['p50_us'] / 1000:>9.2f} {raw['p99_us'] / 1000:>9.2f} {corrected['p99_us'] / 1000:>9.2f} "
+                f"{raw['p999_us'] / 1000:>9.2f} {corrected['p999_us'] / 1000:>10.2f}"
+                + (f" <- p99 +{change:.0%}" if change > cls.flag_ratio else "")
+            )
+        table = "\n".join(lines)
+        Logger.report(f"Coordinated omission corrected latency (ms)\n{table}")
+        for endpoint, raw_p99, corrected_p99, change in flagged:
+            Logger.log_message(
+                f"Coordinated omission: corrected p99 of {endpoint} is {corrected_p99 / 1000:.2f} ms, "
+                f"{change:.0%} above the measured {raw_p99 / 1000:.2f} ms",
+                LogType.ERROR,
+            )
+
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "w", newline="", encoding="utf-8") as csv_file:
+            writer = csv.writer(csv_file)
+            keys = ("count", "p50_us", "p90_us", "p99_us", "p999_us", "max_us")
+            writer.writerow(["endpoint"] + [f"raw_{key}" for key in keys] + [f"corrected_{key}" for key in keys])
+            for endpoint, raw, corrected in rows:
+                writer.writerow([endpoint] + [raw[key] for key in keys] + [corrected[key] for key in keys])
+        Logger.log_message(f"Corrected latency table written to {path}")
@@ -0,0 +1,56 @@
+"""HTTP client engines."""
+
+import enum
+
+from locust.clients import HttpSession
+from locust.contrib.fasthttp import FastHttpSession
+
+from utils.connection_policy import ConnectionPolicy, ManagedHTTPAdapter
+from utils.phase_timing import PhaseTiming, TimedHTTPAdapter
+
+
+class ClientEngine(enum.Enum):
+    """HTTP client backends: python-requests or geventhttpclient."""
+
+    REQUESTS = "requests"
+    FAST = "fast"
+
+
+class HttpEngine:
+    """Create HTTP clients for the selected engine."""
+
+    @staticmethod
+    def from_options(parsed_options, default=ClientEngine.REQUESTS):
+        """Get engine selected with --client-engine."""
+        engine = getattr(parsed_options, "client_engine", None) if parsed_options else None
+        return ClientEngine(engine) if engine else default
+
+    @staticmethod
+    def default_headers(engine):
+        """Headers the engine adds to requests that lack them, as (name, value) pairs.
+
+        FastHttpSession writes them into the headers passed to it, so read-only shared headers carry them.
+        """
+        if engine == ClientEngine.FAST:
+            return (("Accept-Encoding", "gzip, deflate, br"), ("Accept", "application/json"))
+        return ()
+
+    @staticmethod
+    def create_client(engine, environment, base_url, user=None, request_event=None):
+        """Create HTTP session. Requests are reported to request_event (environment request event by default).
+
+        Connection pools follow ConnectionPolicy (strategy, pool size, DNS cache).
+        """
+        if request_event is None:
+            request_event = environment.events.request
+
+        if engine == ClientEngine.FAST:
+            return FastHttpSession(
+                base_url=base_url, request_event=request_event, user=user, concurrency=ConnectionPolicy.pool_size
+            )
+
+        client = HttpSession(base_url=base_url, request_event=request_event, user=user)
+        client.trust_env = False
+        adapter = TimedHTTPAdapter if PhaseTiming.enabled else ManagedHTTPAdapter
+        adapter.mount(client)
+        return client
@@ -0,0 +1,267 @@
+"""HDR-style latency histograms with per-interval export."""
+
+import json
+import time
+from pathlib import Path
+
+import gevent
+
+from utils.logger import Logger, LogType
+
+AGGREGATED = "Aggregated"
+
+
+class LatencyHistogram:
+    """Log-linear histogram of integer microsecond values with constant memory.
+
+    Values below 2 ** sub_bucket_bits are counted exactly; above that every power of two is split into
+    2 ** (sub_bucket_bits - 1) equal buckets, so a bucket is at most 1 / 128 (0.8%) of its value wide.
+    Values above max_value (one hour) are counted as max_value. Histograms with the same sub_bucket_bits
+    merge by adding bucket counts.
+    """
+
+    sub_bucket_bits = 8
+    max_value = 3_600_000_000
+
+    __slots__ = ("counts", "count", "min", "max")
+
+    def __init__(self):
+        self.counts = {}
+        self.count = 0
+        self.min = None
+        self.max = 0
+
+    @classmethod
+    def index(cls, value):
+        """Bucket index of value."""
+        magnitude = value.bit_length() - cls.sub_bucket_bits
+        if magnitude <= 0:
+            return value
+        return (magnitude << (cls.sub_bucket_bits - 1)) + (value >> magnitude)
+
+    @classmethod
+    def bounds(cls, index):
+        """(lowest, highest) value counted in bucket index."""
+        half = 1 << (cls.sub_bucket_bits - 1)
+        if index < 2 * half:
+            return index, index
+        magnitude = index // half - 1
+        sub_bucket = index - magnitude * half
+        return sub_bucket << magnitude, ((sub_bucket + 1) << magnitude) - 1
+
+    def record(self, value):
+        """Count one value in microseconds."""
+        value = min(max(int(value), 0), self.max_value)
+        index = self.index(value)
+        self.counts[index] = self.counts.get(index, 0) + 1
+        self.count += 1
+        if self.min is None or value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+
+    def merge(self, other):
+        """Add counts of another histogram."""
+        for index, count in other.counts.items():
+            self.counts[index] = self.counts.get(index, 0) + count
+        self.count += other.count
+        if other.min is not None and (self.min is None or other.min < self.min):
+            self.min = other.min
+        self.max = max(self.max, other.max)
+        return self
+
+    def value_at(self, percentile):
+        """Highest value of the bucket holding the percentile (0-100), capped at the max recorded value."""
+        if not self.count:
+            return 0
+        rank = max(self.count * percentile / 100, 1)
+        seen = 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            if seen >= rank:
+                return min(self.bounds(index)[1], self.max)
+        return self.max
+
+    def summary(self):
+        """Count, min, max and tail percentiles in microseconds."""
+        return {
+            "count": self.count,
+            "min_us": self.min or 0,
+            "p50_us": self.value_at(50),
+            "p90_us": self.value_at(90),
+            "p99_us": self.value_at(99),
+            "p999_us": self.value_at(99.9),
+            "p9999_us": self.value_at(99.99),
+            "max_us": self.max,
+        }
+
+    def to_dict(self):
+        """Plain data for worker reports and the export file."""
+        return {"buckets": sorted(self.counts.items()), "count": self.count, "min": self.min, "max": self.max}
+
+    @classmethod
+    def from_dict(cls, data):
+        histogram = cls()
+        histogram.counts = {int(index): count for index, count in data["buckets"]}
+        histogram.count = data["count"]
+        histogram.min = data["min"]
+        histogram.max = data["max"]
+        return histogram
+
+
+class LatencyRecorder:
+    """Record the response time of every request into per-endpoint histograms per time interval.
+
+    Intervals are aligned to wall clock multiples of interval seconds, so intervals of different workers
+    match. Workers send pending intervals to master with each stats report. Master (or a standalone
+    process) writes intervals to a JSON Lines file once no more reports are expected for them
+    (settle seconds after their end): a header line, then one line per interval and endpoint, with an
+    "Aggregated" line per interval. At quit the whole run histograms are written as "total" lines
+    and summarized in the runtime log.
+    """
+
+    settle = 4.0
+
+    enabled = False
+    interval = 5.0
+    path = None
+
+    _intervals = {}
+    _slot = None
+    _current = None
+    _totals = {}
+    _file = None
+    _flusher = None
+
+    @classmethod
+    def start(cls, environment, interval: float):
+        """Record requests of this process from now on."""
+        cls.stop(environment)
+        cls.enabled = True
+        cls.interval = interval
+        cls._intervals = {}
+        cls._slot = None
+        cls._current = None
+        environment.events.request.add_listener(cls.on_request)
+
+    @classmethod
+    def stop(cls, environment):
+        """Stop recording. Intervals not reported or written yet are kept."""
+        if cls.enabled:
+            environment.events.request.remove_listener(cls.on_request)
+        cls.enabled = False
+
+    @classmethod
+    def open(cls, path, interval: float):
+        """Start writing intervals to path (on master or a standalone process)."""
+        cls.close()
+        cls.interval = interval
+        cls.path = Path(path)
+        cls.path.parent.mkdir(parents=True, exist_ok=True)
+        cls._totals = {}
+        cls._file = open(cls.path, "w", encoding="utf-8")  # noqa: SIM115 - kept open until close()
+        header = {"type": "header", "unit": "us", "interval": interval}
+        header["sub_bucket_bits"] = LatencyHistogram.sub_bucket_bits
+        cls._write(header)
+        cls._flusher = gevent.spawn(cls._flush_loop)
+
+    @classmethod
+    def on_request(cls, request_type, name, response_time, **kwargs):
+        """Count the response time of a request in its endpoint histogram of the current interval."""
+        if response_time is None:
+            return
+        slot = int(time.time() // cls.interval)
+        if slot != cls._slot:
+            cls._slot = slot
+            cls._current = cls._intervals.setdefault(slot, {})
+        key = (request_type, name)
+        histogram = cls._current.get(key)
+        if histogram is None:
+            histogram = cls._current[key] = LatencyHistogram()
+        histogram.record(response_time * 1000)
+
+    @classmethod
+    def on_report_to_master(cls, data, **kwargs):
+        """Hand pending intervals of this worker to master."""
+        if not cls._intervals:
+            return
+        data["latency_histograms"] = [
+            [slot, [[method, name, histogram.to_dict()] for (method, name), histogram in histograms.items()]]
+            for slot, histograms in cls._intervals.items()
+        ]
+        cls._intervals = {}
+        cls._slot = None
+
+    @classmethod
+    def on_worker_report(cls, client_id, data, **kwargs):
+        """Merge intervals reported by a worker."""
+        for slot, histograms in data.get("latency_histograms", []):
+            interval = cls._intervals.setdefault(slot, {})
+            for method, name, histogram in histograms:
+                histogram = LatencyHistogram.from_dict(histogram)
+                if (method, name) in interval:
+                    interval[(method, name)].merge(histogram)
+                else:
+                    interval[(method, name)] = histogram
+
+    @classmethod
+    def _flush_loop(cls):
+        while True:
+            gevent.sleep(cls.interval)
+            cls.flush(time.time() - cls.settle)
+
+    @classmethod
+    def flush(cls, before=None):
+        """Write intervals that ended before the given time (all if None)."""
+        if cls._file is None:
+            return
+        for slot in sorted(cls._intervals):
+            start = slot * cls.interval
+            if before is not None and start + cls.interval > before:
+                break
+            histograms = cls._intervals.pop(slot)
+            if slot == cls._slot:
+                cls._slot = None
+            aggregated = LatencyHistogram()
+            for (method, name), histogram in sorted(histograms.items()):
+                aggregated.merge(histogram)
+                cls._write_histogram("interval", start, f"{method} {name}", histogram)
+            cls._write_histogram("interval", start, AGGREGATED, aggregated)
+        cls._file.flush()
+
+    @classmethod
+    def _write_histogram(cls, record_type, start, endpoint, histogram):
+        if record_type == "interval":
+            total = cls._totals.get(endpoint)
+            if total is None:
+                total = cls._totals[endpoint] = LatencyHistogram()
+            total.merge(histogram)
+        record = {"type": record_type, "start": start, "endpoint": endpoint, **histogram.summary()}
+        record["buckets"] = histogram.to_dict()["buckets"]
+        cls._write(record)
+
+    @classmethod
+    def _write(cls, record):
+        cls._file.write(json.dumps(record, separators=(",", ":")) + "\n")
+
+    @classmethod
+    def close(cls):
+        """Write remaining intervals and whole run totals, log the summary and close the file."""
+        if cls._flusher is not None:
+            cls._flusher.kill(block=False)
+            cls._flusher = None
+        if cls._file is None:
+            return
+        cls.flush()
+        for endpoint, histogram in cls._totals.items():
+            cls._write_histogram("total", None, endpoint, histogram)
+            summary = histogram.summary()
+            Logger.log_message(
+                f"Latency {endpoint}: {summary['count']} requests, p50 {summary['p50_us'] / 1000:.3f} ms, "
+                f"p99 {summary['p99_us'] / 1000:.3f} ms, p99.9 {summary['p999_us'] / 1000:.3f} ms, "
+                f"max {summary['max_us'] / 1000:.3f} ms",
+                LogType.INFO,
+            )
+        cls._file.close()
+        cls._file = None
+        Logger.log_message(f"Latency histograms written to {cls.path}")
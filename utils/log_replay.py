@@ -0,0 +1,276 @@
+"""Replay of a recorded access log with its original relative timing."""
+
+import datetime
+import json
+import re
+import time
+import zlib
+from collections import OrderedDict
+from urllib.parse import urlsplit
+
+import gevent
+from gevent.queue import Queue
+from locust.runners import LocalRunner
+
+from tests.scenarios import (
+    CREATE_TEST,
+    DELETE_TEST,
+    GET_STATS,
+    GET_TEST,
+    LIST_TESTS,
+    LIST_TESTS_WITH_PARAMS,
+    PARTIAL_UPDATE_TEST,
+    RUN_TEST,
+    UPDATE_TEST,
+)
+from utils.logger import Logger
+from utils.scenario import RequestStep
+
+# host ident user [time] "METHOD target PROTOCOL" status size ["referer" "user agent"]
+ACCESS_LOG_LINE = re.compile(
+    r'^(?P<host>\S+) \S+ (?P<user>\S+) \[(?P<time>[^\]]+)\] "(?P<method>[A-Z]+) (?P<target>\S+)[^"]*" (?P<status>\d{3}) '
+)
+
+# same endpoint and stats name as the synthetic task, with the recorded page and size
+REPLAY_LIST_WITH_PARAMS = RequestStep(
+    name=LIST_TESTS_WITH_PARAMS.name,
+    log_name=LIST_TESTS_WITH_PARAMS.log_name,
+    method="GET",
+    url="{replay_target}",
+    success=LIST_TESTS_WITH_PARAMS.success,
+    failure=LIST_TESTS_WITH_PARAMS.failure,
+)
+
+TEST_CASE_STEPS = {"GET": GET_TEST, "PUT": UPDATE_TEST, "PATCH": PARTIAL_UPDATE_TEST, "DELETE": DELETE_TEST}
+
+AUTH = "auth"
+
+
+def parse_time(value):
+    """Unix time of a JSONL time field: number, ISO 8601 or access log time."""
+    if isinstance(value, int | float):
+        return float(value)
+    value = str(value)
+    for parse in (
+        datetime.datetime.fromisoformat,
+        lambda text: datetime.datetime.strptime(text, "%d/%b/%Y:%H:%M:%S %z"),
+    ):
+        try:
+            return parse(value).timestamp()
+        except ValueError:
+            continue
+    return None
+
+
+def parse_line(line):
+    """(unix time, session, method, target) of a common/combined log or JSONL line, or None."""
+    if line.startswith("{"):
+        try:
+            record = json.loads(line)
+        except ValueError:
+            return None
+        timestamp = parse_time(record.get("ts", record.get("time", record.get("timestamp", ""))))
+        target = record.get("path") or record.get("url") or record.get("target")
+        session = record.get("session") or record.get("user") or record.get("ip") or record.get("client")
+        method = str(record.get("method", "GET")).upper()
+        if timestamp is None or not target:
+            return None
+        return timestamp, str(session or "-"), method, target
+    match = ACCESS_LOG_LINE.match(line)
+    if match is None:
+        return None
+    timestamp = parse_time(match["time"])
+    if timestamp is None:
+        return None
+    # authenticated user if the log has one, client address otherwise
+    session = match["user"] if match["user"] != "-" else match["host"]
+    return timestamp, session, match["method"], match["target"]
+
+
+def route(method, target):
+    """(request step, recorded test id) of a TestMe API request, (AUTH, None) or None if not mapped."""
+    url = urlsplit(target)
+    parts = url.path.strip("/").split("/")
+    if parts[:2] == ["api", "auth"]:
+        return AUTH, None
+    if parts == ["api", "getstat"] and method == "GET":
+        return GET_STATS, None
+    if parts[:2] != ["api", "tests"]:
+        return None
+    if len(parts) == 2 and method == "GET":
+        return (REPLAY_LIST_WITH_PARAMS if url.query else LIST_TESTS), None
+    if parts[2:] == ["new"] and method == "POST":
+        return CREATE_TEST, None
+    if len(parts) == 3 and parts[2] != "new" and method in TEST_CASE_STEPS:
+        return TEST_CASE_STEPS[method], parts[2]
+    if parts[3:] == ["status"] and len(parts) == 4 and method == "POST":
+        return RUN_TEST, parts[2]
+    return None
+
+
+class LogReplay:
+    """Access log replay at the recorded request offsets.
+
+    One dispatcher greenlet per process streams the log from disk and skips sessions of other workers
+    (sessions are split by a stable hash, so a session stays on one worker). A request is due at its
+    offset from the first record of the log divided by speed. Every session sticks to one task set, which
+    sends its requests in order with the logged in credential of its user; the id of the test case last
+    created by the session (or else by the user) in the replay replaces the recorded id. Login and logout
+    records are skipped, since users log in on start, and requests outside the TestMe API are counted as
+    unmapped.
+    """
+
+    path = None
+    speed = 1.0
+    worker_index = 0
+    worker_count = 1
+    late_after = 1.0
+    max_sessions = 100_000
+
+    replayed = 0
+    late = 0
+    auth = 0
+    unmapped = 0
+    finished = False
+
+    _environment = None
+    _dispatcher = None
+    _tasksets = []
+    _sessions = OrderedDict()
+    _next_taskset = 0
+
+    @classmethod
+    def configure(cls, path, speed=1.0, worker_index=0, worker_count=1):
+        if speed <= 0:
+            raise ValueError(f"--replay-speed must be positive, got {speed}")
+        cls.path = path
+        cls.speed = speed
+        cls.worker_index = worker_index
+        cls.worker_count = worker_count
+
+    @classmethod
+    def records(cls):
+        """(offset seconds, session, method, target) of this worker's shard, first record of the log at 0."""
+        first = None
+        with open(cls.path, encoding="utf-8", errors="replace") as log:
+            for line in log:
+                record = parse_line(line)
+                if record is None:
+                    continue
+                timestamp, session, method, target = record
+                if first is None:
+                    first = timestamp
+                if zlib.crc32(session.encode()) % cls.worker_count == cls.worker_index:
+                    yield timestamp - first, session, method, target
+
+    @classmethod
+    def start(cls, environment):
+        cls.stop()
+        cls._environment = environment
+        cls.replayed = cls.late = cls.auth = cls.unmapped = 0
+        cls.finished = False
+        cls._sessions = OrderedDict()
+
+    @classmethod
+    def stop(cls):
+        if cls._dispatcher is not None:
+            cls._dispatcher.kill(block=False)
+            cls._dispatcher = None
+        cls._tasksets = []
+
+    @classmethod
+    def register(cls, taskset):
+        """Give taskset a queue of requests; the first registered task set starts the replay clock."""
+        taskset.replay_queue = Queue()
+        cls._tasksets.append(taskset)
+        if cls._dispatcher is None and not cls.finished:
+            cls._dispatcher = gevent.spawn(cls._dispatch)
+
+    @classmethod
+    def unregister(cls, taskset):
+        if taskset in cls._tasksets:
+            cls._tasksets.remove(taskset)
+
+    @classmethod
+    def _taskset_of(cls, session):
+        """Task set the session sticks to, assigned round-robin on first sight or if its user stopped."""
+        taskset = cls._sessions.get(session)
+        if taskset is not None and taskset in cls._tasksets:
+            cls._sessions.move_to_end(session)
+            return taskset
+        cls._next_taskset = (cls._next_taskset + 1) % len(cls._tasksets)
+        taskset = cls._sessions[session] = cls._tasksets[cls._next_taskset]
+        if len(cls._sessions) > cls.max_sessions:
+            cls._sessions.popitem(last=False)
+        return taskset
+
+    @classmethod
+    def _dispatch(cls):
+        started = time.monotonic()
+        for offset, session, method, target in cls.records():
+            mapped = route(method, target)
+            if mapped is None:
+                cls.unmapped += 1
+                continue
+            if mapped[0] is AUTH:
+                cls.auth += 1
+                continue
+            due = started + offset / cls.speed
+            gevent.sleep(max(due - time.monotonic(), 0))
+            while not cls._tasksets:
+                gevent.sleep(0.1)
+            step, test_id = mapped
+            cls._taskset_of(session).replay_queue.put((due, session, step, test_id, target))
+        cls.finished = True
+        Logger.log_message(f"Replay of {cls.path} finished after {time.monotonic() - started:.0f} s")
+        runner = cls._environment.runner
+        if isinstance(runner, LocalRunner):
+            # let queued requests drain, then end a standalone run
+            while any(taskset.replay_queue.qsize() for taskset in cls._tasksets):
+                gevent.sleep(0.5)
+            gevent.sleep(cls.late_after)
+            # test_stop kills this greenlet, so quit from another one
+            gevent.spawn(runner.quit)
+
+    @classmethod
+    def replay(cls, taskset):
+        """Send the next request of the task set's sessions. Blocks until one is due."""
+        due, session, step, recorded_id, target = taskset.replay_queue.get()
+        if time.monotonic() - due > cls.late_after:
+            cls.late += 1
+        created = taskset.test_ids.get(session)
+        # recorded ids rarely exist on the target: use the session's, else the user's latest test case
+        taskset.test_id = created or taskset.last_test_id or recorded_id
+        taskset.replay_target = target
+        succeeded = step(taskset)
+        if step is CREATE_TEST and succeeded:
+            taskset.test_ids[session] = taskset.last_test_id = taskset.test_id
+        elif step is DELETE_TEST:
+            taskset.test_ids.pop(session, None)
+            if taskset.test_id == taskset.last_test_id:
+                taskset.last_test_id = None
+        cls.replayed += 1
+
+    @classmethod
+    def on_report_to_master(cls, data, **kwargs):
+        """Hand replay counts since the last report to master."""
+        if cls.replayed or cls.auth or cls.unmapped:
+            data["replay"] = [cls.replayed, cls.late, cls.auth, cls.unmapped]
+            cls.replayed = cls.late = cls.auth = cls.unmapped = 0
+
+    @classmethod
+    def on_worker_report(cls, client_id, data, **kwargs):
+        """Add replay counts reported by a worker."""
+        replayed, late, auth, unmapped = data.get("replay", (0, 0, 0, 0))
+        cls.replayed += replayed
+        cls.late += late
+        cls.auth += auth
+        cls.unmapped += unmapped
+
+    @classmethod
+    def log_summary(cls):
+        message = (
+            f"Replay of {cls.path} at {cls.speed:g}x: {cls.replayed} requests replayed, {cls.late} more than "
+            f"{cls.late_after:g} s late, {cls.auth} login/logout records skipped, {cls.unmapped} unmapped"
+        )
+        Logger.report(message)
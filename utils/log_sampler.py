@@ -0,0 +1,52 @@
+"""Sampling policies for the request/response log."""
+
+import enum
+import time
+
+
+class SamplingPolicy(enum.Enum):
+    """Which request/response records are kept."""
+
+    ALL = "all"
+    ERRORS = "errors"
+    RATIO = "ratio"
+
+
+class LogSampler:
+    """Decide per record whether it is written.
+
+    ``ratio`` keeps 1 in N successful records per endpoint and every failure.
+    ``rate_cap`` additionally limits each endpoint to that many records per second (0 - no cap).
+    """
+
+    def __init__(self, policy: SamplingPolicy = SamplingPolicy.ALL, ratio: int = 10, rate_cap: float = 0):
+        self.policy = policy
+        self.ratio = max(1, ratio)
+        self.rate_cap = rate_cap
+        self._seen = {}
+        self._buckets = {}
+
+    def should_log(self, name: str, failed: bool) -> bool:
+        """Check if the record for endpoint name should be written."""
+        if self.policy == SamplingPolicy.ERRORS and not failed:
+            return False
+        if self.policy == SamplingPolicy.RATIO and not failed:
+            seen = self._seen.get(name, 0)
+            self._seen[name] = seen + 1
+            if seen % self.ratio:
+                return False
+        if self.rate_cap > 0:
+            return self._take_token(name)
+        return True
+
+    def _take_token(self, name):
+        """Token bucket per endpoint, refilled at rate_cap tokens per second."""
+        now = time.monotonic()
+        capacity = max(1.0, self.rate_cap)
+        tokens, last = self._buckets.get(name, (capacity, now))
+        tokens = min(capacity, tokens + (now - last) * self.rate_cap)
+        if tokens < 1:
+            self._buckets[name] = (tokens, now)
+            return False
+        self._buckets[name] = (tokens - 1, now)
+        return True
@@ -0,0 +1,129 @@
+"""Background batched writer for the request/response log."""
+
+import collections
+import enum
+import threading
+from pathlib import Path
+
+
+class OverflowPolicy(enum.Enum):
+    """What to do with a new record when the queue is full."""
+
+    BLOCK = "block"
+    DROP_OLDEST = "drop-oldest"
+    DROP = "drop"
+
+
+class LogWriter:
+    """Bounded in-memory queue drained by one writer that appends to a log file in batches.
+
+    The file handle stays open for the writer's lifetime. A batch is written once the queued
+    data reaches ``flush_bytes`` or ``flush_interval`` seconds have passed, whichever comes first.
+    """
+
+    def __init__(
+        self,
+        path,
+        flush_interval: float = 1.0,
+        flush_bytes: int = 1024 * 1024,
+        queue_size: int = 10000,
+        overflow: OverflowPolicy = OverflowPolicy.BLOCK,
+    ):
+        self.path = Path(path)
+        self.flush_interval = flush_interval
+        self.flush_bytes = flush_bytes
+        self.queue_size = queue_size
+        self.overflow = overflow
+        self.dropped = 0
+
+        self._queue = collections.deque()
+        self._queued_bytes = 0
+        self._cond = threading.Condition()
+        self._io_lock = threading.Lock()
+        self._closed = False
+        self._file = None
+        self._thread = None
+
+    def start(self):
+        """Open the log file and start the writer."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.path, "a", encoding="utf-8")  # noqa: SIM115 - kept open until close()
+        self._thread = threading.Thread(target=self._run, name="log-writer", daemon=True)
+        self._thread.start()
+
+    def write(self, data: str):
+        """Queue data for writing, applying the overflow policy when the queue is full."""
+        with self._cond:
+            if self._closed:
+                self.dropped += 1
+                return
+            if len(self._queue) >= self.queue_size:
+                if self.overflow == OverflowPolicy.BLOCK:
+                    self._cond.notify_all()
+                    while len(self._queue) >= self.queue_size and not self._closed:
+                        self._cond.wait()
+                    if self._closed:
+                        self.dropped += 1
+                        return
+                elif self.overflow == OverflowPolicy.DROP_OLDEST:
+                    self._queued_bytes -= len(self._queue.popleft())
+                    self.dropped += 1
+                else:
+                    self.dropped += 1
+                    return
+            self._queue.append(data)
+            self._queued_bytes += len(data)
+            if self._queued_bytes >= self.flush_bytes:
+                self._cond.notify_all()
+
+    def flush(self):
+        """Write everything queued so far."""
+        with self._cond:
+            batch = self._drain()
+        self._write_batch(batch)
+
+    def close(self):
+        """Stop the writer, write the remaining records and close the file."""
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join()
+        self.flush()
+        with self._io_lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def _drain(self):
+        """Take all queued records. Caller must hold the condition."""
+        batch = list(self._queue)
+        self._queue.clear()
+        self._queued_bytes = 0
+        self._cond.notify_all()
+        return batch
+
+    def _is_due(self):
+        return self._queued_bytes >= self.flush_bytes or len(self._queue) >= self.queue_size
+
+    def _write_batch(self, batch):
+        if not batch:
+            return
+        with self._io_lock:
+            if self._file is None:
+                return
+            self._file.write("".join(batch))
+            self._file.flush()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                if not self._closed and not self._is_due():
+                    self._cond.wait(self.flush_interval)
+                batch = self._drain()
+                closed = self._closed
+            self._write_batch(batch)
+            if closed:
+                return
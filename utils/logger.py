@@ -2,13 +2,19 @@
 
 import datetime
 import enum
+import itertools
 import json
 import logging
 import threading
+import time
 from pathlib import Path
 
 from requests import Response
 
+from utils.log_sampler import LogSampler
+from utils.log_writer import LogWriter, OverflowPolicy
+from utils.utils import Utils
+
 
 class LogType(enum.Enum):
     """Log levels."""
@@ -17,14 +23,34 @@ class LogType(enum.Enum):
     DEBUG = 2
     ERROR = 3
     CRITICAL = 4
+    WARNING = 5
+
+
+class LogMode(enum.Enum):
+    """Request/response log formats."""
+
+    COMPACT = "compact"
+    DEBUG = "debug"
+    OFF = "off"
 
 
 class Logger:
-    """Runtime messages and HTTP request/response logger."""
+    """Runtime messages and HTTP request/response logger.
+
+    Messages and task results may be passed as callables; they are built only if a log keeps them.
+    With enabled set to False (--log-mode off) every logging call returns right away.
+    """
 
+    enabled = True
     log_obj = None
     file_handler = None
     _file_lock = threading.Lock()
+    _writer = None
+    _writer_settings = {}
+    _mode = LogMode.COMPACT
+    _sampler = LogSampler()
+    _pending = threading.local()
+    _request_ids = itertools.count(1)
 
     _dir_path = Path(__file__).parent.parent
     _logs_dir = Path(_dir_path, "logs")
@@ -37,10 +63,58 @@ class Logger:
 
     @classmethod
     def _write_log_to_file(cls, data: str):
-        """Write to request/response log file (thread-safe)."""
-        cls._ensure_logs_dir()
-        with cls._file_lock, open(cls._request_log_file, "a", encoding="utf-8") as log_file:
-            log_file.write(data)
+        """Queue data for the request/response log writer."""
+        writer = cls._writer
+        if writer is None:
+            writer = cls._start_writer()
+        writer.write(data)
+
+    @classmethod
+    def _start_writer(cls):
+        """Start the background writer for the request/response log file."""
+        with cls._file_lock:
+            if cls._writer is None:
+                cls._ensure_logs_dir()
+                log_file = cls._request_log_file
+                if cls._mode == LogMode.COMPACT:
+                    log_file = log_file.with_suffix(".jsonl")
+                writer = LogWriter(log_file, **cls._writer_settings)
+                writer.start()
+                cls._writer = writer
+            return cls._writer
+
+    @classmethod
+    def configure_request_log(
+        cls,
+        flush_interval: float = 1.0,
+        flush_bytes: int = 1024 * 1024,
+        queue_size: int = 10000,
+        overflow: OverflowPolicy = OverflowPolicy.BLOCK,
+        mode: LogMode = LogMode.COMPACT,
+        sampler: LogSampler = None,
+    ):
+        """Set format, sampling, batching and overflow settings for the request/response log."""
+        cls.close_request_log()
+        cls.enabled = mode != LogMode.OFF
+        cls._mode = mode
+        cls._sampler = sampler or LogSampler()
+        cls._writer_settings = {
+            "flush_interval": flush_interval,
+            "flush_bytes": flush_bytes,
+            "queue_size": queue_size,
+            "overflow": overflow,
+        }
+
+    @classmethod
+    def close_request_log(cls):
+        """Flush queued request/response records and close the log file."""
+        with cls._file_lock:
+            writer, cls._writer = cls._writer, None
+        if writer is None:
+            return
+        writer.close()
+        if writer.dropped:
+            Logger.log_message(f"Request log dropped {writer.dropped} records (queue full)", LogType.ERROR)
 
     @staticmethod
     def init_logger(name, log_file):
@@ -58,30 +132,57 @@ class Logger:
         Logger.file_handler.setFormatter(formatter)
         Logger.log_obj.addHandler(Logger.file_handler)
 
+    @classmethod
+    def keeps_results(cls):
+        """Check if task results of successful requests are written: runtime log or debug request log."""
+        return (cls.log_obj is not None or cls._mode is LogMode.DEBUG) and cls.enabled
+
     @staticmethod
     def log_message(message, log_type=LogType.INFO):
-        """Log message with specified log level."""
-        if not Logger.log_obj:
+        """Log message with specified log level. Message may be a callable returning it."""
+        if not Logger.log_obj or not Logger.enabled:
             return
+        if callable(message):
+            message = message()
 
         if log_type == LogType.INFO:
             Logger.log_obj.info(message)
         elif log_type == LogType.DEBUG:
             Logger.log_obj.debug(message)
+        elif log_type == LogType.WARNING:
+            Logger.log_obj.warning(message)
         elif log_type == LogType.ERROR:
             Logger.log_obj.error(message)
         else:
             Logger.log_obj.critical(message)
 
+    @staticmethod
+    def report(message, log_type=LogType.INFO):
+        """Print message to the console and write it to the runtime log, which is off without --logfile."""
+        prefix = "" if log_type == LogType.INFO else f"{log_type.name}: "
+        print(f"{prefix}{message}", flush=True)
+        Logger.log_message(message, log_type)
+
     @classmethod
     def add_request(cls, task_name: str, url: str, method: str, body=None):
         """Log request details."""
+        if not cls.enabled:
+            return
+        if cls._mode == LogMode.COMPACT:
+            cls._pending.request = (task_name, method, url, body)
+            return
+
+        request_id = next(cls._request_ids)
+        cls._pending.request_id = request_id
         data_to_add = "\n-----\n"
         data_to_add += f"Task: {task_name}\n"
         data_to_add += f"Time: {datetime.datetime.now()}\n"
+        data_to_add += f"Request ID: {request_id}\n"
         data_to_add += f"Request method: {method}\n"
         data_to_add += f"Request URL: {url}\n"
         if body is not None:
+            if isinstance(body, bytes):
+                body = body.decode("utf-8", "replace")
             if isinstance(body, dict):
                 data_to_add += f"Request Body: {json.dumps(body, indent=2)}\n"
             else:
@@ -91,15 +192,24 @@ class Logger:
         cls._write_log_to_file(data_to_add)
 
     @classmethod
-    def add_response(cls, result: Response, task_result: str = None):
-        """Log response details."""
-        try:
-            cookies_as_dict = dict(result.cookies) if result.cookies else {}
-        except (TypeError, AttributeError):
-            cookies_as_dict = {}
+    def add_response(cls, result: Response, task_result=None, failed: bool = None):
+        """Log response details. Failure is derived from the status code unless given.
+
+        Task result may be a callable returning it.
+        """
+        if not cls.enabled:
+            return
+        if cls._mode == LogMode.COMPACT:
+            cls._add_compact_record(result, task_result, failed)
+            return
+
+        if callable(task_result):
+            task_result = task_result()
+
+        cookies_as_dict = Utils.get_response_cookies(result)
 
         try:
-            headers_as_dict = dict(result.headers) if result.headers else {}
+            headers_as_dict = cls._headers_as_dict(result.headers) if result.headers else {}
         except (TypeError, AttributeError):
             headers_as_dict = {}
 
@@ -108,6 +218,58 @@ class Logger:
         data_to_add += f"Response text: {result.text}\n"
         data_to_add += f"Response headers: {headers_as_dict}\n"
         data_to_add += f"Response cookies: {cookies_as_dict}\n"
+        data_to_add += f"Response time: {datetime.datetime.now()}\n"
+        request_id = getattr(cls._pending, "request_id", None)
+        cls._pending.request_id = None
+        if request_id is not None:
+            data_to_add += f"Request ID: {request_id}\n"
         data_to_add += "\n-----\n"
 
         cls._write_log_to_file(data_to_add)
+
+    @staticmethod
+    def _headers_as_dict(headers):
+        """Response headers as {name: str} for both engines, repeated fields joined into one value."""
+        names, values = {}, {}
+        for name, value in headers.items():
+            key = name.lower()
+            names.setdefault(key, name)
+            values[key] = f"{values[key]}, {value}" if key in values else str(value)
+        return {names[key]: value for key, value in values.items()}
+
+    @classmethod
+    def _add_compact_record(cls, result: Response, task_result=None, failed: bool = None):
+        """Write one JSON Lines record for the request/response pair, subject to sampling."""
+        request = getattr(cls._pending, "request", None)
+        cls._pending.request = None
+        task_name, method, url, body = request or (None, None, None, None)
+        if failed is None:
+            failed = not 0 < result.status_code < 400
+        if not cls._sampler.should_log(task_name or url, failed):
+            return
+
+        request_meta = getattr(result, "request_meta", None) or {}
+        latency = request_meta.get("response_time")
+        if latency is None and getattr(result, "elapsed", None) is not None:
+            latency = result.elapsed.total_seconds() * 1000
+        sent_body = getattr(result.request, "body", None) if result.request is not None else None
+        response_bytes = request_meta.get("response_length")
+        if response_bytes is None:
+            response_bytes = len(result.content or b"")
+
+        record = {
+            "ts": round(time.time(), 3),
+            "task": task_name,
+            "method": method,
+            "url": url,
+            "status": result.status_code,
+            "latency_ms": round(latency, 2) if latency is not None else None,
+            "req_bytes": len(sent_body) if sent_body else 0,
+            "resp_bytes": response_bytes,
+            "failed": failed,
+        }
+        if failed:
+            record["result"] = task_result() if callable(task_result) else task_result
+            record["request_body"] = body.decode("utf-8", "replace") if isinstance(body, bytes) else body
+            record["response_body"] = result.text
+        cls._write_log_to_file(json.dumps(record, separators=(",", ":"), default=str) + "\n")
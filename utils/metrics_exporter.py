@@ -0,0 +1,120 @@
+"""Live load generator metrics in OpenMetrics text format."""
+
+import bisect
+import time
+
+import gevent
+from gevent.pywsgi import WSGIServer
+
+from utils.logger import Logger
+
+CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+
+
+class MetricsExporter:
+    """Serve per-endpoint counters, response time histograms and user gauges at http://HOST:PORT/metrics.
+
+    Runs on master (or a standalone runner), whose stats already merge all workers, so it also works
+    with headless: true where there is no web UI. The exposition is rendered every interval seconds from
+    Locust's stats and scrapes get the last rendering. Histograms use fixed buckets built from Locust's
+    rounded response time counts, so memory does not grow with the run length.
+    """
+
+    # seconds, Prometheus client default buckets extended for slow endpoints
+    buckets = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+    interval = 1.0
+
+    _environment = None
+    _server = None
+    _refresher = None
+    _body = b"# EOF\n"
+
+    @classmethod
+    def start(cls, environment, host: str, port: int, interval: float = 1.0):
+        """Listen on host:port and refresh metrics every interval seconds."""
+        cls.stop()
+        cls._environment = environment
+        cls.interval = interval
+        cls.refresh()
+        cls._server = WSGIServer((host, port), cls.application, log=None)
+        cls._server.start()
+        cls._refresher = gevent.spawn(cls._refresh_loop)
+        Logger.log_message(f"OpenMetrics endpoint at http://{host}:{port}/metrics")
+
+    @classmethod
+    def stop(cls):
+        if cls._refresher is not None:
+            cls._refresher.kill(block=False)
+            cls._refresher = None
+        if cls._server is not None:
+            cls._server.stop(timeout=1)
+            cls._server = None
+
+    @classmethod
+    def _refresh_loop(cls):
+        while True:
+            gevent.sleep(cls.interval)
+            cls.refresh()
+
+    @classmethod
+    def application(cls, environ, start_response):
+        if environ.get("PATH_INFO") != "/metrics":
+            start_response("404 Not Found", [("Content-Type", "text/plain")])
+            return [b"Not found\n"]
+        body = cls._body
+        start_response("200 OK", [("Content-Type", CONTENT_TYPE), ("Content-Length", str(len(body)))])
+        return [body]
+
+    @staticmethod
+    def label(value):
+        return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+    @classmethod
+    def refresh(cls):
+        """Render the exposition from the current stats."""
+        environment = cls._environment
+        entries = sorted(environment.stats.entries.values(), key=lambda entry: (entry.name, entry.method))
+        runner = environment.runner
+
+        requests = ["# TYPE locust_requests counter", "# HELP locust_requests Requests completed."]
+        failures = ["# TYPE locust_failures counter", "# HELP locust_failures Requests failed."]
+        histogram = [
+            "# TYPE locust_response_time_seconds histogram",
+            "# UNIT locust_response_time_seconds seconds",
+            "# HELP locust_response_time_seconds Response time of requests.",
+        ]
+        for entry in entries:
+            labels = f'method="{cls.label(entry.method)}",name="{cls.label(entry.name)}"'
+            requests.append(f"locust_requests_total{{{labels}}} {entry.num_requests}")
+            failures.append(f"locust_failures_total{{{labels}}} {entry.num_failures}")
+            counts = [0] * (len(cls.buckets) + 1)
+            for response_time, count in entry.response_times.items():
+                counts[bisect.bisect_left(cls.buckets, response_time / 1000)] += count
+            cumulative = 0
+            for index, bound in enumerate(cls.buckets):
+                cumulative += counts[index]
+                histogram.append(f'locust_response_time_seconds_bucket{{{labels},le="{bound:g}"}} {cumulative}')
+            cumulative += counts[-1]
+            histogram.append(f'locust_response_time_seconds_bucket{{{labels},le="+Inf"}} {cumulative}')
+            histogram.append(f"locust_response_time_seconds_count{{{labels}}} {cumulative}")
+            histogram.append(f"locust_response_time_seconds_sum{{{labels}}} {entry.total_response_time / 1000:.6f}")
+
+        users = ["# TYPE locust_users gauge", "# HELP locust_users Running users per user class."]
+        # master counts the users its workers report, other runners their own user greenlets
+        user_counts = getattr(runner, "reported_user_classes_count", None) or getattr(runner, "user_classes_count", {})
+        for user_class, count in sorted(user_counts.items()):
+            users.append(f'locust_users{{user_class="{cls.label(user_class)}"}} {count}')
+        gauges = [
+            "# TYPE locust_workers gauge",
+            "# HELP locust_workers Connected workers (1 for a standalone run).",
+            f"locust_workers {getattr(runner, 'worker_count', 1)}",
+            "# TYPE locust_running gauge",
+            "# HELP locust_running 1 while a test is running.",
+            f"locust_running {int(getattr(runner, 'state', '') in ('spawning', 'running'))}",
+            "# TYPE locust_last_refresh_seconds gauge",
+            "# HELP locust_last_refresh_seconds Unix time these metrics were rendered.",
+            f"locust_last_refresh_seconds {time.time():.3f}",
+        ]
+        lines = requests + failures + histogram + users + gauges + ["# EOF"]
+        cls._body = ("\n".join(lines) + "\n").encode()
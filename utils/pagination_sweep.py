@@ -0,0 +1,111 @@
+"""Pagination depth and page size sweep of the test case list."""
+
+import csv
+import itertools
+from pathlib import Path
+
+from utils.logger import Logger
+from utils.scenario import RequestStep
+
+
+class PaginationSweep:
+    """Grid of (page, size) cells of GET /api/tests, each its own request step and stats entry.
+
+    Pages grow on a 1-2-5 log scale up to max_page, sizes come from the configured list. Users take the
+    cells round-robin, so every cell gets about the same number of requests. At the end the p50/p95/p99
+    of every cell are written as a table and p95 is printed as a page x size heatmap, with the ratio of
+    the deepest to the first page per size, so deep offset regressions show up directly.
+    """
+
+    pages = []
+    sizes = []
+    steps = {}
+    _cells = None
+
+    @staticmethod
+    def log_pages(max_page: int):
+        """1, 2, 5, 10, 20, 50, ... up to and including max_page."""
+        pages = []
+        for decade in itertools.count():
+            for factor in (1, 2, 5):
+                page = factor * 10**decade
+                if page >= max_page:
+                    return [*pages, max_page]
+                pages.append(page)
+
+    @staticmethod
+    def parse_sizes(sizes: str):
+        values = sorted({int(size) for size in str(sizes).replace(" ", "").split(",") if size})
+        if not values or values[0] < 1:
+            raise ValueError(f"--pagination-sizes must be positive integers, got {sizes!r}")
+        return values
+
+    @staticmethod
+    def step_name(page: int, size: int):
+        return f"List Test Cases page={page} size={size}"
+
+    @classmethod
+    def configure(cls, max_page: int, sizes: str):
+        cls.pages = cls.log_pages(max(max_page, 1))
+        cls.sizes = cls.parse_sizes(sizes)
+        cls.steps = {
+            (page, size): RequestStep(
+                name=cls.step_name(page, size),
+                log_name="List Tests page sweep",
+                method="GET",
+                url=f"/api/tests?page={page}&size={size}",
+                success="List of tests successfully received by user: {username}",
+                failure="List of tests receiving failed by user: {username}",
+            )
+            for page in cls.pages
+            for size in cls.sizes
+        }
+        cls._cells = itertools.cycle(cls.steps.values())
+
+    @classmethod
+    def next_step(cls):
+        return next(cls._cells)
+
+    @classmethod
+    def rows(cls, stats):
+        """Per cell: page, size, requests, failures and p50/p95/p99 ms (None without requests)."""
+        rows = []
+        for page in cls.pages:
+            for size in cls.sizes:
+                entry = stats.entries.get((cls.step_name(page, size), "GET"))
+                requests = entry.num_requests if entry else 0
+                row = {"page": page, "size": size, "requests": requests, "failures": entry.num_failures if entry else 0}
+                for percent in (50, 95, 99):
+                    row[f"p{percent}_ms"] = entry.get_response_time_percentile(percent / 100) if requests else None
+                rows.append(row)
+        return rows
+
+    @classmethod
+    def heatmap(cls, rows):
+        """p95 ms as pages x sizes text table with the deepest / first page ratio per size."""
+        p95 = {(row["page"], row["size"]): row["p95_ms"] for row in rows}
+        lines = ["p95 ms      " + "".join(f"{f'size {size}':>11}" for size in cls.sizes)]
+        for page in cls.pages:
+            cells = (p95[page, size] for size in cls.sizes)
+            lines.append(f"{f'page {page}':<12}" + "".join(f"{'-' if value is None else value:>11}" for value in cells))
+        ratios = []
+        for size in cls.sizes:
+            first, deepest = p95[cls.pages[0], size], p95[cls.pages[-1], size]
+            ratios.append(f"{deepest / first:.1f}x" if first and deepest is not None else "-")
+        lines.append(f"{f'page {cls.pages[-1]}/1':<12}" + "".join(f"{ratio:>11}" for ratio in ratios))
+        return "\n".join(lines)
+
+    @classmethod
+    def report(cls, stats, path):
+        """Print and log the heatmap and write the cell table to a CSV file."""
+        rows = cls.rows(stats)
+        if not any(row["requests"] for row in rows):
+            return
+        Logger.report(f"Pagination sweep (GET /api/tests)\n{cls.heatmap(rows)}")
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "w", newline="", encoding="utf-8") as report_file:
+            writer = csv.DictWriter(report_file, fieldnames=list(rows[0]))
+            writer.writeheader()
+            writer.writerows(rows)
+        Logger.log_message(f"Pagination sweep table written to {path}")
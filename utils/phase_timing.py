@@ -0,0 +1,201 @@
+"""Connect, time to first byte and download time of HTTP requests."""
+
+import csv
+import time
+from pathlib import Path
+
+from utils.connection_policy import (
+    ManagedHTTPAdapter,
+    ManagedHTTPConnection,
+    ManagedHTTPConnectionPool,
+    ManagedHTTPSConnection,
+    ManagedHTTPSConnectionPool,
+)
+from utils.latency_histogram import AGGREGATED
+from utils.logger import Logger
+
+
+class TimedConnectionMixin:
+    """Time connection setup and the wait for response headers of each request on this connection."""
+
+    _connected_at = None
+    _connect_time = None
+    _request_started = None
+
+    def connect(self):
+        started = time.perf_counter()
+        super().connect()
+        self._connected_at = time.perf_counter()
+        self._connect_time = self._connected_at - started
+
+    def request(self, *args, **kwargs):
+        self._request_started = time.perf_counter()
+        super().request(*args, **kwargs)
+
+    def getresponse(self):
+        response = super().getresponse()
+        headers_at = time.perf_counter()
+        # plain HTTP connects inside request(), HTTPS before it: the wait starts once both happened
+        started = max(self._request_started or headers_at, self._connected_at or 0)
+        # [connect seconds or None for a reused connection, seconds until headers, headers epoch time]
+        response.phase_timing = [self._connect_time, headers_at - started, time.time()]
+        self._connect_time = None
+        return response
+
+
+class TimedHTTPConnection(TimedConnectionMixin, ManagedHTTPConnection):
+    pass
+
+
+class TimedHTTPSConnection(TimedConnectionMixin, ManagedHTTPSConnection):
+    pass
+
+
+class TimedHTTPConnectionPool(ManagedHTTPConnectionPool):
+    ConnectionCls = TimedHTTPConnection
+
+
+class TimedHTTPSConnectionPool(ManagedHTTPSConnectionPool):
+    ConnectionCls = TimedHTTPSConnection
+
+
+class TimedHTTPAdapter(ManagedHTTPAdapter):
+    """requests adapter whose connection pools also time every request."""
+
+    pool_classes = {"http": TimedHTTPConnectionPool, "https": TimedHTTPSConnectionPool}
+
+
+class PhaseTiming:
+    """Connection reuse and request phase times per endpoint.
+
+    Clients of the requests engine get a TimedHTTPAdapter (see HttpEngine.create_client), which notes on
+    every response whether a new connection was opened, how long connecting took and how long the request
+    waited for response headers (TTFB: sending the request and server time). Download is the rest of the
+    response time: reading the body up to the request event. Workers send their sums to master.
+    """
+
+    enabled = False
+
+    # (method, name) -> [requests, new connections, connect s, connect max, ttfb s, ttfb max, download s, download max]
+    stats = {}
+
+    @classmethod
+    def start(cls, environment):
+        """Time requests of requests engine clients created from now on."""
+        cls.stop(environment)
+        cls.enabled = True
+        cls.stats = {}
+        environment.events.request.add_listener(cls.on_request)
+
+    @classmethod
+    def stop(cls, environment):
+        """Stop recording, keep sums until reported."""
+        if cls.enabled:
+            environment.events.request.remove_listener(cls.on_request)
+        cls.enabled = False
+
+    @classmethod
+    def on_request(cls, request_type, name, response_time, response=None, start_time=None, **kwargs):
+        timing = getattr(getattr(response, "raw", None), "phase_timing", None)
+        if timing is None or response_time is None or start_time is None:
+            return
+        connect, ttfb, headers_at = timing
+        download = max(start_time + response_time / 1000 - headers_at, 0.0)
+        entry = cls.stats.get((request_type, name))
+        if entry is None:
+            entry = cls.stats[(request_type, name)] = [0, 0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0]
+        entry[0] += 1
+        if connect is not None:
+            entry[1] += 1
+            entry[2] += connect
+            entry[3] = max(entry[3], connect)
+        entry[4] += ttfb
+        entry[5] = max(entry[5], ttfb)
+        entry[6] += download
+        entry[7] = max(entry[7], download)
+
+    @classmethod
+    def on_report_to_master(cls, data, **kwargs):
+        """Hand sums recorded since the last report to master."""
+        if not cls.stats:
+            return
+        data["phase_timing"] = [[method, name, entry] for (method, name), entry in cls.stats.items()]
+        cls.stats = {}
+
+    @classmethod
+    def on_worker_report(cls, client_id, data, **kwargs):
+        """Add sums reported by a worker."""
+        for method, name, values in data.get("phase_timing", []):
+            cls.merge(cls.stats.setdefault((method, name), [0, 0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0]), values)
+
+    @staticmethod
+    def merge(entry, values):
+        for index in (0, 1, 2, 4, 6):
+            entry[index] += values[index]
+        for index in (3, 5, 7):
+            entry[index] = max(entry[index], values[index])
+
+    @staticmethod
+    def columns(entry):
+        """Stats columns of an entry, times in milliseconds."""
+        requests, new = entry[0], entry[1]
+        return [
+            requests,
+            new,
+            requests - new,
+            round((requests - new) / requests * 100, 1) if requests else 0.0,
+            round(entry[2] / new * 1000, 2) if new else 0.0,
+            round(entry[3] * 1000, 2),
+            round(entry[4] / requests * 1000, 2) if requests else 0.0,
+            round(entry[5] * 1000, 2),
+            round(entry[6] / requests * 1000, 2) if requests else 0.0,
+            round(entry[7] * 1000, 2),
+        ]
+
+    @classmethod
+    def report(cls, path):
+        """Print and write phase columns per endpoint, with the Aggregated row last."""
+        if not cls.stats:
+            return
+        total = [0, 0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0]
+        rows = []
+        for (method, name), entry in sorted(cls.stats.items()):
+            cls.merge(total, entry)
+            rows.append([method, name, *cls.columns(entry)])
+        rows.append(["", AGGREGATED, *cls.columns(total)])
+
+        lines = [
+            f"{'Endpoint':<40} {'requests':>8} {'new conn':>8} {'reuse':>7} {'connect':>8} {'ttfb':>8} "
+            f"{'ttfb max':>9} {'download':>9}"
+        ]
+        for row in rows:
+            endpoint = f"{row[0]} {row[1]}".strip()
+            lines.append(
+                f"{endpoint:<40} {row[2]:>8} {row[3]:>8} {row[5]:>6.1f}% {row[6]:>8.2f} {row[8]:>8.2f} "
+                f"{row[9]:>9.2f} {row[10]:>9.2f}"
+            )
+        table = "\n".join(lines)
+        Logger.report(f"Request phases (average ms, connect per new connection)\n{table}")
+
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "w", newline="", encoding="utf-8") as csv_file:
+            writer = csv.writer(csv_file)
+            writer.writerow(
+                [
+                    "Type",
+                    "Name",
+                    "Request Count",
+                    "New Connections",
+                    "Reused Connections",
+                    "Connection Reuse %",
+                    "Average Connect Time",
+                    "Max Connect Time",
+                    "Average TTFB",
+                    "Max TTFB",
+                    "Average Download Time",
+                    "Max Download Time",
+                ]
+            )
+            writer.writerows(rows)
+        Logger.log_message(f"Request phase table written to {path}")
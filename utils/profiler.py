@@ -0,0 +1,147 @@
+"""Sampling profiler for load generator processes."""
+
+import signal
+import time
+from collections import Counter
+from pathlib import Path
+
+import gevent
+
+from utils.logger import Logger, LogType
+
+
+class StackSampler:
+    """Sample the Python stack every interval seconds of CPU time used by this process (SIGPROF timer).
+
+    All greenlets run on the main thread and the signal handler runs there too, so a sample is the stack
+    of whichever greenlet is using the CPU. Waiting for I/O uses no CPU and is not sampled, so the
+    samples add up to busy time only.
+    """
+
+    def __init__(self, interval: float = 0.005):
+        self.interval = interval
+        self.stacks = Counter()
+        self._previous_handler = None
+
+    def start(self):
+        self._previous_handler = signal.signal(signal.SIGPROF, self._sample)
+        signal.setitimer(signal.ITIMER_PROF, self.interval, self.interval)
+
+    def stop(self):
+        signal.setitimer(signal.ITIMER_PROF, 0)
+        signal.signal(signal.SIGPROF, self._previous_handler or signal.SIG_DFL)
+
+    def _sample(self, signum, frame):
+        stack = []
+        while frame is not None:
+            stack.append(frame.f_code)
+            frame = frame.f_back
+        self.stacks[tuple(stack)] += 1
+
+
+class Profiler:
+    """Profile this load generator process for a time window and write the result per process.
+
+    The window is started with --profile-seconds (after --profile-after seconds of the test), or from
+    the /profile web UI route, which master forwards to all workers. At its end two files are written to
+    the profile directory: a collapsed stack file (one "frame;frame;... count" line per stack, for
+    flamegraph.pl or speedscope) and a summary of CPU time by function (self and total) and by task.
+    """
+
+    top = 25
+
+    directory = Path("reports/profiles")
+    interval = 0.005
+    node = "local"
+
+    _sampler = None
+    _timer = None
+    _started = None
+
+    @classmethod
+    def start(cls, seconds: float):
+        """Profile the next seconds. Returns False if a window is already running."""
+        if cls._sampler is not None:
+            return False
+        if not hasattr(signal, "setitimer"):
+            Logger.log_message("Profiling needs SIGPROF timers, not available on this platform", LogType.ERROR)
+            return False
+        cls._sampler = StackSampler(cls.interval)
+        cls._started = time.time()
+        cls._sampler.start()
+        cls._timer = gevent.spawn_later(seconds, cls.finish)
+        Logger.log_message(f"Profiling {cls.node} for {seconds:g} s")
+        return True
+
+    @classmethod
+    def finish(cls):
+        """End the window and write the profile files."""
+        sampler, cls._sampler = cls._sampler, None
+        if sampler is None:
+            return
+        if cls._timer is not None and cls._timer is not gevent.getcurrent():
+            cls._timer.kill(block=False)
+        cls._timer = None
+        sampler.stop()
+        cls.write(sampler, time.time() - cls._started)
+
+    @classmethod
+    def on_profile_message(cls, environment, msg, **kwargs):
+        """Start a window requested by master or the web UI."""
+        cls.start(float(msg.data.get("seconds", 30)))
+
+    @staticmethod
+    def frame_name(code):
+        """file:function, with the path relative to the project, site-packages or the standard library."""
+        path = code.co_filename
+        project = f"{Path.cwd()}/"
+        if path.startswith(project):
+            path = path[len(project) :]
+        elif "site-packages/" in path:
+            path = path.split("site-packages/", 1)[1]
+        elif "/lib/python" in path:
+            path = path.split("/lib/", 1)[1]
+        return f"{path}:{code.co_qualname}"
+
+    @classmethod
+    def task_name(cls, stack):
+        """Task function being executed in stack (leaf first), found below Locust's execute_task."""
+        for depth, code in enumerate(stack):
+            if code.co_name == "execute_task" and code.co_filename.endswith("task.py") and depth > 0:
+                return cls.frame_name(stack[depth - 1])
+        return "(outside tasks)"
+
+    @classmethod
+    def write(cls, sampler, duration):
+        cls.directory.mkdir(parents=True, exist_ok=True)
+        stamp = time.strftime("%Y%m%d-%H%M%S", time.localtime(cls._started))
+        base = cls.directory / f"profile-{cls.node}-{stamp}"
+
+        self_time, total_time, task_time = Counter(), Counter(), Counter()
+        with open(f"{base}.folded", "w", encoding="utf-8") as folded:
+            for stack, count in sampler.stacks.most_common():
+                names = [cls.frame_name(code) for code in stack]
+                folded.write(";".join(reversed(names)) + f" {count}\n")
+                self_time[names[0]] += count
+                for name in set(names):
+                    total_time[name] += count
+                task_time[cls.task_name(stack)] += count
+
+        samples = sum(sampler.stacks.values())
+        cpu = samples * sampler.interval
+        lines = [
+            f"Profile of {cls.node}: {duration:.1f} s, {samples} samples every {sampler.interval * 1000:g} ms of CPU time, "
+            f"CPU {cpu:.2f} s ({cpu / duration if duration else 0:.0%} of one core)",
+            "",
+            "CPU time by task",
+        ]
+        lines += [f"{count / samples:>7.1%}  {name}" for name, count in task_time.most_common()] if samples else []
+        for title, counter in (("self", self_time), ("total (self + callees)", total_time)):
+            lines += ["", f"Top functions by {title} CPU time"]
+            lines += (
+                [f"{count / samples:>7.1%}  {name}" for name, count in counter.most_common(cls.top)] if samples else []
+            )
+        Path(f"{base}.txt").write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+        log_type = LogType.INFO if samples else LogType.ERROR
+        Logger.log_message(f"Profile written to {base}.folded and {base}.txt ({samples} samples)", log_type)
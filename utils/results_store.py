@@ -0,0 +1,144 @@
+"""Archive of per-endpoint results of every run."""
+
+import datetime
+import gzip
+import json
+import os
+import platform
+import socket
+import subprocess
+import time
+from pathlib import Path
+
+from utils.latency_histogram import AGGREGATED
+from utils.logger import Logger, LogType
+from utils.transaction import Transaction
+
+BASE_DIR = Path(__file__).parent.parent
+
+
+class ResultsStore:
+    """One gzip JSON file per run in the results directory, named <start time>-<git revision>.json.gz.
+
+    A run keeps, per endpoint, request and failure counts, requests/s and Locust's response time
+    distribution (count per rounded millisecond value), together with the git revision of the harness,
+    the parsed options, the target and the load generator host. Files are a few kilobytes and are not
+    removed by make test-html, which clears reports/.
+    """
+
+    suffix = ".json.gz"
+
+    @staticmethod
+    def git_revision():
+        """(short revision, uncommitted changes) of the harness checkout, or (None, None) without git."""
+        try:
+            revision = subprocess.run(
+                ["git", "rev-parse", "--short", "HEAD"], cwd=BASE_DIR, capture_output=True, text=True, timeout=10
+            ).stdout.strip()
+            status = subprocess.run(
+                ["git", "status", "--porcelain", "--untracked-files=no"],
+                cwd=BASE_DIR,
+                capture_output=True,
+                text=True,
+                timeout=30,
+            ).stdout
+        except (OSError, subprocess.SubprocessError):
+            return None, None
+        return revision or None, bool(status.strip()) if revision else None
+
+    @staticmethod
+    def options(parsed_options):
+        """Parsed options that describe the run, as plain values."""
+        if parsed_options is None:
+            return {}
+        return {
+            key: value
+            for key, value in sorted(vars(parsed_options).items())
+            if isinstance(value, str | int | float | bool | list) and not key.startswith("_")
+        }
+
+    @classmethod
+    def save(cls, environment, directory):
+        """Write the stats of the finished run. Returns the file path, or None if nothing ran."""
+        stats = environment.stats
+        if not stats.total.num_requests:
+            return None
+        started = stats.total.start_time
+        duration = max((stats.total.last_request_timestamp or started) - started, 0.001)
+        revision, dirty = cls.git_revision()
+        endpoints = {}
+        # transactions are not requests, their timings are not comparable with the endpoint distributions
+        requests = [entry for entry in stats.entries.values() if entry.method != Transaction.request_type]
+        for entry in [*requests, stats.total]:
+            name = AGGREGATED if entry is stats.total else f"{entry.method} {entry.name}"
+            endpoints[name] = {
+                "requests": entry.num_requests,
+                "failures": entry.num_failures,
+                "rps": round(entry.num_requests / duration, 3),
+                "response_times": {str(value): count for value, count in sorted(entry.response_times.items())},
+            }
+        run_id = f"{datetime.datetime.fromtimestamp(started):%Y%m%d-%H%M%S}-{revision or 'norev'}"
+        record = {
+            "run_id": run_id,
+            "started": round(started, 3),
+            "duration_s": round(duration, 3),
+            "target": environment.host,
+            "git": {"revision": revision, "dirty": dirty},
+            "host": {
+                "hostname": socket.gethostname(),
+                "platform": platform.platform(),
+                "python": platform.python_version(),
+                "cpus": os.cpu_count(),
+            },
+            "config": cls.options(environment.parsed_options),
+            "endpoints": endpoints,
+        }
+        path = Path(directory, run_id + cls.suffix)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with gzip.open(path, "wt", encoding="utf-8") as results_file:
+            json.dump(record, results_file, separators=(",", ":"))
+        Logger.log_message(f"Run results archived to {path}", LogType.INFO)
+        return path
+
+    @staticmethod
+    def load(path):
+        """Read a stored run; response time keys become floats."""
+        with gzip.open(path, "rt", encoding="utf-8") as results_file:
+            record = json.load(results_file)
+        for endpoint in record["endpoints"].values():
+            endpoint["response_times"] = {float(value): count for value, count in endpoint["response_times"].items()}
+        return record
+
+    @classmethod
+    def runs(cls, directory):
+        """Stored run files, oldest first."""
+        return sorted(Path(directory).glob(f"*{cls.suffix}"))
+
+    @classmethod
+    def find(cls, directory, reference):
+        """Run file by path, run id prefix, 'latest' or 'previous'."""
+        if Path(reference).is_file():
+            return Path(reference)
+        runs = cls.runs(directory)
+        if reference in ("latest", "previous"):
+            index = -1 if reference == "latest" else -2
+            if len(runs) < -index:
+                raise FileNotFoundError(f"Not enough stored runs in {directory} for '{reference}'")
+            return runs[index]
+        matches = [path for path in runs if path.name.startswith(reference)]
+        if len(matches) != 1:
+            raise FileNotFoundError(f"{len(matches)} stored runs in {directory} match '{reference}'")
+        return matches[0]
+
+    @staticmethod
+    def describe(record):
+        """One line: id, start time, revision, target and totals."""
+        total = record["endpoints"].get(AGGREGATED, {})
+        revision = record["git"]["revision"] or "-"
+        if record["git"]["dirty"]:
+            revision += "+dirty"
+        started = time.strftime("%Y-%m-%d %H:%M", time.localtime(record["started"]))
+        return (
+            f"{record['run_id']:<32} {started}  {revision:<14} {record['target'] or '-':<28} "
+            f"{total.get('requests', 0):>9} req {total.get('rps', 0):>9.1f} req/s  {record['host']['hostname']}"
+        )
@@ -0,0 +1,255 @@
+"""Step load search for the saturation point."""
+
+import csv
+import time
+from pathlib import Path
+
+from locust import LoadTestShape
+from locust.stats import calculate_response_time_percentile, diff_response_time_dicts
+
+from utils.logger import Logger
+
+AGGREGATED = "Aggregated"
+
+
+class StatsSnapshot:
+    """Counters of one stats entry at a point in time."""
+
+    __slots__ = ("num_requests", "num_failures", "response_times")
+
+    def __init__(self, entry=None):
+        self.num_requests = entry.num_requests if entry else 0
+        self.num_failures = entry.num_failures if entry else 0
+        self.response_times = dict(entry.response_times) if entry else {}
+
+    @classmethod
+    def empty(cls):
+        """Snapshot of an entry that had no requests yet."""
+        return cls()
+
+    def metrics(self, entry, duration):
+        """Requests, req/s, p50/p95/p99 (ms) and error rate of entry (or a later snapshot) since this snapshot."""
+        requests = entry.num_requests - self.num_requests
+        failures = entry.num_failures - self.num_failures
+        response_times = diff_response_time_dicts(entry.response_times, self.response_times)
+        timed = sum(response_times.values())
+        return {
+            "requests": requests,
+            "rps": requests / duration if duration > 0 else 0.0,
+            "p50": calculate_response_time_percentile(response_times, timed, 0.50),
+            "p95": calculate_response_time_percentile(response_times, timed, 0.95),
+            "p99": calculate_response_time_percentile(response_times, timed, 0.99),
+            "error_rate": failures / requests if requests else 0.0,
+        }
+
+
+class SaturationShape(LoadTestShape):
+    """Raise users in steps, hold each step until throughput and p95 are stable, stop past the knee.
+
+    A stage is measured after warmup and ends once the second half of its measurement is within
+    stable_tolerance of the first half in req/s and p95 (or after max_stage_time). The test stops at the
+    first stage where all requests together stop scaling, knee up in latency or fail too often.
+    """
+
+    # Created for --saturation-search in events.init, not picked up as the shape of the locustfile
+    abstract = True
+    warmup = 3.0
+    stable_tolerance = 0.15
+
+    def __init__(
+        self,
+        start_users: int,
+        step_users: int,
+        max_users: int,
+        stage_time: float,
+        max_stage_time: float,
+        spawn_rate: float,
+        run_time: int = None,
+    ):
+        super().__init__()
+        self.start_users = start_users
+        self.step_users = step_users
+        self.max_users = max_users
+        self.stage_time = stage_time
+        self.max_stage_time = max_stage_time
+        self.spawn_rate = spawn_rate
+        self.run_time = run_time
+        self.reset_time()
+
+    def reset_time(self):
+        super().reset_time()
+        Saturation.stages = []
+        self.users = self.start_users
+        self._stage_started = None
+        self._measure_from = None
+        self._snapshots = []
+
+    def tick(self):
+        if self.run_time and self.get_run_time() >= self.run_time:
+            return None
+        now = time.monotonic()
+        if self._stage_started is None:
+            self._stage_started = now
+            return self.users, self.spawn_rate
+
+        stats = self.runner.environment.stats
+        if now - self._stage_started < self.warmup:
+            return self.users, self.spawn_rate
+        self._snapshots.append((now, StatsSnapshot(stats.total)))
+        if self._measure_from is None:
+            snapshots = {key: StatsSnapshot(entry) for key, entry in stats.entries.items()}
+            snapshots[AGGREGATED] = StatsSnapshot(stats.total)
+            self._measure_from = (now, snapshots)
+            return self.users, self.spawn_rate
+
+        measured = now - self._measure_from[0]
+        if measured < self.stage_time or (measured < self.max_stage_time and not self._stable()):
+            return self.users, self.spawn_rate
+
+        Saturation.add_stage(self.users, measured, self._measure_from[1], stats, stable=self._stable())
+        knee = Saturation.knee(AGGREGATED)
+        if knee is not None or self.users + self.step_users > self.max_users:
+            return None
+        self.users += self.step_users
+        self._stage_started = now
+        self._measure_from = None
+        self._snapshots = []
+        return self.users, self.spawn_rate
+
+    def _stable(self):
+        """Compare req/s and p95 of the first and second half of the measurement so far."""
+        if len(self._snapshots) < 5:
+            return False
+        middle = len(self._snapshots) // 2
+        (start, first), (half, second), (end, _) = self._snapshots[0], self._snapshots[middle], self._snapshots[-1]
+        total = self.runner.environment.stats.total
+        first_half = first.metrics(second, half - start)
+        second_half = second.metrics(total, end - half)
+        for key in ("rps", "p95"):
+            reference = max(first_half[key], 1)
+            if abs(second_half[key] - first_half[key]) / reference > self.stable_tolerance:
+                return False
+        return True
+
+
+class Saturation:
+    """Stage results and knee detection of the saturation search.
+
+    For each endpoint (and all requests together) the knee is the last stage before the first one where
+    - throughput grew less than throughput_efficiency of the relative user increase, or
+    - p95 exceeded latency_factor times its first stage value (values under min_latency ms are ignored), or
+    - error rate exceeded max_error_rate.
+    Stages with fewer than min_requests requests of the endpoint are too noisy to judge and are skipped.
+    """
+
+    throughput_efficiency = 0.5
+    latency_factor = 2.0
+    min_latency = 10
+    max_error_rate = 0.01
+    min_requests = 30
+
+    stages = []
+
+    @classmethod
+    def add_stage(cls, users, duration, snapshots, stats, stable):
+        """Record metrics of every endpoint since snapshots."""
+        endpoints = {}
+        for key, entry in stats.entries.items():
+            name, method = key
+            snapshot = snapshots.get(key) or StatsSnapshot.empty()
+            endpoints[f"{method} {name}"] = snapshot.metrics(entry, duration)
+        endpoints[AGGREGATED] = snapshots[AGGREGATED].metrics(stats.total, duration)
+        cls.stages.append({"users": users, "duration": duration, "stable": stable, "endpoints": endpoints})
+        metrics = endpoints[AGGREGATED]
+        Logger.log_message(
+            f"Saturation stage {users} users: {metrics['rps']:.1f} req/s, p95 {metrics['p95']} ms, "
+            f"p99 {metrics['p99']} ms, errors {metrics['error_rate']:.1%}" + ("" if stable else " (not stable)")
+        )
+
+    @classmethod
+    def knee(cls, endpoint):
+        """(stage index of the knee, reason), or None if the endpoint still scales."""
+        previous = None
+        baseline_p95 = None
+        for index, stage in enumerate(cls.stages):
+            metrics = stage["endpoints"].get(endpoint)
+            if metrics is None or metrics["requests"] < cls.min_requests:
+                continue
+            if baseline_p95 is None:
+                baseline_p95 = max(metrics["p95"], cls.min_latency)
+            reason = None
+            if metrics["error_rate"] > cls.max_error_rate:
+                reason = f"errors {metrics['error_rate']:.1%}"
+            elif metrics["p95"] > cls.latency_factor * baseline_p95:
+                reason = f"p95 {metrics['p95']} ms"
+            elif previous is not None:
+                previous_index, previous_metrics = previous
+                user_gain = stage["users"] / cls.stages[previous_index]["users"] - 1
+                throughput_gain = metrics["rps"] / max(previous_metrics["rps"], 1e-9) - 1
+                if throughput_gain < cls.throughput_efficiency * user_gain:
+                    reason = f"throughput +{throughput_gain:.0%} for +{user_gain:.0%} users"
+            if reason is not None:
+                return (previous[0] if previous else None), reason
+            previous = index, metrics
+        return None
+
+    @classmethod
+    def report(cls, path):
+        """Print the stage table with knees and write it to CSV at path."""
+        if not cls.stages:
+            return
+        endpoints = sorted({name for stage in cls.stages for name in stage["endpoints"]} - {AGGREGATED})
+        endpoints.append(AGGREGATED)
+        knees = {endpoint: cls.knee(endpoint) for endpoint in endpoints}
+
+        rows = []
+        for endpoint in endpoints:
+            knee = knees[endpoint]
+            for index, stage in enumerate(cls.stages):
+                metrics = stage["endpoints"].get(endpoint)
+                if metrics is not None and metrics["requests"]:
+                    is_knee = knee is not None and knee[0] == index
+                    rows.append((endpoint, stage, metrics, is_knee))
+
+        lines = [f"{'Endpoint':<40} {'Users':>6} {'req/s':>8} {'p50':>6} {'p95':>6} {'p99':>6} {'errors':>7}"]
+        for endpoint, stage, metrics, is_knee in rows:
+            lines.append(
+                f"{endpoint:<40} {stage['users']:>6} {metrics['rps']:>8.2f} {metrics['p50']:>6} {metrics['p95']:>6} "
+                f"{metrics['p99']:>6} {metrics['error_rate']:>7.1%}" + (" <- knee" if is_knee else "")
+            )
+        lines.append("")
+        for endpoint, knee in knees.items():
+            if knee is None:
+                lines.append(f"{endpoint}: no knee up to {cls.stages[-1]['users']} users")
+            elif knee[0] is None:
+                lines.append(f"{endpoint}: saturated already at {cls.stages[0]['users']} users ({knee[1]})")
+            else:
+                lines.append(f"{endpoint}: knee at {cls.stages[knee[0]]['users']} users, then {knee[1]}")
+        table = "\n".join(lines)
+        Logger.report(f"Saturation search\n{table}")
+
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "w", newline="", encoding="utf-8") as csv_file:
+            writer = csv.writer(csv_file)
+            writer.writerow(
+                ["endpoint", "users", "duration_s", "requests", "rps", "p50_ms", "p95_ms", "p99_ms", "error_rate"]
+                + ["stable", "knee"]
+            )
+            for endpoint, stage, metrics, is_knee in rows:
+                writer.writerow(
+                    [
+                        endpoint,
+                        stage["users"],
+                        round(stage["duration"], 1),
+                        metrics["requests"],
+                        round(metrics["rps"], 3),
+                        metrics["p50"],
+                        metrics["p95"],
+                        metrics["p99"],
+                        round(metrics["error_rate"], 4),
+                        stage["stable"],
+                        is_knee,
+                    ]
+                )
+        Logger.log_message(f"Saturation table written to {path}")
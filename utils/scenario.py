@@ -0,0 +1,194 @@
+"""Compiled request steps for task sets."""
+
+import string
+import time
+import weakref
+
+from data.payload_pool import PayloadKind, PayloadPool
+from utils.logger import Logger, LogType
+
+
+class RequestStep:
+    """One request of a scenario: method, URL and body templates, expected status and extractions.
+
+    Templates are compiled once into functions, so a call only fills in placeholders and sends the
+    request. Placeholders are filled from constants of the run (set_constants, e.g. run_id) when the step
+    is compiled, and per call from params (name -> callable), "ms" (current time in milliseconds) and task
+    set attributes such as username and test_id; success and failure messages may only use constants and
+    task set attributes and are formatted only for the outcome that happened.
+    A step with payload sends pre-encoded bodies of that kind from PayloadPool while it is enabled,
+    and falls back to its body template otherwise. Success messages are built only if a log keeps them.
+    Requests of a task set inside a transaction count towards its outcome.
+    """
+
+    constants = {}
+    conversions = {"r": "repr", "s": "str", "a": "ascii"}
+    _steps = weakref.WeakSet()
+
+    def __init__(
+        self,
+        name: str,
+        log_name: str,
+        method: str,
+        url: str,
+        success: str,
+        failure: str,
+        expected_status: int = 200,
+        body: dict = None,
+        params: dict = None,
+        extract: dict = None,
+        requires: str = None,
+        payload: PayloadKind = None,
+    ):
+        self.name = name
+        self.log_name = log_name
+        self.method = method
+        self.url = url
+        self.success = success
+        self.failure = failure
+        self.expected_status = expected_status
+        self.body = body
+        self.params = params or {}
+        self.extract = extract or {}
+        self.requires = requires
+        self.payload = payload
+
+        self._missing_message = f"Cannot {log_name.lower()}: {requires} is not set" if requires else None
+        self._compile()
+        RequestStep._steps.add(self)
+
+    @classmethod
+    def set_constants(cls, **values):
+        """Fill placeholders that are fixed for a run into the templates of every step."""
+        cls.constants = {**cls.constants, **values}
+        for step in list(cls._steps):
+            step._compile()
+
+    def _compile(self):
+        """Generate fill(taskset, with_body) -> (url, body), success(taskset) and failure(taskset).
+
+        Like a hand-written task, the generated functions read placeholders into locals and format
+        printf-style strings, with the constants of the run already part of the strings.
+        """
+        fields = set()
+        for template in (self.url, *(self.body or {}).values()):
+            fields |= self._fields(template)
+        message_fields = self._fields(self.success) | self._fields(self.failure)
+        unsupported = [field for field in fields | message_fields if not field.isidentifier()]
+        unsupported += [field for field in message_fields if field == "ms" or field in self.params]
+        if unsupported:
+            raise ValueError(f"Step {self.name!r}: unsupported placeholders {sorted(set(unsupported))}")
+
+        namespace = {"time": time, "params": self.params}
+        url = self._expression(self.url, namespace)
+        source = ["def fill(taskset, with_body=True):", *self._reads(fields)]
+        if self.body is None:
+            source.append(f"    return {url}, None")
+        else:
+            body = ", ".join(f"{key!r}: {self._expression(value, namespace)}" for key, value in self.body.items())
+            source += ["    if not with_body:", f"        return {url}, None", f"    return {url}, {{{body}}}"]
+        for function, template in (("success", self.success), ("failure", self.failure)):
+            source += [f"def {function}(taskset):", *self._reads(self._fields(template))]
+            source.append(f"    return {self._expression(template, namespace)}")
+        exec("\n".join(source), namespace)
+        self._fill, self._success, self._failure = namespace["fill"], namespace["success"], namespace["failure"]
+
+    @staticmethod
+    def _fields(template):
+        """Placeholder names used in a template."""
+        if not isinstance(template, str):
+            return set()
+        return {field for _, field, _, _ in string.Formatter().parse(template) if field}
+
+    def _reads(self, fields):
+        """Source lines reading the placeholders of a call into locals: ms, params, then task set attributes."""
+        fields = fields - set(self.constants)
+        lines = []
+        if "ms" in fields and "ms" not in self.params:
+            lines.append("    _ms = int(time.time() * 1000)")
+        lines += [f"    _{param} = params[{param!r}]()" for param in self.params if param in fields]
+        lines += [f"    _{field} = taskset.{field}" for field in sorted(fields - {"ms"} - set(self.params))]
+        return lines
+
+    def _expression(self, template, namespace):
+        """Source of an expression formatting template from the locals of _reads."""
+        if not isinstance(template, str):
+            name = f"literal{len(namespace)}"
+            namespace[name] = template
+            return name
+        printf, values = "", []
+        for literal, field, spec, conversion in string.Formatter().parse(template):
+            printf += literal.replace("%", "%%")
+            if field is None:
+                continue
+            if field in self.constants:
+                placeholder = (f"!{conversion}" if conversion else "") + (f":{spec}" if spec else "")
+                printf += ("{0" + placeholder + "}").format(self.constants[field]).replace("%", "%%")
+                continue
+            value = f"_{field}"
+            if spec:
+                if conversion:
+                    value = f"{self.conversions[conversion]}({value})"
+                value = f"format({value}, {spec!r})"
+                conversion = "s"
+            printf += "%" + (conversion or "s")
+            values.append(value)
+        if not values:
+            return repr(printf % ())
+        return f"{printf!r} % ({', '.join(values)},)"
+
+    def __call__(self, taskset):
+        """Send the request on behalf of taskset. Returns True if response had the expected status."""
+        transaction = taskset.current_transaction
+        if self.requires and not getattr(taskset, self.requires, None):
+            Logger.log_message(self._missing_message, LogType.ERROR)
+            if transaction is not None:
+                transaction.record(self.name, failed=True)
+            return False
+
+        data = None
+        if self.payload is not None and PayloadPool.enabled():
+            data = PayloadPool.take(self.payload)
+        url, body = self._fill(taskset, data is None)
+        logging = Logger.enabled
+        if logging:
+            Logger.add_request(self.log_name, url, self.method, body if data is None else data)
+        with taskset.client.request(
+            self.method, url, data=data, json=body, headers=taskset.headers, catch_response=True, name=self.name
+        ) as response:
+            failed = response.status_code != self.expected_status
+            if failed:
+                # Locust needs the failure message for its error statistics, logging or not
+                task_result = (
+                    f"{self._failure(taskset)}. Response: {response.text}. Status code: {response.status_code}."
+                )
+                response.failure(task_result)
+            else:
+                response.success()
+            if self.extract:
+                self._extract_values(taskset, response)
+            if logging:
+                if failed:
+                    Logger.log_message(task_result, LogType.ERROR)
+                else:
+                    task_result = None
+                    if Logger.keeps_results():
+                        task_result = self._success(taskset)
+                        Logger.log_message(task_result, LogType.INFO)
+                Logger.add_response(response, task_result, failed=failed)
+        if transaction is not None:
+            transaction.record(self.name, failed)
+        return not failed
+
+    def _extract_values(self, taskset, response):
+        """Copy fields of JSON response to task set attributes."""
+        try:
+            response_json = response.json()
+        except (ValueError, TypeError) as e:
+            Logger.log_message(f"Failed to parse response JSON: {str(e)}", LogType.ERROR)
+            return
+        for attribute, field in self.extract.items():
+            if isinstance(response_json, dict) and field in response_json:
+                setattr(taskset, attribute, response_json[field])
+            else:
+                Logger.log_message(f"Response missing {field} field", LogType.ERROR)
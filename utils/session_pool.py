@@ -0,0 +1,173 @@
+"""Shared authenticated sessions."""
+
+import enum
+import itertools
+import threading
+import time
+
+from gevent.pool import Pool
+
+from utils.http_engine import HttpEngine
+from utils.logger import Logger, LogType
+from utils.users_loader import UsersLoader
+from utils.utils import Utils
+
+
+class SessionPoolMode(enum.Enum):
+    """When pooled sessions log in."""
+
+    OFF = "off"
+    LAZY = "lazy"
+    EAGER = "eager"
+
+
+class AuthSession:
+    """One logged in credential shared by many simulated users."""
+
+    def __init__(self, credentials):
+        self.credentials = credentials
+        self.username = credentials["username"]
+        self.token = None
+        self.headers = None
+        self.valid = False
+        self.failed_at = 0.0
+        self.lock = threading.Lock()
+
+    def invalidate(self):
+        """Mark session as expired. Next user that needs it logs in again."""
+        self.valid = False
+
+
+class SessionPool:
+    """Log each credential in once and hand its CSRF token and session cookie to many users."""
+
+    sessions = []
+    mode = SessionPoolMode.OFF
+    login_concurrency = 50
+    login_retry_interval = 5.0
+
+    _environment = None
+    _engine = None
+    _cursor = itertools.count()
+    _listener_added = False
+
+    @classmethod
+    def init(cls, environment, mode: SessionPoolMode, size: int = 0):
+        """Create sessions for size credentials (all loaded credentials if 0). Eager mode logs them in now.
+
+        Eager mode needs a size: with 0 it would log in every credential row before users spawn.
+        """
+        cls.mode = mode
+        cls.sessions = []
+        if mode == SessionPoolMode.OFF:
+            return
+
+        cls._environment = environment
+        cls._engine = HttpEngine.from_options(environment.parsed_options)
+        cls._cursor = itertools.count()
+        if not cls._listener_added:
+            environment.events.request.add_listener(cls._on_request)
+            cls._listener_added = True
+
+        size = size or UsersLoader.count()
+        cls.sessions = [AuthSession(UsersLoader.get_user()) for _ in range(size)]
+        if mode == SessionPoolMode.EAGER:
+            Pool(cls.login_concurrency).map(cls._login, cls.sessions)
+            logged_in = sum(1 for session in cls.sessions if session.valid)
+            Logger.log_message(f"Session pool: {logged_in} of {len(cls.sessions)} sessions logged in")
+
+    @classmethod
+    def enabled(cls):
+        """Check if users should take sessions from the pool."""
+        return cls.mode != SessionPoolMode.OFF and bool(cls.sessions)
+
+    @classmethod
+    def acquire(cls):
+        """Get next session round-robin, logged in."""
+        session = cls.sessions[next(cls._cursor) % len(cls.sessions)]
+        cls.ensure_valid(session)
+        return session
+
+    @classmethod
+    def ensure_valid(cls, session):
+        """Log session in again if it expired. Only one user logs in, others wait for it."""
+        if session.valid:
+            return True
+        with session.lock:
+            if not session.valid and time.time() - session.failed_at >= cls.login_retry_interval:
+                cls._login(session)
+        return session.valid
+
+    @classmethod
+    def logout_all(cls):
+        """Log out every logged in session once."""
+        sessions = [session for session in cls.sessions if session.valid]
+        if sessions:
+            Pool(cls.login_concurrency).map(cls._logout, sessions)
+        cls.sessions = []
+
+    @classmethod
+    def _create_client(cls):
+        """Fresh client per login/logout, so cookie jars of different credentials never mix."""
+        return HttpEngine.create_client(cls._engine, cls._environment, cls._environment.host)
+
+    @classmethod
+    def _login(cls, session):
+        client = cls._create_client()
+        headers = Utils.get_base_headers()
+        Logger.add_request("User Login", "/api/auth/login", "POST", session.credentials)
+        with client.post(
+            url="/api/auth/login", json=session.credentials, headers=headers, catch_response=True, name="Login"
+        ) as response:
+            cookies = Utils.get_response_cookies(response)
+            token = cookies.get("csrftoken")
+            if response.status_code == 200 and token:
+                session.token = token
+                session.headers = Utils.get_headers_with_token(token)
+                session.headers["Cookie"] = "; ".join(f"{name}={value}" for name, value in cookies.items())
+                session.valid = True
+                task_result = f"Login successfully for user: {session.username}"
+                response.success()
+                Logger.log_message(task_result, LogType.INFO)
+            else:
+                session.failed_at = time.time()
+                task_result = (
+                    f"Login failed for user: {session.username}. "
+                    f"Response: {response.text}. Status code: {response.status_code}."
+                )
+                response.failure(task_result)
+                Logger.log_message(task_result, LogType.ERROR)
+            Logger.add_response(response, task_result)
+
+    @classmethod
+    def _logout(cls, session):
+        client = cls._create_client()
+        Logger.add_request("User Logout", "/api/auth/logout", "GET")
+        with client.get(
+            url="/api/auth/logout", headers=session.headers, catch_response=True, name="Logout"
+        ) as response:
+            session.valid = False
+            if response.status_code == 200:
+                task_result = f"Logout successfully for user: {session.username}"
+                response.success()
+                Logger.log_message(task_result, LogType.INFO)
+            else:
+                task_result = (
+                    f"Logout failed for user: {session.username}. "
+                    f"Response: {response.text}. Status code: {response.status_code}."
+                )
+                response.failure(task_result)
+                Logger.log_message(task_result, LogType.ERROR)
+            Logger.add_response(response, task_result)
+
+    @staticmethod
+    def _on_request(response=None, context=None, **kwargs):
+        """Expire the pooled session of a request rejected with 401/403."""
+        session = context.get("auth_session") if context else None
+        if session is None or response is None or response.status_code not in (401, 403) or not session.valid:
+            return
+        request_headers = getattr(getattr(response, "request", None), "headers", None) or {}
+        sent_cookie = request_headers.get("Cookie")
+        # Requests sent with an older session that was already renewed don't expire the new one
+        if sent_cookie is None or sent_cookie == session.headers.get("Cookie"):
+            session.invalidate()
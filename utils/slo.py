@@ -0,0 +1,218 @@
+"""Service level objective thresholds that decide whether a run passed."""
+
+import json
+import operator
+import re
+import time
+from pathlib import Path
+
+import gevent
+
+from utils.logger import Logger, LogType
+from utils.transaction import Transaction
+
+AGGREGATED = "Aggregated"
+
+
+class SloThreshold:
+    """One threshold such as "POST Create new Test: p95 < 500".
+
+    Endpoint is "Aggregated" (all requests), "*" (every endpoint on its own, without transactions), "METHOD name"
+    or a bare request name (all its methods). Metrics: p50/p95/p99 in ms, error_rate (fraction, or percent with "%")
+    and rps (requests per second).
+    """
+
+    metrics = ("p50", "p95", "p99", "error_rate", "rps")
+    operators = {"<": operator.lt, "<=": operator.le, ">": operator.gt, ">=": operator.ge}
+    pattern = re.compile(
+        r"^\s*(?P<endpoint>.+?)\s*:\s*(?P<metric>\w+)\s*(?P<operator><=|>=|<|>)\s*(?P<limit>[0-9.]+)\s*(?P<percent>%?)\s*$"
+    )
+
+    def __init__(self, text: str):
+        match = self.pattern.match(str(text))
+        if not match:
+            raise ValueError(f"Invalid SLO threshold {text!r}, expected 'ENDPOINT: METRIC < VALUE'")
+        if match["metric"] not in self.metrics:
+            raise ValueError(f"Unknown SLO metric in {text!r}, expected one of {list(self.metrics)}")
+        self.text = str(text).strip()
+        self.endpoint = match["endpoint"]
+        self.metric = match["metric"]
+        self.operator = match["operator"]
+        self.limit = float(match["limit"]) / (100 if match["percent"] else 1)
+
+    def entries(self, stats):
+        """[(endpoint, stats entry)] the threshold applies to. None entry if the endpoint had no requests."""
+        if self.endpoint == AGGREGATED:
+            return [(AGGREGATED, stats.total)]
+        entries = [
+            (f"{method} {name}", entry)
+            for (name, method), entry in sorted(stats.entries.items())
+            if entry.num_requests and self.applies_to(name, method)
+        ]
+        if not entries and self.endpoint != "*":
+            return [(self.endpoint, None)]
+        return entries
+
+    def applies_to(self, name, method):
+        """Check if the threshold covers an endpoint. "*" covers requests only, not transactions."""
+        if self.endpoint == "*":
+            return method != Transaction.request_type
+        return self.endpoint in (name, f"{method} {name}")
+
+    def check(self, entry):
+        """(measured value, passed) of entry. An endpoint without requests fails."""
+        if entry is None or not entry.num_requests:
+            return None, False
+        if self.metric == "error_rate":
+            value = entry.fail_ratio
+        elif self.metric == "rps":
+            value = entry.total_rps
+        else:
+            value = entry.get_response_time_percentile(int(self.metric[1:]) / 100)
+        return value, self.operators[self.operator](value, self.limit)
+
+
+class SloGate:
+    """Evaluate thresholds against the collected stats and fail the run if any is breached.
+
+    At test stop every threshold is checked, the result is logged and written to a JSON verdict file,
+    and the process exit code is set to 1 on failure. With abort enabled, latency and error rate
+    thresholds are also checked every check_interval seconds once an endpoint has min_requests requests;
+    a threshold breached in abort_after consecutive checks stops the test early.
+    Minimum rps thresholds are checked only at the end, because ramp-up keeps early rates low.
+    """
+
+    check_interval = 5.0
+    abort_after = 3
+    min_requests = 100
+
+    thresholds = []
+    aborted = None
+    _breaches = {}
+    _watcher = None
+
+    @classmethod
+    def configure(cls, values):
+        """Parse thresholds from repeated --slo values."""
+        cls.thresholds = [SloThreshold(value) for value in values or []]
+        cls.aborted = None
+        cls._breaches = {}
+
+    @classmethod
+    def start_watching(cls, environment):
+        """Check thresholds in the background and stop the test once one is clearly breached."""
+        cls.stop_watching()
+        cls.aborted = None
+        cls._breaches = {}
+        if cls.thresholds:
+            cls._watcher = gevent.spawn(cls._watch, environment)
+
+    @classmethod
+    def stop_watching(cls):
+        if cls._watcher is not None:
+            cls._watcher.kill(block=False)
+            cls._watcher = None
+
+    @classmethod
+    def _watch(cls, environment):
+        while True:
+            gevent.sleep(cls.check_interval)
+            breach = cls._clear_breach(environment.stats)
+            if breach is not None:
+                cls.aborted = breach
+                Logger.report(f"SLO breached, stopping the test: {breach}", LogType.ERROR)
+                cls._watcher = None
+                if environment.parsed_options.headless:
+                    environment.runner.quit()
+                else:
+                    environment.runner.stop()
+                return
+
+    @classmethod
+    def _clear_breach(cls, stats):
+        """Description of a threshold breached in abort_after consecutive checks, or None."""
+        breached = set()
+        for threshold in cls.thresholds:
+            if threshold.metric == "rps":
+                continue
+            for endpoint, entry in threshold.entries(stats):
+                if entry is None or entry.num_requests < cls.min_requests:
+                    continue
+                value, passed = threshold.check(entry)
+                if not passed:
+                    key = (threshold.text, endpoint)
+                    breached.add(key)
+                    cls._breaches[key] = cls._breaches.get(key, 0) + 1
+                    if cls._breaches[key] >= cls.abort_after:
+                        return (
+                            f"{endpoint}: {threshold.metric} {cls._format(threshold.metric, value)} ({threshold.text})"
+                        )
+        cls._breaches = {key: count for key, count in cls._breaches.items() if key in breached}
+        return None
+
+    @classmethod
+    def evaluate(cls, stats):
+        """Result of every threshold for every endpoint it applies to."""
+        results = []
+        for threshold in cls.thresholds:
+            for endpoint, entry in threshold.entries(stats):
+                value, passed = threshold.check(entry)
+                results.append(
+                    {
+                        "threshold": threshold.text,
+                        "endpoint": endpoint,
+                        "metric": threshold.metric,
+                        "operator": threshold.operator,
+                        "limit": threshold.limit,
+                        "value": None if value is None else round(value, 4),
+                        "requests": entry.num_requests if entry is not None else 0,
+                        "passed": passed,
+                    }
+                )
+        return results
+
+    @classmethod
+    def verdict(cls, environment, path):
+        """Evaluate thresholds, log and write the verdict to path. Sets exit code 1 if the run failed."""
+        cls.stop_watching()
+        if not cls.thresholds:
+            return True
+        results = cls.evaluate(environment.stats)
+        passed = all(result["passed"] for result in results) and cls.aborted is None
+        for result in results:
+            value = "no requests" if result["value"] is None else cls._format(result["metric"], result["value"])
+            message = f"{result['endpoint']} {result['metric']} {value} ({result['threshold']})"
+            # Failed checks go to the console too, passed ones only to the runtime log
+            if result["passed"]:
+                Logger.log_message(f"SLO passed: {message}", LogType.INFO)
+            else:
+                Logger.report(f"SLO FAILED: {message}", LogType.ERROR)
+
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        verdict = {
+            "verdict": "pass" if passed else "fail",
+            "aborted": cls.aborted,
+            "timestamp": int(time.time()),
+            "duration_s": round(time.time() - environment.stats.total.start_time, 1),
+            "failed": sum(not result["passed"] for result in results),
+            "results": results,
+        }
+        path.write_text(json.dumps(verdict, indent=2), encoding="utf-8")
+        aborted = f", aborted: {cls.aborted}" if cls.aborted else ""
+        Logger.report(
+            f"SLO verdict: {verdict['verdict']}, {verdict['failed']} of {len(results)} checks failed{aborted}, "
+            f"written to {path}",
+            LogType.INFO if passed else LogType.ERROR,
+        )
+        if not passed:
+            environment.process_exit_code = 1
+        return passed
+
+    @staticmethod
+    def _format(metric, value):
+        if metric == "error_rate":
+            return f"{value:.2%}"
+        if metric == "rps":
+            return f"{value:.2f} req/s"
+        return f"{value:g} ms"
@@ -0,0 +1,75 @@
+"""End-to-end timing of task sequences as named transactions."""
+
+import time
+
+from locust.exception import CatchResponseError, InterruptTaskSet
+from locust.stats import StatsError
+
+
+class Transaction:
+    """One run of a named task sequence, reported as a request of type TXN when it ends.
+
+    The response time is the wall time from the first task to the end of the sequence without the wait
+    time between tasks, and the transaction fails if any of its requests failed. It is logged straight into
+    its own stats entry, so it gets a row in the stats, CSV and HTML reports next to the per-request rows and
+    is merged across workers, but it is not a request: request event listeners don't see it and its
+    requests are not counted twice in the Aggregated row.
+    """
+
+    request_type = "TXN"
+    enabled = False
+
+    def __init__(self, environment, name):
+        self.environment = environment
+        self.name = name
+        self.started = time.perf_counter()
+        self.think_time = 0.0
+        self.first_failure = None
+
+    def record(self, request_name, failed):
+        """Note a request of the transaction; the first failed one fails it."""
+        if failed and self.first_failure is None:
+            self.first_failure = request_name
+
+    def end(self):
+        stats = self.environment.stats
+        entry = stats.get(self.name, self.request_type)
+        entry.log((time.perf_counter() - self.started - self.think_time) * 1000, 0)
+        if self.first_failure is None:
+            return
+        error = CatchResponseError(f"first failed request: {self.first_failure}")
+        entry.log_error(error)
+        key = StatsError.create_key(self.request_type, self.name, error)
+        if key not in stats.errors:
+            stats.errors[key] = StatsError(self.request_type, self.name, error)
+        stats.errors[key].occurred()
+
+
+class TransactionMixin:
+    """Time the task sequence of a task set as the transaction named transaction_name.
+
+    A transaction starts with the first task and ends when the task set interrupts itself at the end of
+    the sequence. Sequences cut short by a stopping user are not reported.
+    """
+
+    transaction_name = None
+    current_transaction = None
+
+    def execute_task(self, task):
+        if Transaction.enabled and self.transaction_name and self.current_transaction is None:
+            self.current_transaction = Transaction(self.user.environment, self.transaction_name)
+        try:
+            super().execute_task(task)
+        except InterruptTaskSet:
+            if self.current_transaction is not None:
+                self.current_transaction.end()
+                self.current_transaction = None
+            raise
+
+    def wait(self):
+        started = time.perf_counter()
+        try:
+            super().wait()
+        finally:
+            if self.current_transaction is not None:
+                self.current_transaction.think_time += time.perf_counter() - started
@@ -1,38 +1,81 @@
 """Load users from CSV."""
 
 import csv
+import itertools
+import os
+from array import array
 from pathlib import Path
 
 
 class UsersLoader:
-    """Load users from CSV queue."""
+    """Hand out users from CSV round-robin.
+
+    The file is scanned once to index byte offsets of its rows; rows are read and parsed on demand.
+    With several workers each one indexes only its own shard of rows (row number modulo worker count),
+    so no two workers log in as the same user. Rows must not contain line breaks.
+    """
 
-    users_list = []
     _base_dir = Path(__file__).parent.parent
     csv_file_path = _base_dir / "data" / "users.csv"
 
+    _fieldnames = []
+    _offsets = array("Q")
+    _lengths = array("I")
+    _cursor = itertools.count()
+    _fd = None
+
     @staticmethod
-    def load_users():
-        """Load all users from CSV."""
+    def load_users(worker_index=0, worker_count=1):
+        """Index users from CSV. Only rows of shard worker_index out of worker_count are used."""
         csv_path = UsersLoader.csv_file_path
         if not csv_path.exists():
             raise FileNotFoundError(f"Users CSV file not found: {UsersLoader.csv_file_path}")
 
-        UsersLoader.users_list.clear()
-        with open(csv_path, encoding="utf-8") as csv_file:
-            users = csv.DictReader(csv_file)
-            for user in users:
-                UsersLoader.users_list.append(user)
+        offsets = array("Q")
+        lengths = array("I")
+        with open(csv_path, "rb") as csv_file:
+            header = csv_file.readline()
+            fieldnames = next(csv.reader([header.decode("utf-8-sig")]), [])
+            offset = len(header)
+            row_number = 0
+            for line in csv_file:
+                if line.strip():
+                    if row_number % worker_count == worker_index:
+                        offsets.append(offset)
+                        lengths.append(len(line))
+                    row_number += 1
+                offset += len(line)
 
-        if len(UsersLoader.users_list) == 0:
-            raise ValueError(f"No users found in CSV file: {UsersLoader.csv_file_path}")
+        if len(offsets) == 0:
+            raise ValueError(
+                f"No users found in CSV file: {UsersLoader.csv_file_path} (worker {worker_index} of {worker_count})"
+            )
+
+        UsersLoader.close()
+        UsersLoader._fieldnames = fieldnames
+        UsersLoader._offsets = offsets
+        UsersLoader._lengths = lengths
+        UsersLoader._cursor = itertools.count()
+        UsersLoader._fd = os.open(csv_path, os.O_RDONLY)
+
+    @staticmethod
+    def count():
+        """Number of users available to this worker."""
+        return len(UsersLoader._offsets)
 
     @staticmethod
     def get_user():
-        """Get one user from queue and remove it from the list."""
-        if len(UsersLoader.users_list) < 1:
+        """Get next user, round-robin."""
+        if UsersLoader._fd is None:
             UsersLoader.load_users()
-        if len(UsersLoader.users_list) == 0:
-            raise ValueError("No users available in the list")
-        user = UsersLoader.users_list.pop()
-        return user
+        index = next(UsersLoader._cursor) % len(UsersLoader._offsets)
+        line = os.pread(UsersLoader._fd, UsersLoader._lengths[index], UsersLoader._offsets[index])
+        values = next(csv.reader([line.decode("utf-8")]))
+        return dict(zip(UsersLoader._fieldnames, values, strict=False))
+
+    @staticmethod
+    def close():
+        """Close the CSV file."""
+        if UsersLoader._fd is not None:
+            os.close(UsersLoader._fd)
+            UsersLoader._fd = None
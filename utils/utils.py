@@ -1,11 +1,16 @@
 """HTTP requests utilities."""
 
 import re
+from types import MappingProxyType
 
 
 class Utils:
     """HTTP requests and tokens helpers."""
 
+    # (token, defaults) -> shared read-only headers, oldest dropped first
+    _shared_headers = {}
+    max_shared_headers = 100_000
+
     @staticmethod
     def get_base_headers():
         """Base JSON headers."""
@@ -29,33 +34,43 @@ class Utils:
         headers["X-CSRFToken"] = token
         return headers
 
+    @classmethod
+    def get_shared_headers(cls, token, defaults=()):
+        """Read-only JSON headers with CSRF token (and defaults), one object shared by every holder of the token."""
+        key = (token, defaults)
+        headers = cls._shared_headers.get(key)
+        if headers is None:
+            if len(cls._shared_headers) >= cls.max_shared_headers:
+                cls._shared_headers.pop(next(iter(cls._shared_headers)))
+            headers = {**Utils.get_headers_with_token(token), **dict(defaults)}
+            headers = cls._shared_headers[key] = MappingProxyType(headers)
+        return headers
+
+    @staticmethod
+    def get_set_cookie_values(response):
+        """Get all Set-Cookie header values (python-requests and geventhttpclient responses)."""
+        headers = getattr(response, "headers", None)
+        if not headers:
+            return []
+        if hasattr(headers, "getlist"):
+            return headers.getlist("Set-Cookie")
+        raw_headers = getattr(getattr(response, "raw", None), "headers", None)
+        if raw_headers is not None and hasattr(raw_headers, "getlist"):
+            return raw_headers.getlist("Set-Cookie")
+        set_cookie = headers.get("Set-Cookie")
+        return [set_cookie] if set_cookie else []
+
+    @staticmethod
+    def get_response_cookies(response):
+        """Get cookies set by response as name -> value dict."""
+        cookies = {}
+        for set_cookie in Utils.get_set_cookie_values(response):
+            name, _, value = set_cookie.split(";", 1)[0].partition("=")
+            if name:
+                cookies[name.strip()] = value.strip()
+        return cookies
+
     @staticmethod
     def extract_token_from_response(response):
         """Get CSRF token from response."""
-        if hasattr(response, "headers") and response.headers:
-            set_cookie = response.headers.get("Set-Cookie", "")
-            if set_cookie:
-                token = Utils.get_token_value(set_cookie)
-                if token:
-                    return token
-
-        if hasattr(response, "cookies") and response.cookies:
-            if isinstance(response.cookies, dict):
-                if "csrftoken" in response.cookies:
-                    return response.cookies["csrftoken"]
-            else:
-                try:
-                    csrf_cookie = response.cookies.get("csrftoken")
-                    if csrf_cookie:
-                        return csrf_cookie
-                except (AttributeError, KeyError, TypeError):
-                    pass
-
-            try:
-                cookies_dict = dict(response.cookies)
-                if "csrftoken" in cookies_dict:
-                    return cookies_dict["csrftoken"]
-            except (TypeError, ValueError):
-                pass
-
-        return None
+        return Utils.get_response_cookies(response).get("csrftoken")